@@ -9,6 +9,7 @@ from alembic import context
 from app.core.config import settings
 from app.infra.database import Base
 from app.domain.user_models import User  # Importa os modelos para autogenerate
+from app.domain.historico_models import TaxaHistorica, DiaHistoricoConsultado
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
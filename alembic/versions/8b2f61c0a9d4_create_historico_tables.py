@@ -0,0 +1,39 @@
+"""create historico tables
+
+Revision ID: 8b2f61c0a9d4
+Revises: d4a037813013
+Create Date: 2026-10-17 13:10:42.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b2f61c0a9d4'
+down_revision: Union[str, None] = 'd4a037813013'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('taxas_historicas',
+    sa.Column('moeda_base', sa.String(length=3), nullable=False),
+    sa.Column('moeda', sa.String(length=3), nullable=False),
+    sa.Column('data', sa.Date(), nullable=False),
+    sa.Column('taxa', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('moeda_base', 'moeda', 'data')
+    )
+    op.create_table('historico_dias_consultados',
+    sa.Column('moeda_base', sa.String(length=3), nullable=False),
+    sa.Column('data', sa.Date(), nullable=False),
+    sa.Column('consultado_em', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('moeda_base', 'data')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('historico_dias_consultados')
+    op.drop_table('taxas_historicas')
@@ -2,12 +2,20 @@
 from datetime import timedelta
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.core.security import create_access_token, verify_password, decode_access_token
+from app.core.security import (
+    PoolHashSaturadoError,
+    create_access_token,
+    decode_access_token,
+    get_password_hash_async,
+    password_needs_rehash,
+    verify_password_async,
+)
 from app.domain.auth_schemas import UserCreate, UserResponse, Token, UserLogin
 from app.domain.user_models import User
+from app.infra.auth_cache import UsuarioAutenticado, cache_autenticacao
 from app.infra.database import get_db
 from app.infra.user_repository import UserRepository
 
@@ -18,13 +26,15 @@ router = APIRouter(prefix="/auth", tags=["Autenticação"])
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
 
-def get_current_user(
+async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
+    db: AsyncSession = Depends(get_db)
+) -> UsuarioAutenticado:
     """
     Dependency que extrai o usuário atual do token JWT.
     Levanta HTTPException 401 se o token for inválido.
+    Tokens validados e usuários são mantidos em cache por `auth_cache_ttl_seconds`;
+    o usuário é retornado como cópia imutável (`UsuarioAutenticado`), em cache ou não.
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -32,18 +42,34 @@ def get_current_user(
         headers={"WWW-Authenticate": "Bearer"},
     )
     
-    payload = decode_access_token(token)
+    # Caminho rápido: token já validado e usuário em cache não consultam o banco
+    payload = cache_autenticacao.obter_token(token)
     if payload is None:
-        raise credentials_exception
+        payload = decode_access_token(token)
+        if payload is None:
+            raise credentials_exception
+        cache_autenticacao.guardar_token(token, payload)
     
     email: str = payload.get("sub")
     if email is None:
         raise credentials_exception
     
-    user_repo = UserRepository(db)
-    user = user_repo.get_by_email(email)
+    user_id = payload.get("uid")
+    user = cache_autenticacao.obter_usuario(user_id) if user_id is not None else None
     
     if user is None:
+        user_repo = UserRepository(db)
+        # Tokens emitidos antes do claim "uid" são resolvidos pelo email
+        if user_id is not None:
+            modelo = await user_repo.get_by_id(user_id)
+        else:
+            modelo = await user_repo.get_by_email(email)
+        if modelo is None:
+            raise credentials_exception
+        user = cache_autenticacao.guardar_usuario(modelo)
+    
+    # Vale também para o usuário em cache: o email do token precisa ser o atual
+    if user.email != email:
         raise credentials_exception
     
     if not user.is_active:
@@ -55,8 +81,52 @@ def get_current_user(
     return user
 
 
+def _servico_ocupado(erro: Exception) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=str(erro),
+        headers={"Retry-After": "1"},
+    )
+
+
+async def _autenticar(user_repo: UserRepository, email: str, password: str) -> User:
+    """
+    Valida email e senha (bcrypt no pool de hash, fora do event loop).
+    Com o login aceito, se o hash foi gerado com outro custo do bcrypt, ele é refeito
+    com o custo atual.
+    """
+    user = await user_repo.get_by_email(email)
+    
+    try:
+        senha_ok = user is not None and await verify_password_async(password, user.hashed_password)
+    except PoolHashSaturadoError as e:
+        raise _servico_ocupado(e)
+    
+    if not senha_ok:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Email ou senha incorretos",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
+    if not user.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Usuário inativo"
+        )
+    
+    if password_needs_rehash(user.hashed_password):
+        try:
+            await user_repo.update_password_hash(user, await get_password_hash_async(password))
+        except PoolHashSaturadoError:
+            # Pool lotado: o login vale mesmo assim; o hash é refeito no próximo login
+            pass
+    
+    return user
+
+
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def register(user_data: UserCreate, db: Session = Depends(get_db)):
+async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
     """
     Registra um novo usuário no sistema.
     
@@ -67,20 +137,23 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
     user_repo = UserRepository(db)
     
     # Verifica se email já existe
-    if user_repo.email_exists(user_data.email):
+    if await user_repo.email_exists(user_data.email):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email já cadastrado"
         )
     
     # Cria o usuário
-    new_user = user_repo.create(user_data)
+    try:
+        new_user = await user_repo.create(user_data)
+    except PoolHashSaturadoError as e:
+        raise _servico_ocupado(e)
     
     return new_user
 
 
 @router.post("/login", response_model=Token)
-async def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
+async def login(user_credentials: UserLogin, db: AsyncSession = Depends(get_db)):
     """
     Autentica um usuário e retorna um token JWT.
     
@@ -90,28 +163,12 @@ async def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
     Retorna um token de acesso que deve ser usado no header:
     `Authorization: Bearer <token>`
     """
-    user_repo = UserRepository(db)
-    
-    # Busca usuário
-    user = user_repo.get_by_email(user_credentials.email)
-    
-    if not user or not verify_password(user_credentials.password, user.hashed_password):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Email ou senha incorretos",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    if not user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Usuário inativo"
-        )
+    user = await _autenticar(UserRepository(db), user_credentials.email, user_credentials.password)
     
     # Cria token JWT
     access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
     access_token = create_access_token(
-        data={"sub": user.email},
+        data={"sub": user.email, "uid": user.id},
         expires_delta=access_token_expires
     )
     
@@ -121,32 +178,18 @@ async def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
 @router.post("/login/form", response_model=Token)
 async def login_form(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Login usando OAuth2PasswordRequestForm (compatível com Swagger UI).
     O Swagger UI usa este endpoint automaticamente.
     """
-    user_repo = UserRepository(db)
-    
-    user = user_repo.get_by_email(form_data.username)  # OAuth2 usa 'username' para email
-    
-    if not user or not verify_password(form_data.password, user.hashed_password):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Email ou senha incorretos",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    if not user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Usuário inativo"
-        )
+    # OAuth2 usa 'username' para email
+    user = await _autenticar(UserRepository(db), form_data.username, form_data.password)
     
     access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
     access_token = create_access_token(
-        data={"sub": user.email},
+        data={"sub": user.email, "uid": user.id},
         expires_delta=access_token_expires
     )
     
@@ -154,7 +197,7 @@ async def login_form(
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_me(current_user: User = Depends(get_current_user)):
+async def get_me(current_user: UsuarioAutenticado = Depends(get_current_user)):
     """
     Retorna informações do usuário autenticado.
     Requer token JWT válido.
@@ -166,11 +209,11 @@ async def get_me(current_user: User = Depends(get_current_user)):
 async def list_users(
     skip: int = 0,
     limit: int = 100,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UsuarioAutenticado = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Lista todos os usuários (requer autenticação).
     """
     user_repo = UserRepository(db)
-    return user_repo.list_all(skip=skip, limit=limit)
+    return await user_repo.list_all(skip=skip, limit=limit)
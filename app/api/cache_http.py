@@ -0,0 +1,116 @@
+# app/api/cache_http.py
+import hashlib
+import math
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from app.infra.cache import CacheEntry, CotacaoCache
+
+
+def etag_fraco(*partes: object) -> str:
+    """
+    ETag fraco a partir de identificadores baratos (ex: par e data de atualização da
+    entrada do cache), sem serializar a resposta.
+    """
+    resumo = hashlib.sha1("|".join(str(p) for p in partes).encode("utf-8")).hexdigest()[:20]
+    return f'W/"{resumo}"'
+
+
+def etag_confere(if_none_match: Optional[str], etag: str) -> bool:
+    """Compara o header If-None-Match com o ETag (comparação fraca, aceita lista e `*`)."""
+    if not if_none_match:
+        return False
+    valor = etag.removeprefix("W/")
+    return any(
+        candidato == "*" or candidato.removeprefix("W/") == valor
+        for candidato in (c.strip() for c in if_none_match.split(","))
+    )
+
+
+def _utc(data: datetime) -> datetime:
+    # As datas do cache são UTC; datas sem fuso são tratadas como UTC. HTTP trabalha com segundos inteiros
+    data = data.replace(tzinfo=timezone.utc) if data.tzinfo is None else data.astimezone(timezone.utc)
+    return data.replace(microsecond=0)
+
+
+def nao_modificado(request: Request, etag: str, atualizado_em: datetime) -> bool:
+    """
+    Indica se o cliente já tem a versão atual: If-None-Match tem precedência;
+    sem ele, vale If-Modified-Since.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_confere(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return _utc(atualizado_em) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def cabecalhos_cache(
+    etag: str,
+    atualizado_em: datetime,
+    validades: Iterable[Tuple[float, float]],
+) -> Dict[str, str]:
+    """
+    ETag, Last-Modified e Cache-Control. `validades` são os pares (segundos até o TTL,
+    segundos até o hard TTL) de cada entrada usada na resposta (ver CotacaoCache.validade):
+    max-age vai até a primeira entrada passar do TTL e stale-while-revalidate cobre a
+    janela em que ela ainda é servida obsoleta.
+    """
+    validades = list(validades)
+    ate_ttl = min((fresca for fresca, _ in validades), default=0.0)
+    ate_hard_ttl = min((servivel for _, servivel in validades), default=0.0)
+    max_age = math.floor(ate_ttl)
+    cache_control = f"public, max-age={max_age}"
+    stale = math.floor(ate_hard_ttl) - max_age
+    if stale > 0:
+        cache_control += f", stale-while-revalidate={stale}"
+    return {
+        "ETag": etag,
+        "Last-Modified": format_datetime(_utc(atualizado_em), usegmt=True),
+        "Cache-Control": cache_control,
+    }
+
+
+def validar_cache_http(
+    request: Request,
+    cache: CotacaoCache,
+    entries: Iterable[CacheEntry],
+    *identificadores: object,
+) -> Tuple[Dict[str, str], bool]:
+    """
+    Para respostas montadas a partir de entradas de `cache`: calcula o ETag pelos
+    `identificadores` (ex: o par) e pela data de atualização das entradas.
+    Retorna os cabeçalhos de cache e se o cliente já tem essa versão (responder 304).
+    """
+    entries = list(entries)
+    atualizado_em = max(entry.atualizado_em for entry in entries)
+    etag = etag_fraco(*identificadores, *(entry.atualizado_em.isoformat() for entry in entries))
+    cabecalhos = cabecalhos_cache(etag, atualizado_em, (cache.validade(entry) for entry in entries))
+    return cabecalhos, nao_modificado(request, etag, atualizado_em)
+
+
+def responder_condicional(
+    request: Request,
+    response: Response,
+    cache: CotacaoCache,
+    entries: Iterable[CacheEntry],
+    *identificadores: object,
+) -> Optional[Response]:
+    """
+    Como `validar_cache_http`, colocando os cabeçalhos em `response`; se o cliente
+    já tiver a versão atual, retorna a resposta 304 a ser devolvida no lugar do corpo.
+    """
+    cabecalhos, atual = validar_cache_http(request, cache, entries, *identificadores)
+    if atual:
+        return Response(status_code=304, headers=cabecalhos)
+    response.headers.update(cabecalhos)
+    return None
@@ -0,0 +1,152 @@
+# app/api/compressao_http.py
+import asyncio
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.core.compressao import Compressor, comprimir, escolher_codificacao, novo_compressor, tipo_compressivel
+from app.core.metricas import compressao_bytes, compressao_ignoradas
+
+# Partes maiores que isso são comprimidas numa thread, sem travar o event loop
+# (zlib e brotli liberam o GIL durante a compressão)
+_LIMITE_THREAD_BYTES = 256 * 1024
+
+
+class MiddlewareCompressao:
+    """
+    Middleware ASGI que comprime respostas com brotli ou gzip, conforme o
+    Accept-Encoding do cliente. Respostas abaixo de `tamanho_minimo` bytes (como
+    uma cotação avulsa), de tipos que não comprimem, já codificadas (ex: a matriz
+    pré-comprimida) ou de SSE saem como estão.
+
+    Respostas completas são comprimidas de uma vez, com o novo Content-Length;
+    respostas em partes (StreamingResponse) são comprimidas parte a parte.
+    """
+
+    def __init__(
+        self,
+        app,
+        tamanho_minimo: int = 1024,
+        nivel_gzip: int = 6,
+        nivel_brotli: int = 4,
+        brotli_habilitado: bool = True,
+    ) -> None:
+        self.app = app
+        self.tamanho_minimo = tamanho_minimo
+        self.niveis = {"gzip": nivel_gzip, "br": nivel_brotli}
+        self.brotli_habilitado = brotli_habilitado
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        codificacao = escolher_codificacao(Headers(scope=scope).get("accept-encoding"), self.brotli_habilitado)
+        if codificacao is None:
+            await self.app(scope, receive, send)
+            return
+        envio = _EnvioComprimido(send, codificacao, self.niveis[codificacao], self.tamanho_minimo)
+        await self.app(scope, receive, envio)
+
+
+class _EnvioComprimido:
+    """
+    Envolve o `send` de uma requisição: segura o início da resposta até a primeira
+    parte do corpo, quando já dá para decidir se ela será comprimida.
+    """
+    __slots__ = ("_send", "_codificacao", "_nivel", "_tamanho_minimo", "_inicio", "_repassar", "_compressor")
+
+    def __init__(self, send, codificacao: str, nivel: int, tamanho_minimo: int) -> None:
+        self._send = send
+        self._codificacao = codificacao
+        self._nivel = nivel
+        self._tamanho_minimo = tamanho_minimo
+        self._inicio: Optional[dict] = None
+        self._repassar = False
+        self._compressor: Optional[Compressor] = None
+
+    async def __call__(self, mensagem) -> None:
+        tipo = mensagem["type"]
+        if tipo == "http.response.start":
+            self._inicio = mensagem
+            return
+        if self._repassar or tipo != "http.response.body":
+            await self._liberar_inicio()
+            self._repassar = True
+            await self._send(mensagem)
+            return
+        if self._compressor is not None:
+            await self._enviar_parte(mensagem)
+            return
+
+        corpo = mensagem.get("body", b"")
+        mais = mensagem.get("more_body", False)
+        headers = MutableHeaders(raw=self._inicio["headers"])
+        motivo = self._motivo_para_ignorar(headers, corpo, mais)
+        if motivo is not None:
+            if motivo:
+                compressao_ignoradas.labels(motivo).inc()
+            self._repassar = True
+            await self._liberar_inicio()
+            await self._send(mensagem)
+            return
+
+        headers["Content-Encoding"] = self._codificacao
+        headers.add_vary_header("Accept-Encoding")
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            # O corpo comprimido não é byte a byte o original: só vale como ETag fraco
+            headers["ETag"] = "W/" + etag
+
+        if not mais:
+            comprimido = await self._executar(comprimir, corpo, self._codificacao, self._nivel)
+            self._contar(len(corpo), len(comprimido))
+            headers["Content-Length"] = str(len(comprimido))
+            await self._liberar_inicio()
+            await self._send({"type": "http.response.body", "body": comprimido, "more_body": False})
+            return
+
+        if "content-length" in headers:
+            del headers["Content-Length"]
+        self._compressor = novo_compressor(self._codificacao, self._nivel)
+        await self._liberar_inicio()
+        await self._enviar_parte(mensagem)
+
+    def _motivo_para_ignorar(self, headers: MutableHeaders, corpo: bytes, mais: bool) -> Optional[str]:
+        """Motivo para não comprimir ("" quando não há corpo); None se a resposta deve ser comprimida."""
+        if not mais and not corpo:
+            return ""
+        if "content-encoding" in headers:
+            return "ja_codificada"
+        if not tipo_compressivel(headers.get("content-type")):
+            return "tipo"
+        tamanho = len(corpo) if not mais else headers.get("content-length")
+        if tamanho is not None and int(tamanho) < self._tamanho_minimo:
+            return "pequena"
+        return None
+
+    async def _enviar_parte(self, mensagem) -> None:
+        comprimir_parte, finalizar = self._compressor
+        corpo = mensagem.get("body", b"")
+        mais = mensagem.get("more_body", False)
+        comprimido = await self._executar(comprimir_parte, corpo) if corpo else b""
+        if not mais:
+            comprimido += finalizar()
+        self._contar(len(corpo), len(comprimido))
+        # O compressor acumula partes pequenas: só envia quando há bytes prontos (ou no fim)
+        if comprimido or not mais:
+            await self._send({"type": "http.response.body", "body": comprimido, "more_body": mais})
+
+    async def _liberar_inicio(self) -> None:
+        if self._inicio is not None:
+            inicio, self._inicio = self._inicio, None
+            await self._send(inicio)
+
+    @staticmethod
+    async def _executar(funcao, corpo: bytes, *args):
+        if len(corpo) >= _LIMITE_THREAD_BYTES:
+            return await asyncio.to_thread(funcao, corpo, *args)
+        return funcao(corpo, *args)
+
+    def _contar(self, entrada: int, saida: int) -> None:
+        compressao_bytes.labels(self._codificacao, "entrada").inc(entrada)
+        compressao_bytes.labels(self._codificacao, "saida").inc(saida)
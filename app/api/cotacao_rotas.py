@@ -1,21 +1,70 @@
 # app/api/cotacao_routes.py
-from fastapi import APIRouter, HTTPException, Query
+import tempfile
+from datetime import date, datetime, timezone
+from typing import BinaryIO, Iterator, List, Literal, Optional, Tuple
 
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
+from starlette.background import BackgroundTask
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.api.cache_http import cabecalhos_cache, nao_modificado, validar_cache_http
+from app.core.compressao import escolher_codificacao
 from app.core.config import settings
-from app.domain.models import Cotacao
+from app.domain.models import Cotacao, CotacaoLote, CotacaoLoteRequest, ErroCotacao, SerieHistorica
 from app.infra.cache import CotacaoCache
+from app.infra.cache_compartilhado import obter_cache_compartilhado
 from app.infra.cotacao_repo import CotacaoRepositoryComCache
 from app.infra.cliente_externo import HttpFrankfurterProvider
+from app.infra.conversor_lote import (
+    ConversorLote,
+    CorpoInvalidoError,
+    converter_em_lotes,
+    ler_csv,
+    ler_lista,
+    ler_ndjson,
+)
+from app.infra.database import get_db
+from app.infra.matriz import PublicadorMatriz
+from app.infra.historico_repo import DATA_INICIAL_HISTORICO, HistoricoCotacaoRepository, MoedaDesconhecidaError
+from app.infra.rate_limit import BaldeTokens
+from app.infra.resiliencia import ProviderIndisponivelError, Resiliencia
+from app.infra.single_flight import SingleFlight
 
 
 router = APIRouter(prefix="/cotacao", tags=["Cotação"])
 
-_cache = CotacaoCache(ttl_seconds=settings.cache_ttl_seconds)
+_cache = CotacaoCache(
+    ttl_seconds=settings.cache_ttl_seconds,
+    stale_ttl_seconds=settings.cache_stale_ttl_seconds,
+    refresh_ahead_ratio=settings.cache_refresh_ahead_ratio,
+    max_entradas=settings.cache_max_entradas,
+    max_bytes=settings.cache_max_bytes,
+)
 _provider = HttpFrankfurterProvider(
     base_url=settings.frankfurter_base_url,
     timeout=settings.frankfurter_timeout_seconds,
+    limitador=BaldeTokens(
+        "Frankfurter",
+        taxa_por_segundo=settings.frankfurter_rate_limit_por_segundo,
+        capacidade=settings.frankfurter_rate_limit_rajada,
+        max_espera_seconds=settings.rate_limit_max_espera_seconds,
+    ),
+    resiliencia=Resiliencia.from_settings("Frankfurter"),
 )
-_repo = CotacaoRepositoryComCache(provider=_provider, cache=_cache)
+_repo = CotacaoRepositoryComCache(
+    provider=_provider,
+    cache=_cache,
+    moeda_base=settings.cotacao_moeda_base,
+    cache_compartilhado=obter_cache_compartilhado(),
+)
+_matriz = PublicadorMatriz(
+    _repo,
+    intervalo_segundos=settings.matriz_intervalo_segundos,
+    moedas=[m.strip() for m in settings.matriz_moedas.split(",") if m.strip()],
+)
+# Compartilhado entre requisições: buscas simultâneas do mesmo intervalo viram uma chamada
+_historico_single_flight = SingleFlight()
 
 
 def _validar_moeda(value: str) -> str:
@@ -34,21 +83,296 @@ def _validar_moeda(value: str) -> str:
 
 @router.get("", response_model=Cotacao)
 async def obter_cotacao(
+    request: Request,
+    response: Response,
     moeda_origem: str = Query(..., description="Moeda de origem, ex: USD"),
     moeda_destino: str = Query(..., description="Moeda de destino, ex: BRL"),
 ):
     """
     Obtém a cotação entre duas moedas.
     Consulta o cache antes de fazer uma chamada externa.
+    Responde com ETag/Last-Modified/Cache-Control pela entrada do cache; com
+    `If-None-Match` (ou `If-Modified-Since`) da versão atual responde `304` sem corpo.
     """
     origem = _validar_moeda(moeda_origem)
     destino = _validar_moeda(moeda_destino)
 
     try:
-        cotacao = await _repo.obter_cotacao(origem, destino)
-    except HTTPException:
+        entry, fonte = await _repo.obter_entrada_tabela()
+        entry.valor.taxa(origem, destino)  # valida o par antes de responder 304
+        cabecalhos, nao_modificado = validar_cache_http(
+            request, _cache, [entry], origem, destino, _cache.esta_obsoleto(entry)
+        )
+        if nao_modificado:
+            return Response(status_code=304, headers=cabecalhos)
+        if settings.cotacao_json_pre_serializado:
+            # Bytes prontos: sem construir o modelo nem passar pela validação do response_model
+            return Response(
+                content=_repo.cotacao_json(origem, destino, entry, fonte),
+                media_type="application/json",
+                headers=cabecalhos,
+            )
+        cotacao = _repo.montar_cotacao(origem, destino, entry, fonte)
+    except (HTTPException, ProviderIndisponivelError):
         raise
     except Exception as exc:
         raise HTTPException(status_code=502, detail=f"Erro ao consultar cotação externa: {exc}") from exc
 
+    response.headers.update(cabecalhos)
     return cotacao
+
+
+def _separar_pares(pares: List[str]) -> List[str]:
+    """
+    Normaliza a lista de pares ("USD-BRL"), aceitando também itens separados por vírgula.
+    Raises HTTPException 400 se a lista estiver vazia ou passar do limite.
+    """
+    itens = [p.strip() for item in pares for p in item.split(",") if p.strip()]
+    if not itens:
+        raise HTTPException(status_code=400, detail="Informe ao menos um par, ex: USD-BRL.")
+    if len(itens) > settings.cotacao_lote_max_pares:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Máximo de {settings.cotacao_lote_max_pares} pares por requisição.",
+        )
+    return itens
+
+
+def _validar_par(par: str) -> Tuple[str, str]:
+    """
+    Valida um par no formato ORIGEM-DESTINO (ex: USD-BRL).
+    Raises HTTPException se inválido.
+    """
+    partes = par.split("-")
+    if len(partes) != 2:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Par inválido: {par}. Use o formato ORIGEM-DESTINO, ex: USD-BRL.",
+        )
+    return _validar_moeda(partes[0]), _validar_moeda(partes[1])
+
+
+async def _obter_lote(pares: List[str]) -> CotacaoLote:
+    """
+    Resolve todos os pares de uma vez (uma única consulta à tabela de taxas)
+    e devolve resultados parciais, com o erro de cada par que falhar.
+    """
+    cotacoes: List[Cotacao] = []
+    erros: List[ErroCotacao] = []
+    validos: List[Tuple[str, Tuple[str, str]]] = []
+
+    for par in _separar_pares(pares):
+        try:
+            validos.append((par, _validar_par(par)))
+        except HTTPException as exc:
+            erros.append(ErroCotacao(par=par, erro=exc.detail))
+
+    if validos:
+        resultados = await _repo.obter_cotacoes([moedas for _, moedas in validos])
+        for (par, _), resultado in zip(validos, resultados):
+            if isinstance(resultado, Exception):
+                erros.append(ErroCotacao(par=par, erro=f"Erro ao consultar cotação externa: {resultado}"))
+            else:
+                cotacoes.append(resultado)
+
+    return CotacaoLote(cotacoes=cotacoes, erros=erros)
+
+
+@router.get("/lote", response_model=CotacaoLote)
+async def obter_cotacao_lote(
+    pares: List[str] = Query(..., description="Pares ORIGEM-DESTINO separados por vírgula, ex: USD-BRL,EUR-BRL"),
+):
+    """
+    Obtém a cotação de vários pares em uma única requisição.
+    Pares inválidos ou sem cotação são listados em `erros` sem falhar o lote.
+    """
+    return await _obter_lote(pares)
+
+
+@router.post("/lote", response_model=CotacaoLote)
+async def obter_cotacao_lote_post(lote: CotacaoLoteRequest):
+    """
+    Mesmo que `GET /cotacao/lote`, recebendo os pares no corpo:
+    `{"pares": ["USD-BRL", "EUR-BRL"]}`.
+    """
+    return await _obter_lote(lote.pares)
+
+
+@router.get("/matriz")
+async def obter_matriz(request: Request):
+    """
+    Taxas entre todos os pares de moedas: `taxas[i][j]` é a taxa `moedas[i]` -> `moedas[j]`.
+    Servida de um snapshot em memória, já serializado, refeito quando a tabela de taxas
+    é renovada; Cache-Control segue a validade da tabela em cache. Com `If-None-Match`
+    igual ao ETag atual responde `304` sem corpo. Com compressão habilitada, o corpo
+    comprimido também é calculado uma vez por snapshot.
+    """
+    try:
+        matriz, entry = await _matriz.obter()
+    except (HTTPException, ProviderIndisponivelError):
+        raise
+    except Exception as exc:
+        raise HTTPException(status_code=502, detail=f"Erro ao consultar cotação externa: {exc}") from exc
+
+    headers = cabecalhos_cache(matriz.etag, matriz.atualizado_em, [_cache.validade(entry)])
+    if nao_modificado(request, matriz.etag, matriz.atualizado_em):
+        return Response(status_code=304, headers=headers)
+
+    if not settings.compressao_habilitada or len(matriz.corpo) < settings.compressao_tamanho_minimo:
+        return Response(content=matriz.corpo, media_type="application/json", headers=headers)
+
+    headers["Vary"] = "Accept-Encoding"
+    codificacao = escolher_codificacao(request.headers.get("accept-encoding"), settings.compressao_brotli)
+    if codificacao is None:
+        return Response(content=matriz.corpo, media_type="application/json", headers=headers)
+    nivel = settings.compressao_nivel_brotli if codificacao == "br" else settings.compressao_nivel_gzip
+    # Já codificada: o middleware de compressão repassa sem comprimir de novo
+    headers["Content-Encoding"] = codificacao
+    return Response(
+        content=matriz.corpo_comprimido(codificacao, nivel), media_type="application/json", headers=headers
+    )
+
+
+def _validar_intervalo(inicio: date, fim: date) -> None:
+    """
+    Valida o intervalo de datas do histórico.
+    Raises HTTPException 400 se inválido.
+    """
+    if inicio < DATA_INICIAL_HISTORICO:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Histórico disponível a partir de {DATA_INICIAL_HISTORICO.isoformat()}.",
+        )
+    if inicio > fim:
+        raise HTTPException(status_code=400, detail="A data inicial deve ser anterior ou igual à final.")
+    if (fim - inicio).days + 1 > settings.historico_max_dias:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Máximo de {settings.historico_max_dias} dias por consulta.",
+        )
+
+
+@router.get("/historico", response_model=SerieHistorica)
+async def obter_historico(
+    origem: str = Query(..., description="Moeda de origem, ex: USD"),
+    destino: str = Query(..., description="Moeda de destino, ex: BRL"),
+    inicio: date = Query(..., description="Data inicial, ex: 2024-01-01"),
+    fim: Optional[date] = Query(None, description="Data final (padrão: hoje)"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Obtém as taxas diárias de um par entre duas datas.
+    Dias já consultados vêm do banco; só os dias que faltam são buscados na API externa.
+    """
+    moeda_origem = _validar_moeda(origem)
+    moeda_destino = _validar_moeda(destino)
+    hoje = datetime.now(timezone.utc).date()
+    fim = min(fim or hoje, hoje)
+    _validar_intervalo(inicio, fim)
+
+    repo = HistoricoCotacaoRepository(
+        db,
+        _provider,
+        moeda_base=settings.cotacao_moeda_base,
+        single_flight=_historico_single_flight,
+        tolerancia_lacuna_dias=settings.historico_tolerancia_lacuna_dias,
+    )
+    try:
+        return await repo.obter_serie(moeda_origem, moeda_destino, inicio, fim)
+    except (HTTPException, ProviderIndisponivelError):
+        raise
+    except MoedaDesconhecidaError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except Exception as exc:
+        raise HTTPException(status_code=502, detail=f"Erro ao consultar histórico externo: {exc}") from exc
+
+
+_TIPOS_NDJSON = ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/json-seq")
+_TIPOS_MIDIA = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+
+def _ler_em_partes(arquivo: BinaryIO, tamanho: int = 64 * 1024) -> Iterator[bytes]:
+    return iter(lambda: arquivo.read(tamanho), b"")
+
+
+@router.post(
+    "/converter",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"example": [{"valor": "150.00", "moeda_origem": "USD", "moeda_destino": "BRL"}]},
+                "application/x-ndjson": {"example": '{"valor": 150, "moeda_origem": "USD", "moeda_destino": "BRL"}\n'},
+                "text/csv": {"example": "valor,moeda_origem,moeda_destino\n150.00,USD,BRL\n"},
+            },
+        }
+    },
+)
+async def converter_valores(
+    request: Request,
+    formato: Optional[Literal["ndjson", "csv"]] = Query(
+        None, description="Formato da resposta (padrão: csv para entrada CSV, ndjson para as demais)"
+    ),
+    casas_decimais: int = Query(2, ge=0, le=12, description="Casas decimais do valor convertido"),
+    decimal: bool = Query(
+        False, description="Cálculo exato em Decimal com arredondamento half-even; o valor convertido sai como string"
+    ),
+):
+    """
+    Converte muitos valores de uma vez. Aceita uma lista JSON, NDJSON ou CSV
+    (`valor,moeda_origem,moeda_destino`) e responde uma linha por item (NDJSON ou CSV);
+    linhas inválidas trazem `erro` sem interromper as demais.
+    Todas as linhas usam a mesma tabela de taxas, obtida uma vez no início.
+
+    NDJSON e CSV são lidos e convertidos lote a lote conforme chegam. O resultado vai
+    para um arquivo temporário (em memória até `conversao_max_memoria_bytes`) e é
+    enviado em streaming ao fim da leitura: clientes HTTP/1.1 só leem a resposta depois
+    de enviar todo o corpo, então responder durante a leitura travaria os dois lados.
+    """
+    tipo = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if tipo == "text/csv":
+        linhas = ler_csv(request.stream())
+    elif tipo in _TIPOS_NDJSON:
+        linhas = ler_ndjson(request.stream())
+    elif tipo == "application/json":
+        try:
+            corpo = await request.json()
+        except ValueError:
+            raise HTTPException(status_code=400, detail="JSON inválido.")
+        itens = corpo.get("itens") if isinstance(corpo, dict) else corpo
+        if not isinstance(itens, list):
+            raise HTTPException(status_code=400, detail='Envie uma lista de itens ou {"itens": [...]}.')
+        linhas = ler_lista(itens)
+    else:
+        raise HTTPException(
+            status_code=415,
+            detail="Use Content-Type application/json, application/x-ndjson ou text/csv.",
+        )
+
+    try:
+        tabela = await _repo.obter_tabela()
+    except (HTTPException, ProviderIndisponivelError):
+        raise
+    except Exception as exc:
+        raise HTTPException(status_code=502, detail=f"Erro ao consultar cotação externa: {exc}") from exc
+
+    formato = formato or ("csv" if tipo == "text/csv" else "ndjson")
+    conversor = ConversorLote(tabela, casas_decimais=casas_decimais, usar_decimal=decimal)
+    saida = tempfile.SpooledTemporaryFile(max_size=settings.conversao_max_memoria_bytes)
+    try:
+        async for parte in converter_em_lotes(linhas, conversor, formato, settings.conversao_tamanho_lote):
+            saida.write(parte)
+    except CorpoInvalidoError as exc:
+        saida.close()
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    except BaseException:
+        saida.close()
+        raise
+    tamanho = saida.tell()
+    saida.seek(0)
+    return StreamingResponse(
+        _ler_em_partes(saida),
+        media_type=_TIPOS_MIDIA[formato],
+        headers={"Content-Length": str(tamanho)},
+        background=BackgroundTask(saida.close),
+    )
@@ -1,11 +1,18 @@
 # app/api/cripto_rotas.py
-from datetime import datetime
-from fastapi import APIRouter, HTTPException
+from datetime import datetime, timezone
+from fastapi import APIRouter, HTTPException, Request, Response
 from pydantic import BaseModel
 
+from app.api.cache_http import responder_condicional
 from app.core.config import settings
+from app.infra.cache import CotacaoCache
+from app.infra.cache_compartilhado import obter_cache_compartilhado
 from app.infra.cliente_cripto_binance import HttpBinanceProvider
 from app.infra.cliente_cripto import HttpCoinGeckoProvider
+from app.infra.cliente_cripto_composto import ProviderCriptoComposto
+from app.infra.cripto_repo import CriptoRepositoryComCache
+from app.infra.rate_limit import BaldeTokens, BaldeTokensBinance
+from app.infra.resiliencia import ProviderIndisponivelError, Resiliencia
 
 
 router = APIRouter(prefix="/cripto", tags=["Cripto"])
@@ -15,22 +22,76 @@ def _get_crypto_provider():
     """
     Factory para criar o provider de cripto baseado na configuração.
     Facilita a troca entre Binance, CoinGecko e Brasil Bitcoin.
+    Com `crypto_provider_modo` diferente de "unico", combina os providers de
+    `crypto_providers` (hedge, failover ou mediana).
     """
-    provider_type = settings.crypto_provider.lower()
+    modo = settings.crypto_provider_modo.lower()
+    if modo == "unico":
+        return _criar_provider(settings.crypto_provider.lower())
+
+    nomes = [nome.strip().lower() for nome in settings.crypto_providers.split(",") if nome.strip()]
+    return ProviderCriptoComposto(
+        [_criar_provider(nome) for nome in nomes],
+        nomes,
+        modo=modo,
+        hedge_percentil=settings.crypto_hedge_percentil,
+        hedge_delay_inicial_seconds=settings.crypto_hedge_delay_inicial_seconds,
+        hedge_delay_min_seconds=settings.crypto_hedge_delay_min_seconds,
+        hedge_delay_max_seconds=settings.crypto_hedge_delay_max_seconds,
+    )
+
+
+def _criar_provider(provider_type: str):
     timeout = settings.crypto_api_timeout
     
+    if provider_type == "coingecko":
+        return HttpCoinGeckoProvider(
+            base_url=settings.coingecko_base_url,
+            timeout=timeout,
+            limitador=_limitador_coingecko(),
+            resiliencia=Resiliencia.from_settings("CoinGecko"),
+        )
     if provider_type == "binance":
-        return HttpBinanceProvider(timeout=timeout)
-    elif provider_type == "coingecko":
-        return HttpCoinGeckoProvider(timeout=timeout)
-    # elif provider_type == "brasilbitcoin":
-    #     return HttpBrasilBitcoinProvider(timeout=timeout)  # Implementar no futuro
-    else:
-        # Default: Binance
-        return HttpBinanceProvider(timeout=timeout)
+        return HttpBinanceProvider(
+            base_url=settings.binance_base_url,
+            timeout=timeout,
+            limitador=_limitador_binance(),
+            resiliencia=Resiliencia.from_settings("Binance"),
+        )
+    # "brasilbitcoin": implementar no futuro (HttpBrasilBitcoinProvider)
+    raise ValueError(f"Provider de cripto desconhecido: {provider_type!r}. Use 'binance' ou 'coingecko'")
+
+
+def _limitador_binance() -> BaldeTokensBinance:
+    return BaldeTokensBinance(
+        "Binance",
+        taxa_por_segundo=settings.binance_rate_limit_por_segundo,
+        capacidade=settings.binance_rate_limit_rajada,
+        max_espera_seconds=settings.rate_limit_max_espera_seconds,
+        peso_limite_minuto=settings.binance_peso_limite_minuto,
+    )
+
+
+def _limitador_coingecko() -> BaldeTokens:
+    return BaldeTokens(
+        "CoinGecko",
+        taxa_por_segundo=settings.coingecko_rate_limit_por_segundo,
+        capacidade=settings.coingecko_rate_limit_rajada,
+        max_espera_seconds=settings.rate_limit_max_espera_seconds,
+    )
 
 
 _provider = _get_crypto_provider()
+_cache = CotacaoCache(
+    ttl_seconds=settings.crypto_cache_ttl_seconds,
+    max_entradas=settings.cache_max_entradas,
+    max_bytes=settings.cache_max_bytes,
+)
+_repo = CriptoRepositoryComCache(
+    provider=_provider,
+    cache=_cache,
+    cache_compartilhado=obter_cache_compartilhado(),
+)
 
 
 class CriptoCotacao(BaseModel):
@@ -40,26 +101,32 @@ class CriptoCotacao(BaseModel):
     moeda_destino: str
     taxa_cambio: float
     data_cotacao: datetime
-    fonte: str  # Ex: "Binance API", "CoinGecko API", "Brasil Bitcoin API"
+    fonte: str  # Ex: "Binance API", "CoinGecko API", "Mediana (Binance API, CoinGecko API)"
 
 
 @router.get("/usdt-brl", response_model=CriptoCotacao)
-async def obter_usdt_brl():
+async def obter_usdt_brl(request: Request, response: Response):
     """
-    Obtém a cotação de USDT em BRL diretamente da Binance API.
-    Sem cache - sempre atualizado em tempo real.
+    Obtém a cotação de USDT em BRL.
+    Usa cache de TTL curto (renovado pelo poller, se ativo).
+    Responde `304` a `If-None-Match` com o ETag da cotação atual.
     """
     try:
-        taxa = await _provider.buscar_usdt_brl()
+        entry = await _repo.obter_preco("USDT")
+        nao_modificado = responder_condicional(request, response, _cache, [entry], "USDT")
+        if nao_modificado is not None:
+            return nao_modificado
         
         return CriptoCotacao(
             simbolo="USDT",
             nome="Tether",
             moeda_destino="BRL",
-            taxa_cambio=taxa,
-            data_cotacao=datetime.now(),
-            fonte=f"{settings.crypto_provider.title()} API"
+            taxa_cambio=entry.valor.valor,
+            data_cotacao=entry.atualizado_em,
+            fonte=entry.valor.fonte
         )
+    except ProviderIndisponivelError:
+        raise
     except Exception as exc:
         raise HTTPException(
             status_code=502,
@@ -68,22 +135,28 @@ async def obter_usdt_brl():
 
 
 @router.get("/usdc-brl", response_model=CriptoCotacao)
-async def obter_usdc_brl():
+async def obter_usdc_brl(request: Request, response: Response):
     """
-    Obtém a cotação de USDC em BRL diretamente da Binance API.
-    Sem cache - sempre atualizado em tempo real.
+    Obtém a cotação de USDC em BRL.
+    Usa cache de TTL curto (renovado pelo poller, se ativo).
+    Responde `304` a `If-None-Match` com o ETag da cotação atual.
     """
     try:
-        taxa = await _provider.buscar_usdc_brl()
+        entry = await _repo.obter_preco("USDC")
+        nao_modificado = responder_condicional(request, response, _cache, [entry], "USDC")
+        if nao_modificado is not None:
+            return nao_modificado
         
         return CriptoCotacao(
             simbolo="USDC",
             nome="USD Coin",
             moeda_destino="BRL",
-            taxa_cambio=taxa,
-            data_cotacao=datetime.now(),
-            fonte=f"{settings.crypto_provider.title()} API"
+            taxa_cambio=entry.valor.valor,
+            data_cotacao=entry.atualizado_em,
+            fonte=entry.valor.fonte
         )
+    except ProviderIndisponivelError:
+        raise
     except Exception as exc:
         raise HTTPException(
             status_code=502,
@@ -92,36 +165,46 @@ async def obter_usdc_brl():
 
 
 @router.get("/ambas-brl")
-async def obter_ambas_brl():
+async def obter_ambas_brl(request: Request, response: Response):
     """
     Obtém as cotações de USDT e USDC em BRL de uma vez.
-    Sem cache - sempre atualizado diretamente da Binance API.
-    Requisições em paralelo para maior performance.
+    Usa cache de TTL curto; em caso de miss, os ativos são buscados juntos em
+    uma única chamada externa, compartilhada entre as requisições concorrentes.
+    Responde `304` a `If-None-Match` com o ETag das cotações atuais.
     """
     try:
-        # Busca da API externa (em paralelo se o provider suportar)
-        dados = await _provider.buscar_ambas_brl()
+        entries = await _repo.obter_precos(_repo.SIMBOLOS)
+        if len(entries) == len(_repo.SIMBOLOS):
+            nao_modificado = responder_condicional(
+                request, response, _cache, [entries[s] for s in _repo.SIMBOLOS], *_repo.SIMBOLOS
+            )
+            if nao_modificado is not None:
+                return nao_modificado
         
-        fonte = f"{settings.crypto_provider.title()} API"
+        agora = datetime.now(timezone.utc)
+        usdt = entries.get("USDT")
+        usdc = entries.get("USDC")
         
         return {
             "USDT": {
                 "simbolo": "USDT",
                 "nome": "Tether",
                 "moeda_destino": "BRL",
-                "taxa_cambio": dados.get("USDT", 0),
-                "data_cotacao": datetime.now(),
-                "fonte": fonte
+                "taxa_cambio": usdt.valor.valor if usdt else 0,
+                "data_cotacao": usdt.atualizado_em if usdt else agora,
+                "fonte": usdt.valor.fonte if usdt else None
             },
             "USDC": {
                 "simbolo": "USDC",
                 "nome": "USD Coin",
                 "moeda_destino": "BRL",
-                "taxa_cambio": dados.get("USDC", 0),
-                "data_cotacao": datetime.now(),
-                "fonte": fonte
+                "taxa_cambio": usdc.valor.valor if usdc else 0,
+                "data_cotacao": usdc.atualizado_em if usdc else agora,
+                "fonte": usdc.valor.fonte if usdc else None
             }
         }
+    except ProviderIndisponivelError:
+        raise
     except Exception as exc:
         raise HTTPException(
             status_code=502,
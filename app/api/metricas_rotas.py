@@ -0,0 +1,149 @@
+# app/api/metricas_rotas.py
+import time
+from typing import Iterable, List, Tuple
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.api.cotacao_rotas import _cache as cotacao_cache, _provider as cotacao_provider, _repo as cotacao_repo
+from app.api.cripto_rotas import _provider as cripto_provider, _repo as cripto_repo
+from app.core.metricas import Amostra, registro, requisicoes_duracao, requisicoes_em_andamento
+from app.core.security import pool_hash_senhas
+from app.infra.auth_cache import cache_autenticacao
+from app.infra.database import engine
+from app.infra.resiliencia import DisjuntorCircuito
+
+
+router = APIRouter(tags=["Métricas"])
+
+_ESTADOS_CIRCUITO = {DisjuntorCircuito.FECHADO: 0, DisjuntorCircuito.MEIO_ABERTO: 1, DisjuntorCircuito.ABERTO: 2}
+
+
+def providers_http() -> list:
+    """Providers HTTP em uso (o de cripto pode ser composto por vários)."""
+    return [cotacao_provider, *getattr(cripto_provider, "providers", [cripto_provider])]
+
+
+class MiddlewareMetricas:
+    """
+    Middleware ASGI que mede a latência de cada requisição HTTP por rota e o
+    número de requisições em andamento. A rota é o template (ex: /cotacao/lote),
+    não o path, para o número de séries não crescer com os parâmetros.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        metodo = scope["method"]
+        status_code = 500
+
+        async def send_com_status(mensagem):
+            nonlocal status_code
+            if mensagem["type"] == "http.response.start":
+                status_code = mensagem["status"]
+            await send(mensagem)
+
+        em_andamento = requisicoes_em_andamento.labels(metodo)
+        em_andamento.inc()
+        inicio = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_com_status)
+        finally:
+            em_andamento.dec()
+            rota = scope.get("route")
+            requisicoes_duracao.labels(
+                metodo, getattr(rota, "path", "sem_rota"), str(status_code)
+            ).observar(time.perf_counter() - inicio)
+
+
+def _metricas_cache() -> Iterable[Tuple[str, str, str, List[Amostra]]]:
+    caches = {
+        "cotacao": cotacao_cache.metricas(),
+        "cripto": cripto_repo.metricas_cache(),
+        **{f"auth_{nome}": m for nome, m in cache_autenticacao.metricas().items()},
+    }
+    for campo, tipo, ajuda in (
+        ("hits", "counter", "Leituras atendidas pelo cache em memória"),
+        ("misses", "counter", "Leituras não atendidas pelo cache em memória"),
+        ("evictions", "counter", "Entradas removidas pelo limite de memória (LRU)"),
+        ("expiradas", "counter", "Entradas removidas por expiração"),
+        ("entradas", "gauge", "Entradas no cache em memória"),
+        ("bytes", "gauge", "Tamanho aproximado do cache em memória"),
+    ):
+        nome = f"cache_{campo}" + ("_total" if tipo == "counter" else "")
+        yield nome, tipo, ajuda, [({"cache": cache}, m[campo]) for cache, m in caches.items()]
+
+    repos = {"cotacao": cotacao_repo.metricas(), "cripto": cripto_repo.metricas()}
+    for campo, ajuda in (
+        ("hits_l2", "Leituras atendidas pelo cache compartilhado (L2)"),
+        ("misses_l2", "Leituras não atendidas pelo cache compartilhado (L2)"),
+        ("erros_l2", "Falhas de acesso ao cache compartilhado (L2)"),
+        ("adotadas_l2", "Renovações resolvidas com o valor gravado no L2 por outro processo"),
+        ("renovacoes_cedidas", "Renovações deixadas para o processo que detém a trava no L2"),
+    ):
+        yield f"cache_{campo}_total", "counter", ajuda, [({"cache": repo}, m[campo]) for repo, m in repos.items()]
+    for campo, ajuda in (
+        ("chamadas", "Buscas na API externa disparadas pelo repositório"),
+        ("coalescidas", "Requisições que aguardaram uma busca já em andamento (single-flight)"),
+    ):
+        yield f"repo_{campo}_total", "counter", ajuda, [({"repo": repo}, m[campo]) for repo, m in repos.items()]
+
+
+def _metricas_upstream() -> Iterable[Tuple[str, str, str, List[Amostra]]]:
+    providers = providers_http()
+    resiliencias = [p.resiliencia.metricas() | {"nome": p.resiliencia.nome} for p in providers]
+    yield "upstream_attempts_total", "counter", "Tentativas de chamada às APIs externas", [
+        ({"provider": m["nome"]}, m["tentativas"]) for m in resiliencias
+    ]
+    yield "upstream_retries_total", "counter", "Novas tentativas após falha transitória", [
+        ({"provider": m["nome"]}, m["repeticoes"]) for m in resiliencias
+    ]
+    yield "upstream_circuit_state", "gauge", "Estado do circuito (0 fechado, 1 meio aberto, 2 aberto)", [
+        ({"provider": m["nome"]}, _ESTADOS_CIRCUITO[m["estado"]]) for m in resiliencias
+    ]
+    yield "upstream_circuit_rejected_total", "counter", "Chamadas recusadas com o circuito aberto", [
+        ({"provider": m["nome"]}, m["rejeitadas"]) for m in resiliencias
+    ]
+
+    limites = [(p.limitador.nome, p.limitador.metricas()) for p in providers if p.limitador is not None]
+    yield "upstream_rate_limit_tokens", "gauge", "Tokens disponíveis no token bucket do provider", [
+        ({"provider": nome}, m["tokens_disponiveis"]) for nome, m in limites
+    ]
+    yield "upstream_rate_limit_rejected_total", "counter", "Chamadas recusadas por falta de orçamento", [
+        ({"provider": nome}, m["recusadas"]) for nome, m in limites
+    ]
+
+
+def _metricas_banco_e_auth() -> Iterable[Tuple[str, str, str, List[Amostra]]]:
+    pool = engine.sync_engine.pool
+    # Nem todo pool (ex: o do SQLite) expõe os contadores do QueuePool
+    for campo, ajuda in (
+        ("size", "Conexões configuradas no pool do banco"),
+        ("checkedout", "Conexões do banco em uso"),
+        ("checkedin", "Conexões do banco ociosas no pool"),
+        ("overflow", "Conexões do banco acima do tamanho do pool"),
+    ):
+        fn = getattr(pool, campo, None)
+        if callable(fn):
+            yield f"db_pool_{campo}", "gauge", ajuda, [({}, fn())]
+
+    yield "bcrypt_pending", "gauge", "Hashes de senha em execução ou na fila", [({}, pool_hash_senhas.pendentes)]
+    yield "bcrypt_rejected_total", "counter", "Logins/cadastros recusados com o pool de hash lotado", [
+        ({}, pool_hash_senhas.recusadas)
+    ]
+
+
+registro.adicionar_coletor(_metricas_cache)
+registro.adicionar_coletor(_metricas_upstream)
+registro.adicionar_coletor(_metricas_banco_e_auth)
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metricas():
+    """Métricas no formato texto do Prometheus."""
+    return PlainTextResponse(registro.exportar(), media_type="text/plain; version=0.0.4; charset=utf-8")
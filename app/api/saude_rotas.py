@@ -0,0 +1,75 @@
+# app/api/saude_rotas.py
+import signal
+import threading
+from typing import Dict, Optional
+
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+
+router = APIRouter(prefix="/health", tags=["Saúde"])
+
+
+class EstadoServico:
+    """
+    Fase do processo para as sondas do orquestrador: "iniciando" até o fim do
+    aquecimento (que roda com a porta já aberta), "pronto" enquanto atende e "drenando"
+    a partir do SIGTERM, quando o servidor deixa de aceitar conexões e espera as
+    requisições em andamento.
+    """
+
+    def __init__(self) -> None:
+        self.fase = "iniciando"
+        self.aquecimento: Optional[Dict[str, object]] = None
+
+    @property
+    def pronto(self) -> bool:
+        return self.fase == "pronto"
+
+    def marcar_pronto(self, aquecimento: Optional[Dict[str, object]] = None) -> None:
+        self.aquecimento = aquecimento
+        # Um SIGTERM durante o aquecimento mantém o processo drenando
+        if self.fase == "iniciando":
+            self.fase = "pronto"
+
+    def marcar_drenando(self) -> None:
+        self.fase = "drenando"
+
+    def observar_sinais_desligamento(self) -> None:
+        """
+        Encadeia os handlers de SIGTERM/SIGINT já instalados pelo servidor (uvicorn):
+        o processo passa a "drenando" no recebimento do sinal, e não só no fim do
+        desligamento. Só é possível na thread principal; fora dela não faz nada.
+        """
+        if threading.current_thread() is not threading.main_thread():
+            return
+        for sinal in (signal.SIGTERM, signal.SIGINT):
+            anterior = signal.getsignal(sinal)
+            if not callable(anterior):
+                continue
+
+            def handler(numero, frame, anterior=anterior):
+                self.marcar_drenando()
+                anterior(numero, frame)
+
+            signal.signal(sinal, handler)
+
+
+estado_servico = EstadoServico()
+
+
+@router.get("/live")
+async def vivo():
+    """Liveness: o processo está de pé e o event loop responde. Não consulta dependências."""
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+async def pronto():
+    """
+    Readiness: `200` depois do aquecimento do cache e `503` antes dele ou durante o
+    desligamento, para o balanceador só mandar tráfego a processos prontos.
+    """
+    corpo = {"status": estado_servico.fase, "aquecimento": estado_servico.aquecimento}
+    if not estado_servico.pronto:
+        return JSONResponse(status_code=503, content=corpo)
+    return corpo
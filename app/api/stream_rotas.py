@@ -0,0 +1,134 @@
+# app/api/stream_rotas.py
+import asyncio
+import json
+from typing import List
+
+from fastapi import APIRouter, HTTPException, Query, Request, WebSocket, WebSocketDisconnect, status
+from fastapi.responses import StreamingResponse
+
+from app.api.cotacao_rotas import _repo as cotacao_repo, _validar_par
+from app.api.cripto_rotas import _repo as cripto_repo
+from app.api.saude_rotas import estado_servico
+from app.core.config import settings
+from app.infra.stream import AssinanteLentoError, HubPrecos, PublicadorPrecos, TOPICOS_CRIPTO
+
+
+router = APIRouter(prefix="/cripto", tags=["Streaming"])
+
+_hub = HubPrecos(
+    tamanho_fila=settings.stream_tamanho_fila,
+    max_descartes=settings.stream_max_descartes,
+    max_assinantes=settings.stream_max_assinantes,
+)
+_publicador = PublicadorPrecos(
+    hub=_hub,
+    cotacao_repo=cotacao_repo,
+    cripto_repo=cripto_repo,
+    intervalo_segundos=settings.stream_intervalo_segundos,
+)
+
+# Intervalo do comentário de keep-alive do SSE (também usado para detectar desconexão e desligamento)
+_SSE_KEEPALIVE_SEGUNDOS = 15.0
+
+
+def _validar_topicos(topicos: List[str]) -> List[str]:
+    """
+    Valida tópicos de streaming: "USDT", "USDC" ou pares de câmbio "USD-BRL".
+    Raises HTTPException se algum for inválido.
+    """
+    validos = []
+    for topico in (t.strip().upper() for item in topicos for t in item.split(",")):
+        if not topico:
+            continue
+        if topico in TOPICOS_CRIPTO:
+            validos.append(topico)
+        else:
+            validos.append("-".join(_validar_par(topico)))
+    if not validos:
+        raise HTTPException(status_code=400, detail="Informe ao menos um tópico, ex: USDT,USD-BRL.")
+    return validos
+
+
+@router.websocket("/stream")
+async def stream_websocket(websocket: WebSocket, topicos: str = "USDT,USDC"):
+    """
+    Envia cada atualização de preço dos tópicos assinados (USDT, USDC, pares como USD-BRL).
+    O cliente pode trocar os tópicos enviando `{"topicos": ["USDT", "EUR-BRL"]}`.
+    """
+    try:
+        lista = _validar_topicos([topicos])
+    except HTTPException as exc:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=str(exc.detail))
+        return
+    if _hub.lotado():
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+        return
+
+    await websocket.accept()
+    assinatura = _hub.assinar(lista)
+
+    async def enviar():
+        while True:
+            await websocket.send_json(await assinatura.proxima())
+
+    async def receber():
+        while True:
+            try:
+                # Frames que não são JSON (ValueError) ou binários (KeyError/TypeError) não encerram a conexão
+                dados = await websocket.receive_json()
+                _hub.atualizar_topicos(assinatura, _validar_topicos(dados.get("topicos") or []))
+            except (HTTPException, ValueError, KeyError, AttributeError, TypeError):
+                await websocket.send_json({"erro": "Tópicos inválidos"})
+
+    tarefas = [asyncio.create_task(enviar()), asyncio.create_task(receber())]
+    try:
+        # Envio e recebimento rodam em tasks: desconexões e erros chegam como exceção da task
+        concluidas, _ = await asyncio.wait(tarefas, return_when=asyncio.FIRST_COMPLETED)
+        excecoes = [tarefa.exception() for tarefa in concluidas if not tarefa.cancelled()]
+        if not any(isinstance(exc, WebSocketDisconnect) for exc in excecoes):
+            # O cliente ainda está conectado: fecha com um código em vez de derrubar o socket
+            if any(isinstance(exc, AssinanteLentoError) for exc in excecoes):
+                await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Cliente lento")
+            else:
+                await websocket.close(code=status.WS_1011_INTERNAL_ERROR)
+    finally:
+        for tarefa in tarefas:
+            tarefa.cancel()
+        _hub.cancelar(assinatura)
+
+
+@router.get("/stream/sse")
+async def stream_sse(
+    request: Request,
+    topicos: List[str] = Query(["USDT,USDC"], description="Tópicos separados por vírgula, ex: USDT,USD-BRL"),
+):
+    """
+    Mesmo que `/cripto/stream`, via Server-Sent Events (evento `preco`).
+    """
+    lista = _validar_topicos(topicos)
+    if _hub.lotado():
+        raise HTTPException(status_code=503, detail="Limite de conexões de streaming atingido")
+
+    assinatura = _hub.assinar(lista)
+
+    async def eventos():
+        try:
+            # No desligamento o stream termina (em até um keep-alive) e o cliente
+            # reconecta em outro processo, sem segurar a drenagem até o timeout
+            while estado_servico.fase != "drenando" and not await request.is_disconnected():
+                try:
+                    mensagem = await assinatura.proxima(timeout=_SSE_KEEPALIVE_SEGUNDOS)
+                except AssinanteLentoError:
+                    break
+                if mensagem is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield f"event: preco\ndata: {json.dumps(mensagem)}\n\n"
+        finally:
+            _hub.cancelar(assinatura)
+
+    return StreamingResponse(
+        eventos(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -0,0 +1,88 @@
+# app/core/compressao.py
+import gzip
+import zlib
+from typing import Callable, Dict, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # opcional: sem o pacote só gzip é oferecido
+    brotli = None
+
+# Tipos de conteúdo que valem a compressão; imagens e arquivos já comprimidos ficam de fora.
+# SSE também: cada evento precisa chegar na hora, sem esperar o buffer do compressor
+_TIPOS_COMPRESSIVEIS = (
+    "application/json",
+    "application/x-ndjson",
+    "application/javascript",
+    "application/xml",
+)
+_TIPOS_NAO_COMPRESSIVEIS = ("text/event-stream",)
+
+Compressor = Tuple[Callable[[bytes], bytes], Callable[[], bytes]]
+
+
+def brotli_disponivel() -> bool:
+    return brotli is not None
+
+
+def tipo_compressivel(content_type: Optional[str]) -> bool:
+    """Indica se respostas com esse Content-Type devem ser comprimidas (texto e JSON)."""
+    if not content_type:
+        return False
+    tipo = content_type.partition(";")[0].strip().lower()
+    if tipo in _TIPOS_NAO_COMPRESSIVEIS:
+        return False
+    return (
+        tipo.startswith("text/")
+        or tipo in _TIPOS_COMPRESSIVEIS
+        or tipo.endswith("+json")
+        or tipo.endswith("+xml")
+    )
+
+
+def escolher_codificacao(accept_encoding: Optional[str], brotli_habilitado: bool = True) -> Optional[str]:
+    """
+    Escolhe a codificação ("br" ou "gzip") pelo header Accept-Encoding, respeitando
+    os pesos `q`; em empate prefere brotli. Retorna None se nenhuma for aceita.
+    """
+    if not accept_encoding:
+        return None
+    pesos: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        nome, _, parametros = item.partition(";")
+        peso = 1.0
+        parametro = parametros.strip().lower()
+        if parametro.startswith("q="):
+            try:
+                peso = float(parametro[2:])
+            except ValueError:
+                peso = 0.0
+        pesos[nome.strip().lower()] = peso
+
+    candidatas = ("br", "gzip") if brotli_habilitado and brotli is not None else ("gzip",)
+    escolhida, maior_peso = None, 0.0
+    for codificacao in candidatas:
+        peso = pesos.get(codificacao, pesos.get("*", 0.0))
+        if peso > maior_peso:
+            escolhida, maior_peso = codificacao, peso
+    return escolhida
+
+
+def comprimir(dados: bytes, codificacao: str, nivel: int) -> bytes:
+    """Comprime um corpo completo. O gzip sai com mtime zerado: mesmo corpo, mesmos bytes."""
+    if codificacao == "br":
+        return brotli.compress(dados, quality=nivel)
+    return gzip.compress(dados, compresslevel=nivel, mtime=0)
+
+
+def novo_compressor(codificacao: str, nivel: int) -> Compressor:
+    """
+    Compressor incremental para respostas em partes: retorna as funções
+    (comprimir_parte, finalizar), que devolvem os bytes já prontos para envio.
+    """
+    if codificacao == "br":
+        compressor = brotli.Compressor(quality=nivel)
+        return compressor.process, compressor.finish
+    # wbits=31: formato gzip (cabeçalho e CRC), compatível com `Content-Encoding: gzip`
+    compressor = zlib.compressobj(nivel, zlib.DEFLATED, 31)
+    return compressor.compress, compressor.flush
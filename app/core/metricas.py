@@ -0,0 +1,209 @@
+# app/core/metricas.py
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+# Buckets (em segundos) para latências de requisições e chamadas externas
+BUCKETS_LATENCIA = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Amostra = Tuple[Dict[str, str], float]
+
+
+def _formatar_labels(nomes: Sequence[str], valores: Sequence[str], extra: str = "") -> str:
+    pares = [f'{nome}="{_escapar(str(valor))}"' for nome, valor in zip(nomes, valores)]
+    if extra:
+        pares.append(extra)
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+
+def _escapar(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _formatar_valor(valor: float) -> str:
+    if valor == float("inf"):
+        return "+Inf"
+    if float(valor).is_integer():
+        return str(int(valor))
+    return repr(float(valor))
+
+
+class _Serie:
+    """Valor de uma métrica para uma combinação de labels (contador ou gauge)."""
+    __slots__ = ("valor",)
+
+    def __init__(self) -> None:
+        self.valor = 0.0
+
+    def inc(self, quantidade: float = 1.0) -> None:
+        self.valor += quantidade
+
+    def dec(self, quantidade: float = 1.0) -> None:
+        self.valor -= quantidade
+
+    def set(self, valor: float) -> None:
+        self.valor = valor
+
+
+class _SerieHistograma:
+    """Contagens por bucket de um histograma para uma combinação de labels."""
+    __slots__ = ("_limites", "contagens", "soma", "total")
+
+    def __init__(self, limites: Sequence[float]) -> None:
+        self._limites = limites
+        self.contagens = [0] * (len(limites) + 1)  # último = +Inf
+        self.soma = 0.0
+        self.total = 0
+
+    def observar(self, valor: float) -> None:
+        # Só o bucket do valor é incrementado; os acumulados são calculados na exportação
+        self.contagens[bisect_left(self._limites, valor)] += 1
+        self.soma += valor
+        self.total += 1
+
+
+class _Metrica:
+    tipo = ""
+
+    def __init__(self, nome: str, ajuda: str, labels: Sequence[str] = ()) -> None:
+        self.nome = nome
+        self.ajuda = ajuda
+        self.labels_nomes = tuple(labels)
+        self._series: Dict[Tuple[str, ...], object] = {}
+
+    def _nova_serie(self):
+        raise NotImplementedError
+
+    def labels(self, *valores: str):
+        """Série da combinação de labels (criada no primeiro uso e reaproveitada)."""
+        serie = self._series.get(valores)
+        if serie is None:
+            serie = self._series[valores] = self._nova_serie()
+        return serie
+
+    def exportar(self) -> List[str]:
+        linhas = [f"# HELP {self.nome} {self.ajuda}", f"# TYPE {self.nome} {self.tipo}"]
+        for valores, serie in list(self._series.items()):
+            linhas.extend(self._exportar_serie(valores, serie))
+        return linhas
+
+    def _exportar_serie(self, valores, serie) -> List[str]:
+        return [f"{self.nome}{_formatar_labels(self.labels_nomes, valores)} {_formatar_valor(serie.valor)}"]
+
+
+class Contador(_Metrica):
+    tipo = "counter"
+
+    def _nova_serie(self) -> _Serie:
+        return _Serie()
+
+
+class Gauge(_Metrica):
+    tipo = "gauge"
+
+    def _nova_serie(self) -> _Serie:
+        return _Serie()
+
+
+class Histograma(_Metrica):
+    tipo = "histogram"
+
+    def __init__(self, nome: str, ajuda: str, labels: Sequence[str] = (), buckets: Sequence[float] = BUCKETS_LATENCIA) -> None:
+        super().__init__(nome, ajuda, labels)
+        self._limites = tuple(sorted(buckets))
+
+    def _nova_serie(self) -> _SerieHistograma:
+        return _SerieHistograma(self._limites)
+
+    def _exportar_serie(self, valores, serie: _SerieHistograma) -> List[str]:
+        linhas = []
+        acumulado = 0
+        for limite, contagem in zip(self._limites + (float("inf"),), serie.contagens):
+            acumulado += contagem
+            le = f'le="{_formatar_valor(limite)}"'
+            linhas.append(f"{self.nome}_bucket{_formatar_labels(self.labels_nomes, valores, le)} {acumulado}")
+        labels = _formatar_labels(self.labels_nomes, valores)
+        linhas.append(f"{self.nome}_sum{labels} {_formatar_valor(serie.soma)}")
+        linhas.append(f"{self.nome}_count{labels} {serie.total}")
+        return linhas
+
+
+class RegistroMetricas:
+    """
+    Registro das métricas da aplicação, exportadas no formato texto do Prometheus.
+
+    Métricas do caminho quente (latência de requisições, chamadas externas, bcrypt)
+    são contadores simples em memória: um incremento ou um bisect por observação,
+    sem locks (tudo roda no event loop). Estados que já são contados em outros
+    lugares (cache, pool do banco, token buckets) são lidos por coletores só
+    quando `/metrics` é consultado.
+    """
+
+    def __init__(self) -> None:
+        self._metricas: Dict[str, _Metrica] = {}
+        self._coletores: List[Callable[[], Iterable[Tuple[str, str, str, Iterable[Amostra]]]]] = []
+
+    def _registrar(self, metrica: _Metrica) -> _Metrica:
+        existente = self._metricas.get(metrica.nome)
+        if existente is not None:
+            return existente
+        self._metricas[metrica.nome] = metrica
+        return metrica
+
+    def contador(self, nome: str, ajuda: str, labels: Sequence[str] = ()) -> Contador:
+        return self._registrar(Contador(nome, ajuda, labels))
+
+    def gauge(self, nome: str, ajuda: str, labels: Sequence[str] = ()) -> Gauge:
+        return self._registrar(Gauge(nome, ajuda, labels))
+
+    def histograma(
+        self, nome: str, ajuda: str, labels: Sequence[str] = (), buckets: Sequence[float] = BUCKETS_LATENCIA
+    ) -> Histograma:
+        return self._registrar(Histograma(nome, ajuda, labels, buckets))
+
+    def adicionar_coletor(self, coletor: Callable[[], Iterable[Tuple[str, str, str, Iterable[Amostra]]]]) -> None:
+        """
+        Registra uma função chamada a cada exportação que retorna
+        (nome, tipo, ajuda, [(labels, valor), ...]) para cada métrica.
+        """
+        self._coletores.append(coletor)
+
+    def exportar(self) -> str:
+        linhas: List[str] = []
+        for metrica in list(self._metricas.values()):
+            linhas.extend(metrica.exportar())
+        for coletor in self._coletores:
+            for nome, tipo, ajuda, amostras in coletor():
+                linhas.append(f"# HELP {nome} {ajuda}")
+                linhas.append(f"# TYPE {nome} {tipo}")
+                for labels, valor in amostras:
+                    linhas.append(f"{nome}{_formatar_labels(list(labels), list(labels.values()))} {_formatar_valor(valor)}")
+        return "\n".join(linhas) + "\n"
+
+
+registro = RegistroMetricas()
+
+requisicoes_duracao = registro.histograma(
+    "http_request_duration_seconds", "Latência das requisições HTTP por rota", ("metodo", "rota", "status")
+)
+requisicoes_em_andamento = registro.gauge(
+    "http_requests_in_progress", "Requisições HTTP em andamento", ("metodo",)
+)
+upstream_duracao = registro.histograma(
+    "upstream_request_duration_seconds", "Latência das chamadas às APIs externas", ("provider", "status")
+)
+upstream_erros = registro.contador(
+    "upstream_errors_total", "Chamadas às APIs externas sem resposta (timeout, conexão)", ("provider", "erro")
+)
+bcrypt_duracao = registro.histograma(
+    "bcrypt_duration_seconds", "Tempo de hash/verificação de senhas no pool do bcrypt", ("operacao",)
+)
+compressao_bytes = registro.contador(
+    "http_compression_bytes_total",
+    "Bytes das respostas comprimidas antes (entrada) e depois (saida) da compressão",
+    ("codificacao", "sentido"),
+)
+compressao_ignoradas = registro.contador(
+    "http_compression_skipped_total",
+    "Respostas que o cliente aceitaria comprimidas mas saíram sem compressão, por motivo",
+    ("motivo",),
+)
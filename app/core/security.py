@@ -1,9 +1,86 @@
 # app/core/security.py
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Callable, Optional, Tuple, TypeVar
 from jose import JWTError, jwt
 import bcrypt
 from app.core.config import settings
+from app.core.metricas import bcrypt_duracao
+
+T = TypeVar("T")
+
+
+def _cronometrar(fn: Callable[..., T], *args) -> Tuple[T, float]:
+    inicio = time.perf_counter()
+    resultado = fn(*args)
+    return resultado, time.perf_counter() - inicio
+
+
+class PoolHashSaturadoError(Exception):
+    """Fila do pool de hash de senhas cheia: a requisição deve ser recusada (503)."""
+
+
+class PoolHashSenhas:
+    """
+    Executa o bcrypt (≈100-300 ms de CPU por chamada) em threads dedicadas, fora
+    do event loop. O bcrypt libera o GIL, então as threads rodam em paralelo.
+    Com `max_workers` ocupados e `max_fila` aguardando, novas chamadas são
+    recusadas em vez de acumular latência para todas as outras.
+    """
+
+    def __init__(self, max_workers: int, max_fila: int) -> None:
+        self._max_workers = max(max_workers, 1)
+        self._limite = self._max_workers + max(max_fila, 0)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pendentes = 0
+        self.recusadas = 0
+
+    @property
+    def pendentes(self) -> int:
+        return self._pendentes
+
+    async def executar(self, fn: Callable[..., T], *args) -> T:
+        """
+        Executa `fn(*args)` no pool.
+        Raises PoolHashSaturadoError se já houver chamadas demais em andamento.
+        """
+        if self._pendentes >= self._limite:
+            self.recusadas += 1
+            raise PoolHashSaturadoError("Muitas autenticações simultâneas, tente novamente")
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._max_workers, thread_name_prefix="bcrypt"
+            )
+        loop = asyncio.get_running_loop()
+        futuro = self._executor.submit(_cronometrar, fn, *args)
+        self._pendentes += 1
+        # A vaga só é liberada quando a thread termina (ou a chamada sai da fila sem rodar):
+        # se quem aguarda for cancelado (cliente desconectou), o bcrypt continua ocupando o pool
+        futuro.add_done_callback(lambda _: self._liberar(loop))
+        resultado, duracao = await asyncio.wrap_future(futuro)
+        # Observado no event loop: as métricas não são compartilhadas com as threads
+        bcrypt_duracao.labels(fn.__name__).observar(duracao)
+        return resultado
+
+    def _liberar(self, loop: asyncio.AbstractEventLoop) -> None:
+        # Chamado na thread do bcrypt: o contador só é alterado no event loop
+        try:
+            loop.call_soon_threadsafe(self._decrementar)
+        except RuntimeError:  # event loop já encerrado
+            pass
+
+    def _decrementar(self) -> None:
+        self._pendentes -= 1
+
+    def fechar(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+pool_hash_senhas = PoolHashSenhas(settings.password_hash_workers, settings.password_hash_max_fila)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -20,11 +97,33 @@ def get_password_hash(password: str) -> str:
     """
     Gera o hash de uma senha usando bcrypt diretamente.
     """
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=settings.bcrypt_rounds)
     hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
     return hashed.decode('utf-8')
 
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """
+    Indica se o hash foi gerado com um custo diferente do configurado em `bcrypt_rounds`.
+    Formato do hash: $2b$<custo>$<salt+hash>
+    """
+    try:
+        custo = int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return True
+    return custo != settings.bcrypt_rounds
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Como `verify_password`, executado no pool de hash (não bloqueia o event loop)."""
+    return await pool_hash_senhas.executar(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """Como `get_password_hash`, executado no pool de hash (não bloqueia o event loop)."""
+    return await pool_hash_senhas.executar(get_password_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """
     Cria um token JWT com os dados fornecidos.
@@ -0,0 +1,35 @@
+# app/domain/historico_models.py
+from datetime import datetime
+from sqlalchemy import Column, Date, DateTime, Float, String
+from app.infra.database import Base
+
+
+class TaxaHistorica(Base):
+    """
+    Taxa diária de uma moeda em relação à moeda base (ex: 1 EUR = X BRL em 2024-01-02).
+    A chave primária (base, moeda, data) atende às consultas por intervalo de datas.
+    """
+    __tablename__ = "taxas_historicas"
+
+    moeda_base = Column(String(3), primary_key=True)
+    moeda = Column(String(3), primary_key=True)
+    data = Column(Date, primary_key=True)
+    taxa = Column(Float, nullable=False)
+
+    def __repr__(self):
+        return f"<TaxaHistorica({self.moeda_base}->{self.moeda} {self.data}: {self.taxa})>"
+
+
+class DiaHistoricoConsultado(Base):
+    """
+    Dia já buscado na API externa para a moeda base, com ou sem cotação
+    (fins de semana e feriados não têm taxa). Dias registrados aqui não são buscados de novo.
+    """
+    __tablename__ = "historico_dias_consultados"
+
+    moeda_base = Column(String(3), primary_key=True)
+    data = Column(Date, primary_key=True)
+    consultado_em = Column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<DiaHistoricoConsultado({self.moeda_base} {self.data})>"
@@ -1,6 +1,8 @@
 # app/domain/models.py
-from datetime import datetime
-from typing import Literal
+import sys
+from array import array
+from datetime import date, datetime
+from typing import Dict, List, Literal, Mapping, Tuple
 
 from pydantic import BaseModel
 
@@ -13,3 +15,112 @@ class Cotacao(BaseModel):
     taxa_cambio: float
     data_cotacao: datetime
     fonte: Literal["cache", "api_externa"]
+    obsoleto: bool = False  # True quando servida do cache após o TTL, enquanto é renovada
+
+
+class ErroCotacao(BaseModel):
+    par: str  # Ex: "USD-BRL"
+    erro: str
+
+
+class CotacaoLote(BaseModel):
+    """Resultado parcial de um lote: pares resolvidos e erros por par."""
+    cotacoes: List[Cotacao]
+    erros: List[ErroCotacao]
+
+
+class CotacaoLoteRequest(BaseModel):
+    pares: List[str]  # Ex: ["USD-BRL", "EUR-BRL"]
+
+
+class PontoHistorico(BaseModel):
+    data: date
+    taxa_cambio: float
+
+
+class SerieHistorica(BaseModel):
+    """Taxas diárias de um par; dias sem cotação (fins de semana, feriados) não aparecem."""
+    moeda_origem: str
+    moeda_destino: str
+    inicio: date
+    fim: date
+    pontos: List[PontoHistorico]
+    dias_buscados_api: int  # dias pedidos à API externa (lacunas próximas são buscadas juntas)
+
+
+class TabelaTaxas:
+    """
+    Taxas de todas as moedas em relação a uma moeda base (ex: 1 EUR = X moeda),
+    guardadas de forma compacta em um array de floats.
+    Qualquer par (inclusive o inverso) é derivado localmente: origem->destino = taxa[destino] / taxa[origem].
+    """
+    __slots__ = ("base", "_indice", "_taxas")
+
+    def __init__(self, base: str, taxas: Mapping[str, float]) -> None:
+        self.base = base.upper()
+        moedas = sorted({self.base, *(m.upper() for m in taxas)})
+        normalizadas = {m.upper(): float(v) for m, v in taxas.items()}
+        normalizadas[self.base] = 1.0
+        self._indice: Dict[str, int] = {m: i for i, m in enumerate(moedas)}
+        self._taxas = array("d", (normalizadas[m] for m in moedas))
+
+    @property
+    def moedas(self) -> Tuple[str, ...]:
+        return tuple(self._indice)
+
+    def para_dict(self) -> Dict[str, object]:
+        """Representação serializável (JSON) da tabela."""
+        return {"base": self.base, "taxas": dict(zip(self._indice, self._taxas))}
+
+    @classmethod
+    def de_dict(cls, dados: Mapping[str, object]) -> "TabelaTaxas":
+        return cls(dados["base"], dados["taxas"])
+
+    def __sizeof__(self) -> int:
+        return object.__sizeof__(self) + sys.getsizeof(self._indice) + sys.getsizeof(self._taxas)
+
+    def __contains__(self, moeda: str) -> bool:
+        return moeda.upper() in self._indice
+
+    def taxa(self, moeda_origem: str, moeda_destino: str) -> float:
+        """
+        Calcula a taxa origem->destino a partir da moeda base.
+        Raises ValueError se alguma das moedas não estiver na tabela.
+        """
+        moeda_origem = moeda_origem.upper()
+        moeda_destino = moeda_destino.upper()
+        try:
+            i = self._indice[moeda_origem]
+            j = self._indice[moeda_destino]
+        except KeyError:
+            raise ValueError(
+                f"Cotação {moeda_origem}->{moeda_destino} não encontrada na tabela de taxas."
+            ) from None
+        return self._taxas[j] / self._taxas[i]
+
+
+class PrecoCripto:
+    """
+    Preço de um ativo cripto e a fonte que o forneceu (ex: "Binance API" ou o provider
+    que respondeu no modo hedge). Ficam no mesmo valor do cache: são gravados, expiram
+    e são removidos juntos.
+    """
+    __slots__ = ("valor", "fonte")
+
+    def __init__(self, valor: float, fonte: str) -> None:
+        self.valor = float(valor)
+        self.fonte = fonte
+
+    def para_dict(self) -> Dict[str, object]:
+        """Representação serializável (JSON) do preço."""
+        return {"valor": self.valor, "fonte": self.fonte}
+
+    @classmethod
+    def de_dict(cls, dados: Mapping[str, object]) -> "PrecoCripto":
+        return cls(dados["valor"], dados["fonte"])
+
+    def __sizeof__(self) -> int:
+        return object.__sizeof__(self) + sys.getsizeof(self.valor) + sys.getsizeof(self.fonte)
+
+    def __repr__(self) -> str:
+        return f"PrecoCripto(valor={self.valor!r}, fonte={self.fonte!r})"
@@ -1,5 +1,7 @@
 # app/domain/ports.py
 from abc import ABC, abstractmethod
+from datetime import date
+from typing import Dict, Iterable, Optional
 
 from .models import Cotacao
 
@@ -13,6 +15,27 @@ class CotacaoProvider(ABC):
         """
         raise NotImplementedError
 
+    @abstractmethod
+    async def buscar_tabela(self, moeda_base: str) -> Dict[str, float]:
+        """
+        Busca na API externa as taxas de todas as moedas em relação a `moeda_base`.
+        Retorna um dicionário moeda -> taxa.
+        """
+        raise NotImplementedError
+
+
+class CotacaoHistoricaProvider(ABC):
+    @abstractmethod
+    async def buscar_serie(
+        self, moeda_base: str, inicio: date, fim: date
+    ) -> Dict[date, Dict[str, float]]:
+        """
+        Busca na API externa as taxas diárias de todas as moedas em relação a
+        `moeda_base` entre `inicio` e `fim` (inclusive).
+        Retorna data -> {moeda -> taxa}; dias sem cotação (fins de semana, feriados) ficam de fora.
+        """
+        raise NotImplementedError
+
 
 class CotacaoRepository(ABC):
     @abstractmethod
@@ -22,3 +45,40 @@ class CotacaoRepository(ABC):
         usando cache quando possível.
         """
         raise NotImplementedError
+
+
+class CacheCompartilhado(ABC):
+    """
+    Cache compartilhado entre processos/instâncias (ex: Redis), com TTL por chave.
+    Os valores são bytes já serializados.
+    """
+
+    @abstractmethod
+    async def get(self, chave: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_many(self, chaves: Iterable[str]) -> Dict[str, bytes]:
+        """Busca várias chaves de uma vez; chaves ausentes ficam de fora do resultado."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def set(self, chave: str, valor: bytes, ttl_seconds: int) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def set_many(self, itens: Dict[str, bytes], ttl_seconds: int) -> None:
+        raise NotImplementedError
+
+    async def adquirir_trava(self, chave: str, dono: str, ttl_seconds: float) -> bool:
+        """
+        Tenta reservar `chave` para `dono` por até `ttl_seconds` (ex: uma renovação por vez
+        entre processos). Sem suporte a travas, todo processo a obtém.
+        """
+        return True
+
+    async def liberar_trava(self, chave: str, dono: str) -> None:
+        """Libera a trava, se ainda pertencer a `dono`."""
+
+    async def fechar(self) -> None:
+        """Libera conexões, se houver."""
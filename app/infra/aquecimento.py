@@ -0,0 +1,83 @@
+# app/infra/aquecimento.py
+import asyncio
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app.infra.cotacao_repo import CotacaoRepositoryComCache
+from app.infra.cripto_repo import CriptoRepositoryComCache
+from app.infra.matriz import PublicadorMatriz
+
+
+def separar_lista(valor: str) -> List[str]:
+    """Itens de uma configuração separada por vírgulas, em maiúsculas e sem vazios."""
+    return [item.strip().upper() for item in valor.split(",") if item.strip()]
+
+
+class Aquecimento:
+    """
+    Carrega o cache de um processo antes de ele ser marcado como pronto: a tabela de taxas
+    (com a matriz e o JSON dos pares mais consultados) e os preços cripto.
+    As buscas rodam em paralelo e passam pelos repositórios, então com o cache
+    compartilhado (Redis) os workers que sobem depois leem o que o primeiro buscou.
+    Falhas não impedem a subida: o processo atende com o que estiver em cache.
+    """
+
+    def __init__(
+        self,
+        cotacao_repo: CotacaoRepositoryComCache,
+        cripto_repo: CriptoRepositoryComCache,
+        matriz: Optional[PublicadorMatriz] = None,
+        pares: Sequence[str] = (),
+        simbolos_cripto: Sequence[str] = (),
+    ) -> None:
+        self._cotacao_repo = cotacao_repo
+        self._cripto_repo = cripto_repo
+        self._matriz = matriz
+        self._pares: List[Tuple[str, str]] = [tuple(p.split("-", 1)) for p in pares if "-" in p]
+        self._simbolos = list(simbolos_cripto)
+        self.resultado: Optional[Dict[str, object]] = None
+
+    async def executar(self, timeout_seconds: float) -> Dict[str, object]:
+        """Executa o aquecimento por até `timeout_seconds` e retorna o resumo (também em `resultado`)."""
+        inicio = time.perf_counter()
+        erros: List[str] = []
+        tarefas = [asyncio.ensure_future(self._aquecer_cotacoes(erros))]
+        if self._simbolos:
+            tarefas.append(asyncio.ensure_future(self._aquecer_cripto(erros)))
+
+        concluidas, pendentes = await asyncio.wait(tarefas, timeout=timeout_seconds)
+        for tarefa in pendentes:
+            tarefa.cancel()
+        if pendentes:
+            erros.append(f"Aquecimento interrompido após {timeout_seconds:g}s.")
+        for tarefa in concluidas:
+            if tarefa.exception() is not None:
+                erros.append(str(tarefa.exception()) or type(tarefa.exception()).__name__)
+
+        self.resultado = {
+            "concluido": not erros,
+            "duracao_ms": round((time.perf_counter() - inicio) * 1000, 1),
+            "pares": len(self._pares),
+            "cripto": self._simbolos,
+            "erros": erros,
+        }
+        return self.resultado
+
+    async def _aquecer_cotacoes(self, erros: List[str]) -> None:
+        entry, _ = await self._cotacao_repo.obter_entrada_tabela()
+        if self._matriz is not None:
+            self._matriz.publicar(entry)
+        # As próximas requisições leem a tabela do cache: o JSON é codificado com fonte "cache"
+        for moeda_origem, moeda_destino in self._pares:
+            try:
+                self._cotacao_repo.cotacao_json(moeda_origem, moeda_destino, entry, "cache")
+            except ValueError as exc:
+                erros.append(str(exc))
+
+    async def _aquecer_cripto(self, erros: List[str]) -> None:
+        entries = await self._cripto_repo.obter_precos(self._simbolos)
+        erros.extend(
+            f"Cotação {simbolo}/{self._cripto_repo.MOEDA_DESTINO} não encontrada"
+            for simbolo in self._simbolos
+            if simbolo not in entries
+        )
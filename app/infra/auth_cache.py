@@ -0,0 +1,86 @@
+# app/infra/auth_cache.py
+import hashlib
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+from app.core.config import settings
+from app.domain.user_models import User
+from app.infra.cache import CotacaoCache
+
+
+@dataclass(frozen=True)
+class UsuarioAutenticado:
+    """
+    Cópia imutável dos campos do usuário usados após a autenticação. É o que fica no
+    cache: instâncias do ORM presas a uma sessão já fechada não são compartilhadas
+    entre requisições. Alterações passam pelo `UserRepository`, que relê o registro.
+    """
+
+    id: int
+    email: str
+    full_name: Optional[str]
+    is_active: bool
+    created_at: Optional[datetime]
+
+    @classmethod
+    def de_modelo(cls, user: User) -> "UsuarioAutenticado":
+        return cls(
+            id=user.id,
+            email=user.email,
+            full_name=user.full_name,
+            is_active=user.is_active,
+            created_at=user.created_at,
+        )
+
+
+class CacheAutenticacao:
+    """
+    Cache em memória do caminho de autenticação, com TTL curto:
+
+    - tokens: payload do JWT já validado, pela hash SHA-256 do token (o token
+      em si não fica em memória). Respeita o `exp` do token mesmo dentro do TTL.
+    - usuários: cópia imutável do usuário (`UsuarioAutenticado`) por id, para não consultar o banco a cada
+      requisição autenticada. `invalidar_usuario` remove o registro na hora
+      (ex: ao desativar o usuário); em outros processos ele vale até o TTL.
+    """
+
+    def __init__(self, ttl_seconds: int, max_entradas: int) -> None:
+        self._tokens = CotacaoCache(ttl_seconds, max_entradas=max_entradas)
+        self._usuarios = CotacaoCache(ttl_seconds, max_entradas=max_entradas)
+
+    @staticmethod
+    def _chave_token(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def obter_token(self, token: str) -> Optional[dict]:
+        entry = self._tokens.get_chave(self._chave_token(token))
+        if entry is None:
+            return None
+        payload = entry.valor
+        if payload.get("exp") is not None and payload["exp"] <= time.time():
+            self._tokens.remover_chave(self._chave_token(token))
+            return None
+        return payload
+
+    def guardar_token(self, token: str, payload: dict) -> None:
+        self._tokens.set_chave(self._chave_token(token), payload)
+
+    def obter_usuario(self, user_id: int) -> Optional[UsuarioAutenticado]:
+        entry = self._usuarios.get_chave(str(user_id))
+        return entry.valor if entry else None
+
+    def guardar_usuario(self, user: User) -> UsuarioAutenticado:
+        usuario = UsuarioAutenticado.de_modelo(user)
+        self._usuarios.set_chave(str(usuario.id), usuario)
+        return usuario
+
+    def invalidar_usuario(self, user_id: int) -> None:
+        self._usuarios.remover_chave(str(user_id))
+
+    def metricas(self) -> dict:
+        return {"tokens": self._tokens.metricas(), "usuarios": self._usuarios.metricas()}
+
+
+cache_autenticacao = CacheAutenticacao(settings.auth_cache_ttl_seconds, settings.auth_cache_max_entradas)
@@ -1,71 +1,223 @@
 # app/infra/cache.py
-from dataclasses import dataclass
-from datetime import datetime, timedelta
+import heapq
+import sys
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from itertools import count
 from threading import RLock
-from typing import Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 
-@dataclass
 class CacheEntry:
-    valor: float
-    atualizado_em: datetime
+    """
+    Entrada do cache. A idade é medida com relógio monotônico (imune a ajustes
+    do relógio do sistema); o horário de parede só é usado para exibição.
+    """
+    __slots__ = ("valor", "criado_em", "_epoch")
+
+    def __init__(self, valor: Any, criado_em: float, epoch: float) -> None:
+        self.valor = valor  # float (par de moedas) ou TabelaTaxas (tabela por moeda base)
+        self.criado_em = criado_em  # time.monotonic() do armazenamento
+        self._epoch = epoch  # time.time() de quando o valor foi obtido
+
+    @property
+    def atualizado_em(self) -> datetime:
+        """Data em que o valor foi obtido, em UTC e com fuso explícito (serializada com offset)."""
+        return datetime.fromtimestamp(self._epoch, tz=timezone.utc)
+
+    def __repr__(self) -> str:
+        return f"CacheEntry(valor={self.valor!r}, atualizado_em={self.atualizado_em!r})"
 
 
 class CotacaoCache:
     """
     Cache para armazenar cotações com expiração baseada em TTL (Time To Live).
+
+    - TTL (soft): até ele a entrada é considerada atualizada.
+    - TTL + stale_ttl (hard): entre os dois a entrada ainda pode ser servida
+      como obsoleta enquanto é renovada em background; depois disso é descartada.
+    - refresh_ahead_ratio: fração do TTL a partir da qual vale renovar a entrada
+      antes de expirar (1.0 desativa a renovação antecipada).
+    - max_entradas / max_bytes: limites de memória; ao excedê-los as entradas
+      menos usadas recentemente (LRU) são removidas (0 desativa o limite).
+
+    Entradas que passam do hard TTL são removidas por um heap de expiração
+    a cada escrita, sem varrer o cache inteiro.
     """
-    def __init__(self, ttl_seconds: int) -> None:
+    def __init__(
+        self,
+        ttl_seconds: int,
+        stale_ttl_seconds: int = 0,
+        refresh_ahead_ratio: float = 1.0,
+        max_entradas: int = 0,
+        max_bytes: int = 0,
+    ) -> None:
         self._ttl = ttl_seconds
-        self._data: Dict[str, CacheEntry] = {}
+        self._hard_ttl = ttl_seconds + max(stale_ttl_seconds, 0)
+        self._refresh_ahead = ttl_seconds * min(max(refresh_ahead_ratio, 0.0), 1.0)
+        self._max_entradas = max_entradas
+        self._max_bytes = max_bytes
+        self._data: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._tamanhos: Dict[str, int] = {}
+        self._bytes = 0
+        self._expiracoes: List[Tuple[float, int, str, CacheEntry]] = []
+        self._seq = count()
         self._lock = RLock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expiradas = 0
+
+    @property
+    def hard_ttl_seconds(self) -> int:
+        return self._hard_ttl
 
     def _key(self, moeda_origem: str, moeda_destino: str) -> str:
         return f"{moeda_origem.upper()}->{moeda_destino.upper()}"
 
+    def _idade(self, entry: CacheEntry) -> float:
+        return time.monotonic() - entry.criado_em
+
     def _is_valid(self, entry: CacheEntry) -> bool:
-        agora = datetime.utcnow()
-        return agora - entry.atualizado_em <= timedelta(seconds=self._ttl)
+        return self._idade(entry) <= self._ttl
 
-    def get(self, moeda_origem: str, moeda_destino: str) -> Optional[CacheEntry]:
+    def _is_servivel(self, entry: CacheEntry) -> bool:
+        return self._idade(entry) <= self._hard_ttl
+
+    def esta_obsoleto(self, entry: CacheEntry) -> bool:
+        """Indica se a entrada já passou do TTL (soft) e está sendo servida obsoleta."""
+        return not self._is_valid(entry)
+
+    def validade(self, entry: CacheEntry) -> Tuple[float, float]:
+        """Segundos que faltam para a entrada passar do TTL e do hard TTL (0 se já passou)."""
+        idade = self._idade(entry)
+        return max(self._ttl - idade, 0.0), max(self._hard_ttl - idade, 0.0)
+
+    def deve_renovar(self, entry: CacheEntry) -> bool:
+        """Indica se a entrada está obsoleta ou perto de expirar e deve ser renovada."""
+        return self._idade(entry) >= self._refresh_ahead
+
+    def get(
+        self,
+        moeda_origem: str,
+        moeda_destino: str,
+        permitir_obsoleto: bool = False,
+    ) -> Optional[CacheEntry]:
         """
         Recupera uma cotação do cache se válida, caso contrário retorna None.
+        Com `permitir_obsoleto=True` também retorna entradas entre o TTL e o hard TTL.
         """
-        key = self._key(moeda_origem, moeda_destino)
+        return self.get_chave(self._key(moeda_origem, moeda_destino), permitir_obsoleto)
+
+    def set(self, moeda_origem: str, moeda_destino: str, valor: float) -> CacheEntry:
+        """
+        Armazena uma nova cotação no cache.
+        """
+        return self.set_chave(self._key(moeda_origem, moeda_destino), valor)
+
+    def get_chave(self, key: str, permitir_obsoleto: bool = False) -> Optional[CacheEntry]:
+        """Como `get`, mas para uma chave arbitrária (ex: tabela de taxas de uma moeda base)."""
         with self._lock:
             entry = self._data.get(key)
             if not entry:
+                self.misses += 1
                 return None
-            if not self._is_valid(entry):
-                self._data.pop(key, None)
+            if not self._is_servivel(entry):
+                self._remover(key)
+                self.expiradas += 1
+                self.misses += 1
                 return None
+            if not permitir_obsoleto and not self._is_valid(entry):
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
             return entry
 
-    def set(self, moeda_origem: str, moeda_destino: str, valor: float) -> CacheEntry:
+    def set_chave(self, key: str, valor: Any, atualizado_em: Optional[datetime] = None) -> CacheEntry:
         """
-        Armazena uma nova cotação no cache.
+        Como `set`, mas para uma chave arbitrária.
+        `atualizado_em` preserva a data original de um valor vindo de outro cache.
         """
-        key = self._key(moeda_origem, moeda_destino)
-        entry = CacheEntry(valor=valor, atualizado_em=datetime.utcnow())
+        agora_mono = time.monotonic()
+        agora = time.time()
+        if atualizado_em is None:
+            epoch = agora
+        else:
+            # Datas sem fuso são tratadas como UTC
+            if atualizado_em.tzinfo is None:
+                atualizado_em = atualizado_em.replace(tzinfo=timezone.utc)
+            epoch = atualizado_em.timestamp()
+        entry = CacheEntry(valor=valor, criado_em=agora_mono - max(agora - epoch, 0.0), epoch=epoch)
+        tamanho = sys.getsizeof(key) + sys.getsizeof(valor)
+
         with self._lock:
+            self._remover(key)
             self._data[key] = entry
+            self._tamanhos[key] = tamanho
+            self._bytes += tamanho
+            heapq.heappush(self._expiracoes, (entry.criado_em + self._hard_ttl, next(self._seq), key, entry))
+            self._limpar_expirados(agora_mono)
+            self._aplicar_limites()
         return entry
 
+    def remover_chave(self, key: str) -> bool:
+        """Remove uma entrada (ex: invalidação explícita). Retorna se ela existia."""
+        with self._lock:
+            existia = key in self._data
+            self._remover(key)
+            return existia
+
+    def limpar_expirados(self) -> int:
+        """Remove as entradas que passaram do hard TTL. Retorna quantas foram removidas."""
+        with self._lock:
+            return self._limpar_expirados(time.monotonic())
+
+    def _limpar_expirados(self, agora_mono: float) -> int:
+        removidas = 0
+        while self._expiracoes and self._expiracoes[0][0] < agora_mono:
+            _, _, key, entry = heapq.heappop(self._expiracoes)
+            # Itens do heap de entradas já sobrescritas ou removidas são apenas descartados
+            if self._data.get(key) is entry:
+                self._remover(key)
+                removidas += 1
+        self.expiradas += removidas
+
+        # Compacta o heap se sobrescritas acumularam muitos itens órfãos
+        if len(self._expiracoes) > 2 * len(self._data) + 64:
+            self._expiracoes = [
+                item for item in self._expiracoes if self._data.get(item[2]) is item[3]
+            ]
+            heapq.heapify(self._expiracoes)
+        return removidas
+
+    def _aplicar_limites(self) -> None:
+        while self._data and (
+            (self._max_entradas and len(self._data) > self._max_entradas)
+            or (self._max_bytes and self._bytes > self._max_bytes)
+        ):
+            key = next(iter(self._data))  # menos usada recentemente
+            self._remover(key)
+            self.evictions += 1
+
+    def _remover(self, key: str) -> None:
+        if self._data.pop(key, None) is not None:
+            self._bytes -= self._tamanhos.pop(key, 0)
+
     def get_all(self) -> Dict[str, CacheEntry]:
         """Retorna todas as entradas válidas do cache."""
         with self._lock:
-            # Remove entradas expiradas e retorna apenas as válidas
-            valid_entries = {}
-            expired_keys = []
-            
-            for key, entry in self._data.items():
-                if self._is_valid(entry):
-                    valid_entries[key] = entry
-                else:
-                    expired_keys.append(key)
-            
-            # Limpa entradas expiradas
-            for key in expired_keys:
-                self._data.pop(key, None)
-            
-            return valid_entries
+            self._limpar_expirados(time.monotonic())
+            return {key: entry for key, entry in self._data.items() if self._is_valid(entry)}
+
+    def metricas(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entradas": len(self._data),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expiradas": self.expiradas,
+            }
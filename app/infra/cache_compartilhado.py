@@ -0,0 +1,258 @@
+# app/infra/cache_compartilhado.py
+import asyncio
+import json
+import uuid
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from app.core.config import settings
+from app.domain.portas import CacheCompartilhado
+from app.infra.cache import CacheEntry, CotacaoCache
+
+
+class CacheRedis(CacheCompartilhado):
+    """
+    Cache compartilhado em um servidor compatível com o protocolo Redis.
+    Aceita um cliente já criado (ex: `fakeredis.aioredis.FakeRedis()` em testes locais).
+    """
+
+    def __init__(self, cliente, prefixo: str = "cotacao:") -> None:
+        self._cliente = cliente
+        self._prefixo = prefixo
+
+    @classmethod
+    def from_url(cls, url: str, prefixo: str = "cotacao:") -> "CacheRedis":
+        # Dependência opcional: só é necessária com cache_backend="redis"
+        from redis import asyncio as redis_asyncio
+
+        return cls(redis_asyncio.from_url(url), prefixo)
+
+    async def get(self, chave: str) -> Optional[bytes]:
+        return await self._cliente.get(self._prefixo + chave)
+
+    async def get_many(self, chaves: Iterable[str]) -> Dict[str, bytes]:
+        chaves = list(chaves)
+        if not chaves:
+            return {}
+        valores = await self._cliente.mget([self._prefixo + c for c in chaves])
+        return {c: v for c, v in zip(chaves, valores) if v is not None}
+
+    async def set(self, chave: str, valor: bytes, ttl_seconds: int) -> None:
+        await self._cliente.set(self._prefixo + chave, valor, ex=ttl_seconds)
+
+    async def set_many(self, itens: Dict[str, bytes], ttl_seconds: int) -> None:
+        if not itens:
+            return
+        async with self._cliente.pipeline(transaction=False) as pipe:
+            for chave, valor in itens.items():
+                pipe.set(self._prefixo + chave, valor, ex=ttl_seconds)
+            await pipe.execute()
+
+    async def adquirir_trava(self, chave: str, dono: str, ttl_seconds: float) -> bool:
+        # SET NX com expiração: se o dono cair no meio da renovação, a trava some sozinha
+        return bool(
+            await self._cliente.set(self._prefixo + chave, dono, nx=True, px=max(int(ttl_seconds * 1000), 1))
+        )
+
+    async def liberar_trava(self, chave: str, dono: str) -> None:
+        # Só apaga a própria trava (ela pode ter expirado e sido reservada por outro processo)
+        atual = await self._cliente.get(self._prefixo + chave)
+        if atual is not None and atual.decode() == dono:
+            await self._cliente.delete(self._prefixo + chave)
+
+    async def fechar(self) -> None:
+        await self._cliente.aclose()
+
+
+@lru_cache(maxsize=None)
+def obter_cache_compartilhado() -> Optional[CacheCompartilhado]:
+    """
+    Cache compartilhado configurado em `cache_backend` (um por processo).
+    Com "memoria" (padrão) não há segunda camada: cada processo usa só o próprio cache.
+    """
+    backend = settings.cache_backend.lower()
+    if backend == "redis":
+        return CacheRedis.from_url(settings.redis_url, settings.redis_prefixo)
+    return None
+
+
+# Intervalo entre leituras do L2 enquanto outro processo renova uma chave que não está no L1
+_ESPERA_TRAVA_SECONDS = 0.05
+
+
+class CacheDuasCamadas:
+    """
+    Consulta primeiro o cache do processo (L1) e, em caso de miss, o cache
+    compartilhado (L2); escritas vão para as duas camadas. Falhas no L2 são
+    tratadas como miss para não derrubar a requisição.
+
+    Renovações (`renovar`) também passam pelo L2: um valor mais novo gravado por
+    outro processo é adotado sem chamada externa e, com a trava no L2, só um
+    processo por vez busca o valor na origem.
+    """
+
+    def __init__(
+        self,
+        l1: CotacaoCache,
+        l2: Optional[CacheCompartilhado] = None,
+        codificar: Callable[[Any], Any] = lambda valor: valor,
+        decodificar: Callable[[Any], Any] = lambda valor: valor,
+        trava_ttl_seconds: Optional[float] = None,
+    ) -> None:
+        self.l1 = l1
+        self._l2 = l2
+        self._codificar = codificar
+        self._decodificar = decodificar
+        # A trava dura no máximo o prazo de uma chamada externa (todas as tentativas)
+        self._trava_ttl = trava_ttl_seconds if trava_ttl_seconds is not None else settings.resiliencia_prazo_seconds
+        self._dono = uuid.uuid4().hex
+        self.hits_l2 = 0
+        self.misses_l2 = 0
+        self.erros_l2 = 0
+        self.adotadas_l2 = 0  # renovações resolvidas com o valor de outro processo
+        self.renovacoes_cedidas = 0  # renovações deixadas para o processo com a trava
+
+    def esta_obsoleto(self, entry: CacheEntry) -> bool:
+        return self.l1.esta_obsoleto(entry)
+
+    def deve_renovar(self, entry: CacheEntry) -> bool:
+        return self.l1.deve_renovar(entry)
+
+    async def get_chave(self, key: str, permitir_obsoleto: bool = False) -> Optional[CacheEntry]:
+        entries = await self.get_many([key], permitir_obsoleto)
+        return entries.get(key)
+
+    async def get_many(self, keys: Iterable[str], permitir_obsoleto: bool = False) -> Dict[str, CacheEntry]:
+        """Busca várias chaves: as ausentes no L1 são lidas do L2 em uma única ida (MGET)."""
+        entries: Dict[str, CacheEntry] = {}
+        faltantes = []
+        for key in keys:
+            entry = self.l1.get_chave(key, permitir_obsoleto)
+            if entry:
+                entries[key] = entry
+            else:
+                faltantes.append(key)
+
+        if not faltantes or self._l2 is None:
+            return entries
+
+        lidos = await self._ler_l2(faltantes)
+        self.misses_l2 += len(faltantes) - len(lidos)
+        for key, (atualizado_em, valor) in lidos.items():
+            self.l1.set_chave(key, valor, atualizado_em=atualizado_em)
+            entry = self.l1.get_chave(key, permitir_obsoleto)
+            if entry:
+                self.hits_l2 += 1
+                entries[key] = entry
+        return entries
+
+    async def _ler_l2(self, keys: Iterable[str]) -> Dict[str, Tuple[datetime, Any]]:
+        """Valores do L2 já decodificados, com a data em que foram obtidos na origem."""
+        try:
+            brutos = await self._l2.get_many(keys)
+        except Exception:
+            self.erros_l2 += 1
+            return {}
+        lidos = {}
+        for key, bruto in brutos.items():
+            try:
+                dados = json.loads(bruto)
+                lidos[key] = (datetime.fromtimestamp(dados["t"], tz=timezone.utc), self._decodificar(dados["v"]))
+            except (ValueError, KeyError, TypeError):
+                self.erros_l2 += 1
+        return lidos
+
+    async def _adotar_do_l2(self, key: str, atual: Optional[CacheEntry]) -> Optional[CacheEntry]:
+        """Copia para o L1 o valor do L2, se for mais novo que `atual`; retorna a entrada adotada."""
+        lido = (await self._ler_l2([key])).get(key)
+        if lido is None:
+            return None
+        atualizado_em, valor = lido
+        if atual is not None and atualizado_em <= atual.atualizado_em:
+            return None
+        return self.l1.set_chave(key, valor, atualizado_em=atualizado_em)
+
+    async def renovar(
+        self, key: str, buscar: Callable[[], Awaitable[Any]], atual: Optional[CacheEntry] = None
+    ) -> Tuple[Optional[CacheEntry], bool]:
+        """
+        Renova `key`, cuja entrada atual no L1 é `atual` (obsoleta, perto de expirar ou None):
+
+        1. se o L2 tiver um valor mais novo que ainda não precisa de renovação, ele é adotado;
+        2. senão, quem obtiver a trava no L2 chama `buscar` e grava nas duas camadas;
+        3. sem a trava, outro processo já está buscando: com `atual` servível ele continua
+           sendo usado; sem ele, espera o valor aparecer no L2 (até o TTL da trava) e só
+           então busca por conta própria.
+
+        Retorna (entrada, nova): `nova` indica se o L1 passou a ter outro valor.
+        Raises as exceções de `buscar`.
+        """
+        if self._l2 is None:
+            return await self.set_chave(key, await buscar()), True
+
+        adotada = await self._adotar_do_l2(key, atual)
+        if adotada is not None and not self.l1.deve_renovar(adotada):
+            self.adotadas_l2 += 1
+            return adotada, True
+        atual = adotada or atual
+
+        chave_trava = f"trava:{key}"
+        try:
+            com_trava = await self._l2.adquirir_trava(chave_trava, self._dono, self._trava_ttl)
+        except Exception:
+            self.erros_l2 += 1
+            com_trava = True  # sem L2 não há como coordenar: cada processo renova por si
+
+        if not com_trava:
+            self.renovacoes_cedidas += 1
+            if atual is not None:
+                return atual, adotada is not None
+            prazo = asyncio.get_running_loop().time() + self._trava_ttl
+            while asyncio.get_running_loop().time() < prazo:
+                await asyncio.sleep(_ESPERA_TRAVA_SECONDS)
+                adotada = await self._adotar_do_l2(key, None)
+                if adotada is not None:
+                    self.adotadas_l2 += 1
+                    return adotada, True
+
+        try:
+            return await self.set_chave(key, await buscar()), True
+        finally:
+            if com_trava:
+                try:
+                    await self._l2.liberar_trava(chave_trava, self._dono)
+                except Exception:
+                    self.erros_l2 += 1
+
+    async def set_chave(self, key: str, valor: Any) -> CacheEntry:
+        entries = await self.set_many({key: valor})
+        return entries[key]
+
+    async def set_many(self, itens: Dict[str, Any]) -> Dict[str, CacheEntry]:
+        entries = {key: self.l1.set_chave(key, valor) for key, valor in itens.items()}
+        if self._l2 is None:
+            return entries
+
+        serializados = {
+            key: json.dumps({
+                "t": entry.atualizado_em.timestamp(),
+                "v": self._codificar(entry.valor),
+            }).encode()
+            for key, entry in entries.items()
+        }
+        try:
+            # Expira no L2 junto com o hard TTL, para outras instâncias também servirem obsoleto
+            await self._l2.set_many(serializados, self.l1.hard_ttl_seconds)
+        except Exception:
+            self.erros_l2 += 1
+        return entries
+
+    def metricas(self) -> Dict[str, int]:
+        return {
+            "hits_l2": self.hits_l2,
+            "misses_l2": self.misses_l2,
+            "erros_l2": self.erros_l2,
+            "adotadas_l2": self.adotadas_l2,
+            "renovacoes_cedidas": self.renovacoes_cedidas,
+        }
@@ -1,24 +1,36 @@
 # app/infra/cliente_cripto.py
 import httpx
-import asyncio
-from typing import Dict
+from typing import Dict, Iterable, Optional, Tuple
 
+from app.infra.http_clientes import ProviderHttpBase
+from app.infra.rate_limit import BaldeTokens
+from app.infra.resiliencia import Resiliencia
 
-class HttpCoinGeckoProvider:
+
+class HttpCoinGeckoProvider(ProviderHttpBase):
     """
     Adapter para a CoinGecko API.
     Documentação: https://docs.coingecko.com/reference/introduction
     """
 
-    def __init__(self, base_url: str = "https://api.coingecko.com/api/v3", timeout: float = 10.0) -> None:
-        self._base_url = base_url.rstrip("/")
-        self._timeout = timeout
-        self._max_retries = 3
-        self._retry_delay = 2  # segundos
+    FONTE = "CoinGecko API"
+
+    # Símbolo do ativo -> ID na CoinGecko
+    IDS = {"USDT": "tether", "USDC": "usd-coin"}
+
+    def __init__(
+        self,
+        base_url: str = "https://api.coingecko.com/api/v3",
+        timeout: float = 10.0,
+        cliente: Optional[httpx.AsyncClient] = None,
+        limitador: Optional[BaldeTokens] = None,
+        resiliencia: Optional[Resiliencia] = None,
+    ) -> None:
+        super().__init__(base_url, timeout, cliente, limitador, resiliencia or Resiliencia("CoinGecko"))
 
     async def buscar_cotacao_cripto(self, cripto_ids: str, moeda_destino: str = "brl") -> Dict[str, float]:
         """
-        Busca a cotação de criptomoedas na CoinGecko API com retry.
+        Busca a cotação de criptomoedas na CoinGecko API (com retry e circuit breaker).
         
         Args:
             cripto_ids: IDs das criptos separados por vírgula (ex: "tether,usd-coin")
@@ -37,55 +49,48 @@ class HttpCoinGeckoProvider:
             "vs_currencies": moeda_destino.lower()
         }
 
-        last_exception = None
-        
-        for attempt in range(self._max_retries):
-            try:
-                async with httpx.AsyncClient(timeout=self._timeout) as client:
-                    resp = await client.get(url, params=params)
-
-                # Se for 429 (rate limit), aguarda mais tempo
-                if resp.status_code == 429:
-                    if attempt < self._max_retries - 1:
-                        wait_time = self._retry_delay * (2 ** attempt)  # backoff exponencial
-                        await asyncio.sleep(wait_time)
-                        continue
-                    else:
-                        raise httpx.HTTPStatusError(
-                            f"Rate limit atingido após {self._max_retries} tentativas",
-                            request=resp.request,
-                            response=resp
-                        )
-
-                # Levanta exceção HTTP se status >= 400
-                resp.raise_for_status()
-
-                data = resp.json()
-                
-                if not data:
-                    raise ValueError(
-                        f"Cotação para {cripto_ids} não encontrada na CoinGecko."
-                    )
-
-                return data
-                
-            except httpx.HTTPStatusError as e:
-                last_exception = e
-                if attempt < self._max_retries - 1 and e.response.status_code != 429:
-                    await asyncio.sleep(self._retry_delay)
-                    continue
-                raise
-            except Exception as e:
-                last_exception = e
-                if attempt < self._max_retries - 1:
-                    await asyncio.sleep(self._retry_delay)
-                    continue
-                raise
-        
-        # Se chegou aqui, todas as tentativas falharam
-        if last_exception:
-            raise last_exception
-        raise ValueError("Falha ao buscar cotação após múltiplas tentativas")
+        data = await self._get_json(url, params=params)
+
+        if not data:
+            raise ValueError(
+                f"Cotação para {cripto_ids} não encontrada na CoinGecko."
+            )
+
+        return data
+
+    async def buscar_precos(self, simbolos: Iterable[str], moeda_destino: str = "BRL") -> Dict[str, float]:
+        """
+        Busca o preço de vários ativos (ex: ["USDT", "USDC"]) em `moeda_destino` com uma única chamada.
+
+        Returns:
+            Dict ativo -> preço, ex: {"USDT": 5.45, "USDC": 5.46}
+        """
+        moeda = moeda_destino.lower()
+        ids = {}
+        for simbolo in simbolos:
+            simbolo = simbolo.upper()
+            if simbolo not in self.IDS:
+                raise ValueError(f"Ativo {simbolo} não suportado pela CoinGecko")
+            ids[self.IDS[simbolo]] = simbolo
+
+        data = await self.buscar_cotacao_cripto(",".join(ids), moeda)
+
+        resultado = {
+            simbolo: float(data[cripto_id][moeda])
+            for cripto_id, simbolo in ids.items()
+            if cripto_id in data and moeda in data[cripto_id]
+        }
+
+        if not resultado:
+            raise ValueError("Nenhuma cotação encontrada")
+
+        return resultado
+
+    async def buscar_precos_com_fonte(
+        self, simbolos: Iterable[str], moeda_destino: str = "BRL"
+    ) -> Tuple[Dict[str, float], str]:
+        """Como `buscar_precos`, junto com a fonte dos preços (exibida nas respostas)."""
+        return await self.buscar_precos(simbolos, moeda_destino), self.FONTE
 
     async def buscar_usdt_brl(self) -> float:
         """Busca a cotação de USDT em BRL."""
@@ -107,17 +112,4 @@ class HttpCoinGeckoProvider:
 
     async def buscar_ambas_brl(self) -> Dict[str, float]:
         """Busca USDT e USDC em BRL de uma vez."""
-        data = await self.buscar_cotacao_cripto("tether,usd-coin", "brl")
-        
-        resultado = {}
-        
-        if "tether" in data and "brl" in data["tether"]:
-            resultado["USDT"] = float(data["tether"]["brl"])
-        
-        if "usd-coin" in data and "brl" in data["usd-coin"]:
-            resultado["USDC"] = float(data["usd-coin"]["brl"])
-        
-        if not resultado:
-            raise ValueError("Nenhuma cotação encontrada")
-        
-        return resultado
+        return await self.buscar_precos(["USDT", "USDC"], "BRL")
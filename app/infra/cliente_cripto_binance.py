@@ -1,78 +1,117 @@
 # app/infra/cliente_cripto_binance.py
 import httpx
 import asyncio
-from typing import Dict
+import json
+from typing import Any, Dict, Iterable, Optional, Tuple
 
+from app.infra.http_clientes import ProviderHttpBase
+from app.infra.rate_limit import BaldeTokens
+from app.infra.resiliencia import ProviderIndisponivelError, Resiliencia
 
-class HttpBinanceProvider:
+
+class HttpBinanceProvider(ProviderHttpBase):
     """
     Adapter para a Binance API.
     Documentação: https://binance-docs.github.io/apidocs/spot/en/
     """
 
-    def __init__(self, base_url: str = "https://api.binance.com/api/v3", timeout: float = 10.0) -> None:
-        self._base_url = base_url.rstrip("/")
-        self._timeout = timeout
-        self._max_retries = 3
-        self._retry_delay = 1  # segundos
+    FONTE = "Binance API"
+
+    def __init__(
+        self,
+        base_url: str = "https://api.binance.com/api/v3",
+        timeout: float = 10.0,
+        cliente: Optional[httpx.AsyncClient] = None,
+        limitador: Optional[BaldeTokens] = None,
+        resiliencia: Optional[Resiliencia] = None,
+    ) -> None:
+        super().__init__(base_url, timeout, cliente, limitador, resiliencia or Resiliencia("Binance"))
+
+    async def _get_ticker(self, params: Dict[str, str]) -> Any:
+        """
+        Chama `/ticker/price` e retorna o JSON da resposta.
+        Erros 4xx (ex: símbolo inválido) não são repetidos; 429, 5xx e falhas
+        de rede seguem a política de resiliência do provider.
+        """
+        return await self._get_json(f"{self._base_url}/ticker/price", params=params)
 
     async def _fetch_price(self, symbol: str) -> float:
         """
         Busca o preço de um par de trading na Binance.
-        
+
         Args:
             symbol: Par de trading (ex: "USDTBRL", "USDCBRL")
-        
+
         Returns:
             Preço atual do par
         """
-        url = f"{self._base_url}/ticker/price"
-        params = {"symbol": symbol.upper()}
-
-        last_exception = None
-        
-        for attempt in range(self._max_retries):
-            try:
-                async with httpx.AsyncClient(timeout=self._timeout) as client:
-                    resp = await client.get(url, params=params)
-
-                # Tratamento de rate limit
-                if resp.status_code == 429:
-                    if attempt < self._max_retries - 1:
-                        wait_time = self._retry_delay * (2 ** attempt)
-                        await asyncio.sleep(wait_time)
-                        continue
-                    else:
-                        raise httpx.HTTPStatusError(
-                            f"Rate limit atingido após {self._max_retries} tentativas",
-                            request=resp.request,
-                            response=resp
-                        )
-
-                resp.raise_for_status()
-                data = resp.json()
-                
-                if "price" not in data:
-                    raise ValueError(f"Preço não encontrado para {symbol}")
-                
-                return float(data["price"])
-                
-            except httpx.HTTPStatusError as e:
-                last_exception = e
-                if attempt < self._max_retries - 1 and e.response.status_code != 429:
-                    await asyncio.sleep(self._retry_delay)
-                    continue
-                raise
-            except Exception as e:
-                last_exception = e
-                if attempt < self._max_retries - 1:
-                    await asyncio.sleep(self._retry_delay)
-                    continue
-                raise
-        
-        if last_exception:
-            raise last_exception
-        raise ValueError(f"Falha ao buscar preço de {symbol}")
+        data = await self._get_ticker({"symbol": symbol.upper()})
+
+        if "price" not in data:
+            raise ValueError(f"Preço não encontrado para {symbol}")
+
+        return float(data["price"])
+
+    async def _fetch_prices(self, symbols: Iterable[str]) -> Dict[str, float]:
+        """
+        Busca o preço de vários pares de trading em uma única requisição (`symbols=[...]`).
+        Pares ausentes na resposta não aparecem no resultado.
+        """
+        data = await self._get_ticker(
+            {"symbols": json.dumps([s.upper() for s in symbols], separators=(",", ":"))}
+        )
+        return {
+            item["symbol"]: float(item["price"])
+            for item in data
+            if "symbol" in item and "price" in item
+        }
+
+    async def buscar_precos(self, simbolos: Iterable[str], moeda_destino: str = "BRL") -> Dict[str, float]:
+        """
+        Busca o preço de vários ativos (ex: ["USDT", "USDC"]) em `moeda_destino`
+        com uma única chamada. Se ela falhar ou vier incompleta, busca em paralelo
+        apenas os símbolos que faltaram.
+
+        Returns:
+            Dict ativo -> preço, ex: {"USDT": 5.45, "USDC": 5.46}
+        """
+        moeda_destino = moeda_destino.upper()
+        pares = {f"{s.upper()}{moeda_destino}": s.upper() for s in simbolos}
+
+        precos: Dict[str, float] = {}
+        erro: Optional[Exception] = None
+        try:
+            precos = await self._fetch_prices(pares)
+        except ProviderIndisponivelError:
+            # Circuito aberto ou sem orçamento: as chamadas individuais também falhariam
+            raise
+        except Exception as e:
+            erro = e
+
+        faltantes = [par for par in pares if par not in precos]
+        if faltantes:
+            resultados = await asyncio.gather(
+                *(self._fetch_price(par) for par in faltantes),
+                return_exceptions=True,
+            )
+            for par, resultado in zip(faltantes, resultados):
+                if isinstance(resultado, Exception):
+                    erro = resultado
+                else:
+                    precos[par] = resultado
+
+        if not precos:
+            if isinstance(erro, ProviderIndisponivelError):
+                raise erro
+            raise ValueError(f"Nenhuma cotação encontrada: {erro}")
+
+        return {pares[par]: preco for par, preco in precos.items()}
+
+    async def buscar_precos_com_fonte(
+        self, simbolos: Iterable[str], moeda_destino: str = "BRL"
+    ) -> Tuple[Dict[str, float], str]:
+        """Como `buscar_precos`, junto com a fonte dos preços (exibida nas respostas)."""
+        return await self.buscar_precos(simbolos, moeda_destino), self.FONTE
 
     async def buscar_usdt_brl(self) -> float:
         """Busca a cotação de USDT em BRL."""
@@ -83,34 +122,5 @@ class HttpBinanceProvider:
         return await self._fetch_price("USDCBRL")
 
     async def buscar_ambas_brl(self) -> Dict[str, float]:
-        """
-        Busca USDT e USDC em BRL em paralelo para maior performance.
-        """
-        try:
-            # Executa ambas as requisições em paralelo
-            usdt_task = self.buscar_usdt_brl()
-            usdc_task = self.buscar_usdc_brl()
-            
-            usdt_price, usdc_price = await asyncio.gather(usdt_task, usdc_task)
-            
-            return {
-                "USDT": usdt_price,
-                "USDC": usdc_price
-            }
-        except Exception as e:
-            # Se uma falhar, tenta pegar pelo menos uma
-            resultado = {}
-            try:
-                resultado["USDT"] = await self.buscar_usdt_brl()
-            except:
-                pass
-            
-            try:
-                resultado["USDC"] = await self.buscar_usdc_brl()
-            except:
-                pass
-            
-            if not resultado:
-                raise ValueError(f"Nenhuma cotação encontrada: {str(e)}")
-            
-            return resultado
+        """Busca USDT e USDC em BRL em uma única requisição."""
+        return await self.buscar_precos(["USDT", "USDC"], "BRL")
@@ -0,0 +1,239 @@
+# app/infra/cliente_cripto_composto.py
+import asyncio
+import statistics
+import time
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.infra.http_clientes import PoolClientesHttp
+
+
+class LatenciaProvider:
+    """Janela das últimas latências (em segundos) de chamadas bem-sucedidas a um provider."""
+
+    def __init__(self, tamanho_janela: int = 256) -> None:
+        self._amostras: deque = deque(maxlen=tamanho_janela)
+        self.sucessos = 0
+        self.erros = 0
+        self.canceladas = 0
+
+    @property
+    def amostras(self) -> int:
+        return len(self._amostras)
+
+    def registrar(self, segundos: float) -> None:
+        self._amostras.append(segundos)
+        self.sucessos += 1
+
+    def registrar_erro(self) -> None:
+        self.erros += 1
+
+    def registrar_cancelada(self, segundos: float) -> None:
+        """
+        Chamada cancelada porque outro provider respondeu antes (hedge): o tempo até o
+        cancelamento entra como limite inferior da latência. Sem ele, a janela só teria as
+        chamadas rápidas e o percentil (o delay do hedge) ficaria abaixo do real.
+        """
+        self._amostras.append(segundos)
+        self.canceladas += 1
+
+    def percentil(self, p: float) -> Optional[float]:
+        if not self._amostras:
+            return None
+        ordenadas = sorted(self._amostras)
+        return ordenadas[min(int(p * len(ordenadas)), len(ordenadas) - 1)]
+
+    def metricas(self) -> Dict[str, Optional[float]]:
+        return {
+            "p50_seconds": self.percentil(0.5),
+            "p95_seconds": self.percentil(0.95),
+            "amostras": self.amostras,
+            "sucessos": self.sucessos,
+            "erros": self.erros,
+            "canceladas": self.canceladas,
+        }
+
+
+class ProviderCriptoComposto:
+    """
+    Combina vários providers de cripto (em ordem de prioridade) atrás da mesma
+    interface de um provider único.
+
+    Modos:
+    - "hedge": chama o primário e, se ele não responder dentro do p95 da sua
+      latência recente, dispara também o próximo; vale a primeira resposta.
+      Falhas passam para o próximo provider na hora.
+    - "failover": só chama o próximo provider quando o anterior falha.
+    - "mediana": chama todos em paralelo e retorna a mediana de cada ativo
+      entre os que responderam (consenso contra um provider com preço fora da curva).
+    """
+
+    MODOS = ("hedge", "failover", "mediana")
+    MIN_AMOSTRAS_HEDGE = 20
+
+    def __init__(
+        self,
+        providers: Sequence[object],
+        nomes: Sequence[str],
+        modo: str = "hedge",
+        hedge_percentil: float = 0.95,
+        hedge_delay_inicial_seconds: float = 0.3,
+        hedge_delay_min_seconds: float = 0.05,
+        hedge_delay_max_seconds: float = 2.0,
+    ) -> None:
+        if not providers:
+            raise ValueError("Informe ao menos um provider de cripto")
+        if modo not in self.MODOS:
+            raise ValueError(f"Modo inválido: {modo}. Use um de {', '.join(self.MODOS)}")
+        self.providers = list(providers)
+        self._nomes = list(nomes)
+        self._modo = modo
+        self._hedge_percentil = hedge_percentil
+        self._hedge_delay_inicial = hedge_delay_inicial_seconds
+        self._hedge_delay_min = hedge_delay_min_seconds
+        self._hedge_delay_max = hedge_delay_max_seconds
+        self._latencias = [LatenciaProvider() for _ in self.providers]
+        self.hedges = 0
+        self.failovers = 0
+
+    def usar_cliente(self, cliente) -> None:
+        for provider in self.providers:
+            provider.usar_cliente(cliente)
+
+    def conectar(self, pool: PoolClientesHttp) -> None:
+        for provider in self.providers:
+            provider.conectar(pool)
+
+    def delay_hedge(self, indice: int) -> float:
+        """Tempo de espera pelo provider `indice` antes de disparar o próximo."""
+        latencia = self._latencias[indice]
+        if latencia.amostras < self.MIN_AMOSTRAS_HEDGE:
+            delay = self._hedge_delay_inicial
+        else:
+            delay = latencia.percentil(self._hedge_percentil)
+        return min(max(delay, self._hedge_delay_min), self._hedge_delay_max)
+
+    async def _chamar(self, indice: int, simbolos: List[str], moeda_destino: str) -> Dict[str, float]:
+        inicio = time.monotonic()
+        try:
+            precos = await self.providers[indice].buscar_precos(simbolos, moeda_destino)
+        except asyncio.CancelledError:
+            self._latencias[indice].registrar_cancelada(time.monotonic() - inicio)
+            raise
+        except Exception:
+            self._latencias[indice].registrar_erro()
+            raise
+        self._latencias[indice].registrar(time.monotonic() - inicio)
+        return precos
+
+    async def buscar_precos(self, simbolos: Iterable[str], moeda_destino: str = "BRL") -> Dict[str, float]:
+        """
+        Busca o preço de vários ativos em `moeda_destino` conforme o modo configurado.
+        Raises a exceção do último provider se nenhum responder.
+        """
+        precos, _ = await self.buscar_precos_com_fonte(simbolos, moeda_destino)
+        return precos
+
+    async def buscar_precos_com_fonte(
+        self, simbolos: Iterable[str], moeda_destino: str = "BRL"
+    ) -> Tuple[Dict[str, float], str]:
+        """
+        Como `buscar_precos`, junto com a fonte de fato usada: o provider que respondeu
+        (hedge/failover) ou os que entraram na mediana.
+        """
+        simbolos = [s.upper() for s in simbolos]
+        if self._modo == "mediana":
+            return await self._buscar_mediana(simbolos, moeda_destino)
+        return await self._buscar_em_ordem(simbolos, moeda_destino, hedge=self._modo == "hedge")
+
+    async def _buscar_em_ordem(
+        self, simbolos: List[str], moeda_destino: str, hedge: bool
+    ) -> Tuple[Dict[str, float], str]:
+        pendentes: Dict[asyncio.Task, int] = {}
+        proximo = 0
+        ultimo_erro: Optional[BaseException] = None
+
+        def disparar() -> None:
+            nonlocal proximo
+            tarefa = asyncio.create_task(self._chamar(proximo, simbolos, moeda_destino))
+            pendentes[tarefa] = proximo
+            proximo += 1
+
+        disparar()
+        try:
+            while pendentes:
+                # Espera pelo provider mais recente; sem hedge, espera o quanto for preciso
+                espera = self.delay_hedge(proximo - 1) if hedge and proximo < len(self.providers) else None
+                prontas, _ = await asyncio.wait(pendentes, timeout=espera, return_when=asyncio.FIRST_COMPLETED)
+
+                if not prontas:
+                    self.hedges += 1
+                    disparar()
+                    continue
+
+                for tarefa in prontas:
+                    indice = pendentes.pop(tarefa)
+                    if tarefa.exception() is None:
+                        return tarefa.result(), self.providers[indice].FONTE
+                    ultimo_erro = tarefa.exception()
+
+                # Falhou: passa para o próximo provider sem esperar o delay do hedge
+                if proximo < len(self.providers):
+                    self.failovers += 1
+                    disparar()
+        finally:
+            for tarefa in pendentes:
+                tarefa.cancel()
+
+        raise ultimo_erro
+
+    async def _buscar_mediana(self, simbolos: List[str], moeda_destino: str) -> Tuple[Dict[str, float], str]:
+        resultados = await asyncio.gather(
+            *(self._chamar(i, simbolos, moeda_destino) for i in range(len(self.providers))),
+            return_exceptions=True,
+        )
+        respostas = [r for r in resultados if not isinstance(r, BaseException)]
+        if not respostas:
+            raise resultados[-1]
+        fontes = [
+            provider.FONTE
+            for provider, resultado in zip(self.providers, resultados)
+            if not isinstance(resultado, BaseException)
+        ]
+
+        precos: Dict[str, float] = {}
+        for simbolo in simbolos:
+            valores = [r[simbolo] for r in respostas if simbolo in r]
+            if valores:
+                precos[simbolo] = statistics.median(valores)
+        fonte = fontes[0] if len(fontes) == 1 else f"Mediana ({', '.join(fontes)})"
+        return precos, fonte
+
+    async def _buscar_um(self, simbolo: str) -> float:
+        precos = await self.buscar_precos([simbolo], "BRL")
+        if simbolo not in precos:
+            raise ValueError(f"Cotação {simbolo}/BRL não encontrada")
+        return precos[simbolo]
+
+    async def buscar_usdt_brl(self) -> float:
+        """Busca a cotação de USDT em BRL."""
+        return await self._buscar_um("USDT")
+
+    async def buscar_usdc_brl(self) -> float:
+        """Busca a cotação de USDC em BRL."""
+        return await self._buscar_um("USDC")
+
+    async def buscar_ambas_brl(self) -> Dict[str, float]:
+        """Busca USDT e USDC em BRL de uma vez."""
+        return await self.buscar_precos(["USDT", "USDC"], "BRL")
+
+    def metricas(self) -> Dict[str, object]:
+        return {
+            "modo": self._modo,
+            "hedges": self.hedges,
+            "failovers": self.failovers,
+            "providers": {
+                nome: {**latencia.metricas(), "delay_hedge_seconds": self.delay_hedge(i)}
+                for i, (nome, latencia) in enumerate(zip(self._nomes, self._latencias))
+            },
+        }
@@ -1,21 +1,29 @@
 # app/infra/external_client.py
 import httpx
-import asyncio
-from typing import Optional
+from datetime import date
+from typing import Any, Dict, Optional
 
-from app.domain.portas import CotacaoProvider
+from app.domain.portas import CotacaoHistoricaProvider, CotacaoProvider
+from app.infra.http_clientes import ProviderHttpBase
+from app.infra.rate_limit import BaldeTokens
+from app.infra.resiliencia import PrazoExcedidoError, Resiliencia
 
 
-class HttpFrankfurterProvider(CotacaoProvider):
+class HttpFrankfurterProvider(ProviderHttpBase, CotacaoProvider, CotacaoHistoricaProvider):
     """
     Adapter para a Frankfurter API.
     Documentação: https://www.frankfurter.app/docs/
     """
 
-    def __init__(self, base_url: str, timeout: float = 5.0, max_retries: int = 3) -> None:
-        self._base_url = base_url.rstrip("/")
-        self._timeout = timeout
-        self._max_retries = max_retries
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float = 5.0,
+        cliente: Optional[httpx.AsyncClient] = None,
+        limitador: Optional[BaldeTokens] = None,
+        resiliencia: Optional[Resiliencia] = None,
+    ) -> None:
+        super().__init__(base_url, timeout, cliente, limitador, resiliencia or Resiliencia("Frankfurter"))
 
     async def buscar_cotacao(self, moeda_origem: str, moeda_destino: str) -> float:
         """
@@ -27,56 +35,65 @@ class HttpFrankfurterProvider(CotacaoProvider):
         moeda_origem = moeda_origem.upper()
         moeda_destino = moeda_destino.upper()
 
-        url = f"{self._base_url}/latest"
-        params = {"from": moeda_origem, "to": moeda_destino}
-
-        last_error: Optional[Exception] = None
-        
-        for tentativa in range(self._max_retries):
-            try:
-                async with httpx.AsyncClient(timeout=self._timeout) as client:
-                    resp = await client.get(url, params=params)
-
-                # Levanta exceção HTTP se status >= 400
-                resp.raise_for_status()
-
-                data = resp.json()
-                rates = data.get("rates") or {}
-
-                if moeda_destino not in rates:
-                    raise ValueError(
-                        f"Cotação {moeda_origem}->{moeda_destino} não encontrada na Frankfurter."
-                    )
-
-                valor = rates[moeda_destino]
-                return float(valor)
-            
-            except httpx.TimeoutException as e:
-                last_error = e
-                if tentativa < self._max_retries - 1:
-                    await asyncio.sleep(1 * (tentativa + 1))  # Backoff exponencial
-                    continue
-                raise ValueError(f"A API de cotações demorou muito para responder após {self._max_retries} tentativas. Tente novamente.")
-            
-            except httpx.ConnectError as e:
-                last_error = e
-                if tentativa < self._max_retries - 1:
-                    await asyncio.sleep(1 * (tentativa + 1))
-                    continue
-                raise ValueError(f"Não foi possível conectar à API de cotações após {self._max_retries} tentativas. Verifique sua conexão.")
-            
-            except httpx.HTTPStatusError as e:
-                # Não faz retry em erros HTTP (4xx, 5xx)
-                raise ValueError(f"API retornou erro {e.response.status_code}: {e.response.text}")
-            
-            except Exception as e:
-                # Outros erros não esperados
-                last_error = e
-                if tentativa < self._max_retries - 1:
-                    await asyncio.sleep(1 * (tentativa + 1))
-                    continue
-                raise
-        
-        # Se chegou aqui, todas as tentativas falharam
-        if last_error:
-            raise last_error
+        rates = await self._buscar_latest({"from": moeda_origem, "to": moeda_destino})
+
+        if moeda_destino not in rates:
+            raise ValueError(
+                f"Cotação {moeda_origem}->{moeda_destino} não encontrada na Frankfurter."
+            )
+
+        valor = rates[moeda_destino]
+        return float(valor)
+
+    async def buscar_tabela(self, moeda_base: str) -> Dict[str, float]:
+        """
+        Busca, em uma única chamada, as taxas de todas as moedas em relação a `moeda_base`.
+        Raises ValueError se a resposta não trouxer nenhuma taxa.
+        """
+        moeda_base = moeda_base.upper()
+
+        rates = await self._buscar_latest({"from": moeda_base})
+
+        if not rates:
+            raise ValueError(f"Taxas para a base {moeda_base} não encontradas na Frankfurter.")
+
+        return {moeda: float(valor) for moeda, valor in rates.items()}
+
+    async def buscar_serie(
+        self, moeda_base: str, inicio: date, fim: date
+    ) -> Dict[date, Dict[str, float]]:
+        """
+        Busca a série temporal (`/{inicio}..{fim}`) com as taxas diárias de todas as moedas
+        em relação a `moeda_base`. A API só traz dias úteis e pode incluir o último dia útil
+        antes de `inicio`.
+        """
+        data = await self._buscar(f"{inicio.isoformat()}..{fim.isoformat()}", {"from": moeda_base.upper()})
+
+        return {
+            date.fromisoformat(dia): {moeda: float(valor) for moeda, valor in taxas.items()}
+            for dia, taxas in (data.get("rates") or {}).items()
+        }
+
+    async def _buscar_latest(self, params: Dict[str, str]) -> Dict[str, float]:
+        """Chama `/latest` e retorna o dicionário `rates` da resposta."""
+        data = await self._buscar("latest", params)
+        return data.get("rates") or {}
+
+    async def _buscar(self, caminho: str, params: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Chama um endpoint da Frankfurter com a política de resiliência do provider.
+        Raises ValueError com uma mensagem amigável para timeout, conexão ou erro HTTP.
+        Raises CircuitoAbertoError / LimiteTaxaExcedidoError se a API não puder ser chamada agora.
+        """
+        url = f"{self._base_url}/{caminho}"
+
+        try:
+            data = await self._get_json(url, params=params)
+        except (httpx.TimeoutException, PrazoExcedidoError):
+            raise ValueError("A API de cotações demorou muito para responder. Tente novamente.")
+        except httpx.ConnectError:
+            raise ValueError("Não foi possível conectar à API de cotações. Verifique sua conexão.")
+        except httpx.HTTPStatusError as e:
+            raise ValueError(f"API retornou erro {e.response.status_code}: {e.response.text}")
+
+        return data
@@ -0,0 +1,231 @@
+# app/infra/conversor_lote.py
+import codecs
+import csv
+import io
+import json
+import math
+from decimal import ROUND_HALF_EVEN, Decimal, InvalidOperation, localcontext
+from typing import Any, AsyncIterator, Dict, Iterable, List, Mapping, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # opcional: sem NumPy as conversões são calculadas linha a linha
+    np = None
+
+from app.domain.models import TabelaTaxas
+
+_codificador_json = json.JSONEncoder(ensure_ascii=False)
+
+COLUNAS_SAIDA = ("linha", "valor", "moeda_origem", "moeda_destino", "taxa_cambio", "valor_convertido", "erro")
+
+# Dígitos do cálculo em Decimal: cobre valores até o maior float finito (~1.8e308) com as casas pedidas
+_PRECISAO_DECIMAL = 400
+
+
+class CorpoInvalidoError(ValueError):
+    """O corpo da requisição não pode ser lido (ex: texto que não é UTF-8)."""
+
+
+class LinhaConversao:
+    """Uma linha de entrada já validada (ou com o erro que a invalidou)."""
+    __slots__ = ("numero", "valor", "moeda_origem", "moeda_destino", "erro")
+
+    def __init__(
+        self,
+        numero: int,
+        valor: Optional[Decimal] = None,
+        moeda_origem: str = "",
+        moeda_destino: str = "",
+        erro: Optional[str] = None,
+    ) -> None:
+        self.numero = numero
+        self.valor = valor
+        self.moeda_origem = moeda_origem
+        self.moeda_destino = moeda_destino
+        self.erro = erro
+
+    @classmethod
+    def de_dict(cls, numero: int, dados: Any) -> "LinhaConversao":
+        """Valida um item {"valor", "moeda_origem", "moeda_destino"}; erros ficam na própria linha."""
+        if not isinstance(dados, Mapping):
+            return cls(numero, erro="Linha deve ser um objeto com valor, moeda_origem e moeda_destino.")
+        origem = str(dados.get("moeda_origem") or "").strip().upper()
+        destino = str(dados.get("moeda_destino") or "").strip().upper()
+        linha = cls(numero, moeda_origem=origem, moeda_destino=destino)
+        try:
+            # Via str: o valor informado é preservado exatamente (ex: 0.1 não vira 0.1000000000000000055)
+            linha.valor = Decimal(str(dados.get("valor")).strip())
+        except InvalidOperation:
+            linha.erro = f"Valor inválido: {dados.get('valor')}."
+            return linha
+        # Valores fora do alcance do float (ex: 1e400) virariam Infinity no modo padrão
+        if not linha.valor.is_finite() or not math.isfinite(float(linha.valor)):
+            linha.erro = f"Valor inválido: {dados.get('valor')}."
+        elif len(origem) != 3 or not origem.isalpha() or len(destino) != 3 or not destino.isalpha():
+            linha.erro = "Moeda inválida. Use códigos de 3 letras, ex: USD, EUR, BRL."
+        return linha
+
+
+async def _linhas_texto(partes: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    Quebra o corpo recebido em partes em linhas de texto, sem juntar o corpo inteiro.
+    Raises CorpoInvalidoError se o corpo não for UTF-8.
+    """
+    decodificador = codecs.getincrementaldecoder("utf-8-sig")()
+    resto = ""
+    try:
+        async for parte in partes:
+            texto = resto + decodificador.decode(parte)
+            *linhas, resto = texto.split("\n")
+            for linha in linhas:
+                yield linha.rstrip("\r")
+        resto += decodificador.decode(b"", final=True)
+    except UnicodeDecodeError as exc:
+        raise CorpoInvalidoError("O corpo deve estar em UTF-8.") from exc
+    if resto.strip():
+        yield resto.rstrip("\r")
+
+
+async def ler_ndjson(partes: AsyncIterator[bytes]) -> AsyncIterator[LinhaConversao]:
+    """Uma linha JSON por item; linhas em branco são ignoradas."""
+    numero = 0
+    async for texto in _linhas_texto(partes):
+        if not texto.strip():
+            continue
+        numero += 1
+        try:
+            dados = json.loads(texto)
+        except ValueError:
+            yield LinhaConversao(numero, erro="JSON inválido.")
+            continue
+        yield LinhaConversao.de_dict(numero, dados)
+
+
+async def ler_csv(partes: AsyncIterator[bytes]) -> AsyncIterator[LinhaConversao]:
+    """CSV com cabeçalho contendo as colunas valor, moeda_origem e moeda_destino (em qualquer ordem)."""
+    cabecalho: Optional[List[str]] = None
+    numero = 0
+    async for texto in _linhas_texto(partes):
+        if not texto.strip():
+            continue
+        campos = next(csv.reader([texto]))
+        if cabecalho is None:
+            cabecalho = [c.strip().lower() for c in campos]
+            continue
+        numero += 1
+        yield LinhaConversao.de_dict(numero, dict(zip(cabecalho, campos)))
+
+
+async def ler_lista(itens: Iterable[Any]) -> AsyncIterator[LinhaConversao]:
+    for numero, dados in enumerate(itens, start=1):
+        yield LinhaConversao.de_dict(numero, dados)
+
+
+class ConversorLote:
+    """
+    Converte valores usando uma única tabela de taxas para o lote inteiro
+    (todas as linhas veem o mesmo snapshot). Cada par distinto é resolvido uma vez.
+
+    - Modo padrão (float): multiplicação vetorizada com NumPy, quando instalado,
+      e arredondamento para `casas_decimais`.
+    - usar_decimal=True: cálculo exato em Decimal com arredondamento half-even
+      (bancário); o valor convertido sai como string para não perder precisão.
+    """
+
+    def __init__(self, tabela: TabelaTaxas, casas_decimais: int = 2, usar_decimal: bool = False) -> None:
+        self._tabela = tabela
+        self._casas = casas_decimais
+        self._usar_decimal = usar_decimal
+        self._quantum = Decimal(1).scaleb(-casas_decimais)
+        self._taxas: Dict[Tuple[str, str], Any] = {}  # par -> taxa ou mensagem de erro
+
+    def _taxa(self, moeda_origem: str, moeda_destino: str) -> Any:
+        par = (moeda_origem, moeda_destino)
+        taxa = self._taxas.get(par)
+        if taxa is None:
+            try:
+                taxa = self._tabela.taxa(moeda_origem, moeda_destino)
+            except ValueError as exc:
+                taxa = str(exc)
+            self._taxas[par] = taxa
+        return taxa
+
+    def converter(self, linhas: List[LinhaConversao]) -> List[Dict[str, Any]]:
+        """Converte um lote de linhas, devolvendo um resultado por linha, na mesma ordem."""
+        resultados: List[Dict[str, Any]] = []
+        calcular: List[Tuple[Dict[str, Any], LinhaConversao, float]] = []
+
+        for linha in linhas:
+            if linha.erro is not None:
+                resultados.append({"linha": linha.numero, "erro": linha.erro})
+                continue
+            taxa = self._taxa(linha.moeda_origem, linha.moeda_destino)
+            resultado = {
+                "linha": linha.numero,
+                "valor": str(linha.valor) if self._usar_decimal else float(linha.valor),
+                "moeda_origem": linha.moeda_origem,
+                "moeda_destino": linha.moeda_destino,
+            }
+            if isinstance(taxa, str):
+                resultado["erro"] = taxa
+            else:
+                resultado["taxa_cambio"] = taxa
+                calcular.append((resultado, linha, taxa))
+            resultados.append(resultado)
+
+        if calcular:
+            for (resultado, _, _), convertido in zip(calcular, self._calcular(calcular)):
+                resultado["valor_convertido"] = convertido
+        return resultados
+
+    def _calcular(self, itens: List[Tuple[Dict[str, Any], LinhaConversao, float]]) -> List[Any]:
+        if self._usar_decimal:
+            # A precisão padrão (28 dígitos) não comporta o quantize de valores grandes (ex: 1e30)
+            with localcontext() as contexto:
+                contexto.prec = _PRECISAO_DECIMAL
+                return [
+                    str((linha.valor * Decimal(repr(taxa))).quantize(self._quantum, rounding=ROUND_HALF_EVEN))
+                    for _, linha, taxa in itens
+                ]
+        if np is not None:
+            valores = np.fromiter((float(linha.valor) for _, linha, _ in itens), dtype=np.float64, count=len(itens))
+            taxas = np.fromiter((taxa for _, _, taxa in itens), dtype=np.float64, count=len(itens))
+            return np.round(valores * taxas, self._casas).tolist()
+        return [round(float(linha.valor) * taxa, self._casas) for _, linha, taxa in itens]
+
+
+def formatar_ndjson(resultados: List[Dict[str, Any]]) -> bytes:
+    codificar = _codificador_json.encode
+    return "".join(codificar(r) + "\n" for r in resultados).encode("utf-8")
+
+
+def formatar_csv(resultados: List[Dict[str, Any]], cabecalho: bool = False) -> bytes:
+    saida = io.StringIO()
+    escritor = csv.DictWriter(saida, fieldnames=COLUNAS_SAIDA, lineterminator="\n")
+    if cabecalho:
+        escritor.writeheader()
+    escritor.writerows(resultados)
+    return saida.getvalue().encode("utf-8")
+
+
+async def converter_em_lotes(
+    linhas: AsyncIterator[LinhaConversao],
+    conversor: ConversorLote,
+    formato: str = "ndjson",
+    tamanho_lote: int = 5000,
+) -> AsyncIterator[bytes]:
+    """
+    Lê as linhas em lotes de `tamanho_lote` e devolve cada lote já convertido e
+    serializado, sem manter a entrada inteira em memória.
+    """
+    if formato == "csv":
+        yield formatar_csv([], cabecalho=True)
+    formatar = formatar_csv if formato == "csv" else formatar_ndjson
+    lote: List[LinhaConversao] = []
+    async for linha in linhas:
+        lote.append(linha)
+        if len(lote) >= tamanho_lote:
+            yield formatar(conversor.converter(lote))
+            lote = []
+    if lote:
+        yield formatar(conversor.converter(lote))
@@ -1,13 +1,44 @@
 # app/infra/cotacao_repo.py
-from app.domain.models import Cotacao
-from app.domain.portas import CotacaoProvider, CotacaoRepository
-from app.infra.cache import CotacaoCache
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from app.domain.models import Cotacao, TabelaTaxas
+from app.domain.portas import CacheCompartilhado, CotacaoProvider, CotacaoRepository
+from app.infra.cache import CacheEntry, CotacaoCache
+from app.infra.cache_compartilhado import CacheDuasCamadas
+from app.infra.single_flight import SingleFlight
 
 
 class CotacaoRepositoryComCache(CotacaoRepository):
-    def __init__(self, provider: CotacaoProvider, cache: CotacaoCache) -> None:
+    """
+    Repositório de cotações que guarda em cache a tabela completa de taxas de uma
+    moeda base e deriva localmente qualquer par origem->destino a partir dela.
+    Assim, toda a matriz de moedas custa uma chamada externa por TTL.
+    """
+
+    def __init__(
+        self,
+        provider: CotacaoProvider,
+        cache: CotacaoCache,
+        moeda_base: str = "EUR",
+        cache_compartilhado: Optional[CacheCompartilhado] = None,
+    ) -> None:
         self._provider = provider
-        self._cache = cache
+        self._cache = CacheDuasCamadas(
+            cache,
+            cache_compartilhado,
+            codificar=TabelaTaxas.para_dict,
+            decodificar=TabelaTaxas.de_dict,
+        )
+        self._moeda_base = moeda_base.upper()
+        self._single_flight = SingleFlight()
+        self._ouvintes: List[Callable[[CacheEntry], None]] = []
+        # JSON já codificado de cada par, válido enquanto a tabela em cache for a mesma
+        self._json_entry: Optional[CacheEntry] = None
+        self._json_cotacoes: Dict[Tuple[str, str, str, bool], bytes] = {}
+
+    def adicionar_ouvinte(self, ouvinte: Callable[[CacheEntry], None]) -> None:
+        """Registra uma função chamada a cada nova tabela de taxas armazenada no cache."""
+        self._ouvintes.append(ouvinte)
 
     async def obter_cotacao(self, moeda_origem: str, moeda_destino: str) -> Cotacao:
         """
@@ -17,25 +48,124 @@ class CotacaoRepositoryComCache(CotacaoRepository):
         moeda_origem = moeda_origem.upper()
         moeda_destino = moeda_destino.upper()
 
-        # 1. tenta cache
-        entry = self._cache.get(moeda_origem, moeda_destino)
+        entry, fonte = await self.obter_entrada_tabela()
+        return self.montar_cotacao(moeda_origem, moeda_destino, entry, fonte)
+
+    async def obter_cotacoes(
+        self, pares: Sequence[Tuple[str, str]]
+    ) -> List[Union[Cotacao, Exception]]:
+        """
+        Obtém a cotação de vários pares com uma única consulta à tabela da moeda base.
+        Retorna, na mesma ordem dos pares, a Cotacao ou a exceção daquele par.
+        """
+        try:
+            entry, fonte = await self.obter_entrada_tabela()
+        except Exception as exc:
+            return [exc for _ in pares]
+
+        resultados: List[Union[Cotacao, Exception]] = []
+        for moeda_origem, moeda_destino in pares:
+            try:
+                resultados.append(
+                    self.montar_cotacao(moeda_origem.upper(), moeda_destino.upper(), entry, fonte)
+                )
+            except Exception as exc:
+                resultados.append(exc)
+        return resultados
+
+    async def obter_tabela(self) -> TabelaTaxas:
+        """Retorna a tabela de taxas da moeda base (do cache ou da API externa)."""
+        entry, _ = await self.obter_entrada_tabela()
+        return entry.valor
+
+    async def obter_entrada_tabela(self) -> Tuple[CacheEntry, str]:
+        """
+        Retorna a entrada do cache com a tabela de taxas (e a data de atualização)
+        e a fonte ("cache" ou "api_externa").
+        """
+        # 1. tenta cache (entradas obsoletas são servidas e renovadas em background)
+        entry = await self._cache.get_chave(self._chave_tabela(), permitir_obsoleto=True)
         if entry:
-            return Cotacao(
-                moeda_origem=moeda_origem,
-                moeda_destino=moeda_destino,
-                taxa_cambio=entry.valor,
-                data_cotacao=entry.atualizado_em,
-                fonte="cache",
-            )
+            if self._cache.deve_renovar(entry):
+                self._renovar_em_background(entry)
+            return entry, "cache"
 
         # 2. se não tiver ou expirou, chama provider externo
-        valor = await self._provider.buscar_cotacao(moeda_origem, moeda_destino)
-        entry = self._cache.set(moeda_origem, moeda_destino, valor)
+        #    (requisições concorrentes compartilham a mesma chamada)
+        entry = await self._single_flight.executar(self._chave_tabela(), self._buscar_e_armazenar)
+        return entry, "api_externa"
+
+    async def entrada_tabela_em_cache(self) -> Optional[CacheEntry]:
+        """
+        Entrada da tabela de taxas já em cache (L1 ou cache compartilhado), inclusive obsoleta.
+        Só leitura: não dispara renovação nem chamada externa.
+        """
+        return await self._cache.get_chave(self._chave_tabela(), permitir_obsoleto=True)
 
+    def montar_cotacao(self, moeda_origem: str, moeda_destino: str, entry: CacheEntry, fonte: str) -> Cotacao:
+        """
+        Monta a cotação de um par a partir da entrada da tabela de taxas.
+        Raises ValueError se alguma das moedas não estiver na tabela.
+        """
         return Cotacao(
             moeda_origem=moeda_origem,
             moeda_destino=moeda_destino,
-            taxa_cambio=entry.valor,
+            taxa_cambio=entry.valor.taxa(moeda_origem, moeda_destino),
             data_cotacao=entry.atualizado_em,
-            fonte="api_externa",
+            fonte=fonte,
+            obsoleto=fonte == "cache" and self._cache.esta_obsoleto(entry),
         )
+
+    def cotacao_json(self, moeda_origem: str, moeda_destino: str, entry: CacheEntry, fonte: str) -> bytes:
+        """
+        JSON da cotação (o mesmo de `montar_cotacao`), codificado uma vez por versão da
+        tabela: enquanto a entrada em cache não muda, os acertos não constroem nem
+        serializam o modelo.
+        Raises ValueError se alguma das moedas não estiver na tabela.
+        """
+        if entry is not self._json_entry:
+            self._json_entry = entry
+            self._json_cotacoes = {}
+        chave = (moeda_origem, moeda_destino, fonte, fonte == "cache" and self._cache.esta_obsoleto(entry))
+        corpo = self._json_cotacoes.get(chave)
+        if corpo is None:
+            corpo = self.montar_cotacao(moeda_origem, moeda_destino, entry, fonte).model_dump_json().encode()
+            self._json_cotacoes[chave] = corpo
+        return corpo
+
+    def _chave_tabela(self) -> str:
+        return f"{self._moeda_base}->*"
+
+    def _renovar_em_background(self, atual: CacheEntry) -> None:
+        """
+        Dispara a renovação da tabela sem bloquear a requisição atual.
+        Falhas são descartadas: a entrada obsoleta continua servível até o hard TTL.
+        """
+        chave = self._chave_tabela()
+        if self._single_flight.em_andamento(chave):
+            return
+        self._single_flight.iniciar(chave, lambda: self._buscar_e_armazenar(atual))
+
+    async def _buscar_e_armazenar(self, atual: Optional[CacheEntry] = None) -> CacheEntry:
+        # Passa pelo cache compartilhado: a tabela renovada por outro processo é adotada
+        # sem chamada externa e só um processo por vez busca na Frankfurter
+        entry, nova = await self._cache.renovar(self._chave_tabela(), self._buscar_tabela, atual)
+        if nova:
+            for ouvinte in self._ouvintes:
+                ouvinte(entry)
+        return entry
+
+    async def _buscar_tabela(self) -> TabelaTaxas:
+        taxas = await self._provider.buscar_tabela(self._moeda_base)
+        return TabelaTaxas(self._moeda_base, taxas)
+
+    async def aguardar_chamadas(self, timeout_seconds: float) -> int:
+        """
+        No desligamento: aguarda as chamadas externas em andamento (inclusive renovações
+        em background) gravarem no cache. Retorna quantas não terminaram a tempo.
+        """
+        return await self._single_flight.aguardar(timeout_seconds)
+
+    def metricas(self) -> Dict[str, int]:
+        """Contadores de chamadas externas, requisições coalescidas e do cache compartilhado."""
+        return {**self._single_flight.metricas(), **self._cache.metricas()}
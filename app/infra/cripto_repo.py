@@ -0,0 +1,127 @@
+# app/infra/cripto_repo.py
+import asyncio
+from typing import Callable, Dict, Iterable, List, Optional
+
+from app.domain.models import PrecoCripto
+from app.domain.portas import CacheCompartilhado
+from app.infra.cache import CacheEntry, CotacaoCache
+from app.infra.cache_compartilhado import CacheDuasCamadas
+from app.infra.single_flight import SingleFlight
+
+
+class CriptoRepositoryComCache:
+    """
+    Repositório de cotações cripto (ex: USDT e USDC em BRL) com cache de TTL curto.
+    Requisições concorrentes compartilham a mesma chamada externa e, com o poller
+    ativo, os preços são renovados em background e servidos sempre da memória.
+    """
+
+    MOEDA_DESTINO = "BRL"
+    SIMBOLOS = ("USDT", "USDC")
+
+    def __init__(
+        self,
+        provider,
+        cache: CotacaoCache,
+        cache_compartilhado: Optional[CacheCompartilhado] = None,
+    ) -> None:
+        self._provider = provider
+        self._cache = CacheDuasCamadas(
+            cache,
+            cache_compartilhado,
+            codificar=PrecoCripto.para_dict,
+            decodificar=PrecoCripto.de_dict,
+        )
+        self._single_flight = SingleFlight()
+        self._poller: Optional[asyncio.Task] = None
+        self._ouvintes: List[Callable[[str, CacheEntry], None]] = []
+
+    def adicionar_ouvinte(self, ouvinte: Callable[[str, CacheEntry], None]) -> None:
+        """Registra uma função chamada com (símbolo, entrada) a cada preço armazenado no cache."""
+        self._ouvintes.append(ouvinte)
+
+    async def obter_preco(self, simbolo: str) -> CacheEntry:
+        """
+        Retorna a entrada do cache com o preço de um ativo em BRL (`PrecoCripto`, com a fonte).
+        Raises ValueError se o provider não retornar o ativo.
+        """
+        simbolo = simbolo.upper()
+        entries = await self.obter_precos([simbolo])
+        if simbolo not in entries:
+            raise ValueError(f"Cotação {simbolo}/{self.MOEDA_DESTINO} não encontrada")
+        return entries[simbolo]
+
+    async def obter_precos(self, simbolos: Iterable[str]) -> Dict[str, CacheEntry]:
+        """
+        Retorna os preços em BRL dos ativos pedidos; os que não estiverem em cache
+        são buscados juntos em uma única chamada ao provider.
+        Ativos que o provider não retornar ficam de fora do resultado.
+        """
+        simbolos = [s.upper() for s in simbolos]
+        em_cache = await self._cache.get_many(self._chave(s) for s in simbolos)
+        entries: Dict[str, CacheEntry] = {
+            s: em_cache[self._chave(s)] for s in simbolos if self._chave(s) in em_cache
+        }
+        faltantes = [s for s in simbolos if s not in entries]
+
+        if faltantes:
+            novos = await self._single_flight.executar(
+                ",".join(sorted(faltantes)), lambda: self.atualizar(faltantes)
+            )
+            entries.update(novos)
+        return entries
+
+    async def atualizar(self, simbolos: Iterable[str] = SIMBOLOS) -> Dict[str, CacheEntry]:
+        """Busca os preços na API externa e atualiza o cache (cada preço com a sua fonte)."""
+        dados, fonte = await self._provider.buscar_precos_com_fonte(list(simbolos), self.MOEDA_DESTINO)
+        armazenados = await self._cache.set_many(
+            {self._chave(simbolo): PrecoCripto(valor, fonte) for simbolo, valor in dados.items()}
+        )
+        entries = {simbolo: armazenados[self._chave(simbolo)] for simbolo in dados}
+        for simbolo, entry in entries.items():
+            for ouvinte in self._ouvintes:
+                ouvinte(simbolo, entry)
+        return entries
+
+    def _chave(self, simbolo: str) -> str:
+        return f"{simbolo}->{self.MOEDA_DESTINO}"
+
+    def iniciar_poller(self, intervalo_segundos: float) -> None:
+        """Inicia a task que renova os preços a cada `intervalo_segundos`."""
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.create_task(self._executar_poller(intervalo_segundos))
+
+    async def parar_poller(self) -> None:
+        if self._poller is None:
+            return
+        self._poller.cancel()
+        try:
+            await self._poller
+        except asyncio.CancelledError:
+            pass
+        self._poller = None
+
+    async def _executar_poller(self, intervalo_segundos: float) -> None:
+        chave = ",".join(sorted(self.SIMBOLOS))
+        while True:
+            try:
+                await self._single_flight.executar(chave, self.atualizar)
+            except Exception:
+                # Falha pontual: mantém o último valor em cache e tenta no próximo ciclo
+                pass
+            await asyncio.sleep(intervalo_segundos)
+
+    async def aguardar_chamadas(self, timeout_seconds: float) -> int:
+        """
+        No desligamento: aguarda as chamadas externas em andamento (inclusive renovações
+        em background) gravarem no cache. Retorna quantas não terminaram a tempo.
+        """
+        return await self._single_flight.aguardar(timeout_seconds)
+
+    def metricas_cache(self) -> Dict[str, int]:
+        """Contadores do cache em memória (L1): hits, misses, evictions, entradas e bytes."""
+        return self._cache.l1.metricas()
+
+    def metricas(self) -> Dict[str, int]:
+        """Contadores de chamadas externas, requisições coalescidas e do cache compartilhado."""
+        return {**self._single_flight.metricas(), **self._cache.metricas()}
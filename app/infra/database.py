@@ -1,31 +1,62 @@
 # app/infra/database.py
-from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
 
-# Cria o engine do SQLAlchemy
-engine = create_engine(
-    settings.database_url,
+
+def _url_async(url: str) -> str:
+    """
+    Converte a URL de conexão (a mesma usada pelo Alembic) para um driver assíncrono.
+    Ex: postgresql://... -> postgresql+asyncpg://...
+    """
+    if url.startswith("postgres://"):
+        url = "postgresql://" + url[len("postgres://"):]
+    if url.startswith("postgresql://"):
+        return "postgresql+asyncpg://" + url[len("postgresql://"):]
+    if url.startswith("sqlite://"):
+        return "sqlite+aiosqlite://" + url[len("sqlite://"):]
+    return url
+
+
+def _opcoes_pool(url: str) -> dict:
+    # SQLite (dev/testes) não usa pool de conexões configurável
+    if url.startswith("sqlite"):
+        return {}
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout_seconds,
+        "pool_recycle": settings.db_pool_recycle_seconds,
+    }
+
+
+_database_url = _url_async(settings.database_url)
+
+# Cria o engine assíncrono do SQLAlchemy
+engine = create_async_engine(
+    _database_url,
     pool_pre_ping=True,  # Verifica a conexão antes de usar
     echo=False,  # Mude para True para debug SQL
+    **_opcoes_pool(_database_url),
 )
 
 # Cria a session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(
+    bind=engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False,  # Objetos continuam utilizáveis após o commit (ex: na resposta)
+)
 
 # Base class para os modelos
 Base = declarative_base()
 
 
-def get_db():
+async def get_db():
     """
-    Dependency que fornece uma sessão do banco de dados.
-    Usa-se como: db: Session = Depends(get_db)
+    Dependency que fornece uma sessão assíncrona do banco de dados.
+    Usa-se como: db: AsyncSession = Depends(get_db)
     """
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
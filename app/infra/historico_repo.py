@@ -0,0 +1,222 @@
+# app/infra/historico_repo.py
+import asyncio
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.domain.historico_models import DiaHistoricoConsultado, TaxaHistorica
+from app.domain.models import PontoHistorico, SerieHistorica
+from app.domain.portas import CotacaoHistoricaProvider
+from app.infra.single_flight import SingleFlight
+
+# Primeiro dia com taxas de referência do BCE na Frankfurter
+DATA_INICIAL_HISTORICO = date(1999, 1, 4)
+
+# Intervalos maiores são divididos em várias chamadas à série temporal
+_MAX_DIAS_POR_CHAMADA = 366
+
+
+class MoedaDesconhecidaError(Exception):
+    """Moeda sem nenhuma taxa no histórico da moeda base (código inexistente ou não suportado)."""
+
+
+def _dias(inicio: date, fim: date) -> Iterable[date]:
+    for i in range((fim - inicio).days + 1):
+        yield inicio + timedelta(days=i)
+
+
+def agrupar_lacunas(dias: Iterable[date], tolerancia_dias: int = 0) -> List[Tuple[date, date]]:
+    """
+    Agrupa dias faltantes em intervalos (inicio, fim) para buscar na API.
+    Lacunas separadas por até `tolerancia_dias` dias já salvos viram uma só chamada.
+    """
+    intervalos: List[List[date]] = []
+    for dia in sorted(dias):
+        if intervalos and (dia - intervalos[-1][1]).days <= tolerancia_dias + 1:
+            intervalos[-1][1] = dia
+        else:
+            intervalos.append([dia, dia])
+
+    lacunas = []
+    for inicio, fim in intervalos:
+        while inicio <= fim:
+            fim_parcial = min(fim, inicio + timedelta(days=_MAX_DIAS_POR_CHAMADA - 1))
+            lacunas.append((inicio, fim_parcial))
+            inicio = fim_parcial + timedelta(days=1)
+    return lacunas
+
+
+class HistoricoCotacaoRepository:
+    """
+    Histórico de cotações persistido no banco. As taxas diárias de todas as moedas
+    em relação à moeda base são buscadas uma única vez na API externa e qualquer par
+    é derivado delas; consultas por intervalo só buscam os dias que ainda faltam.
+
+    O dia de hoje nunca é marcado como consultado, já que a taxa pode não ter sido publicada.
+    """
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        provider: CotacaoHistoricaProvider,
+        moeda_base: str = "EUR",
+        single_flight: Optional[SingleFlight] = None,
+        tolerancia_lacuna_dias: int = 7,
+    ) -> None:
+        self.db = db
+        self._provider = provider
+        self._moeda_base = moeda_base.upper()
+        self._single_flight = single_flight or SingleFlight()
+        self._tolerancia = tolerancia_lacuna_dias
+
+    async def obter_serie(
+        self, moeda_origem: str, moeda_destino: str, inicio: date, fim: date
+    ) -> SerieHistorica:
+        """
+        Retorna as taxas diárias origem->destino entre `inicio` e `fim` (limitado a hoje).
+        Raises ValueError se a API externa falhar ao buscar dias ainda não salvos.
+        Raises MoedaDesconhecidaError se alguma das moedas não tiver taxa em nenhum dia salvo.
+        """
+        moeda_origem = moeda_origem.upper()
+        moeda_destino = moeda_destino.upper()
+        hoje = datetime.now(timezone.utc).date()
+        fim = min(fim, hoje)
+
+        lacunas: List[Tuple[date, date]] = []
+        faltando = await self._dias_faltando(inicio, fim)
+        if faltando:
+            lacunas = agrupar_lacunas(faltando, self._tolerancia)
+            await self._buscar_e_salvar(lacunas, hoje)
+
+        pontos = await self._pontos(moeda_origem, moeda_destino, inicio, fim)
+        if not pontos:
+            await self._validar_moedas({moeda_origem, moeda_destino})
+
+        return SerieHistorica(
+            moeda_origem=moeda_origem,
+            moeda_destino=moeda_destino,
+            inicio=inicio,
+            fim=fim,
+            pontos=pontos,
+            # Lacunas próximas são buscadas juntas: conta também os dias salvos entre elas
+            dias_buscados_api=sum((fim_lacuna - inicio_lacuna).days + 1 for inicio_lacuna, fim_lacuna in lacunas),
+        )
+
+    async def _validar_moedas(self, moedas: Set[str]) -> None:
+        """
+        Série vazia: distingue um intervalo sem dias úteis de uma moeda que não existe.
+        Sem nenhuma taxa salva para a moeda base não há com o que comparar.
+        """
+        moedas = moedas - {self._moeda_base}
+        if not moedas:
+            return
+        result = await self.db.execute(
+            select(TaxaHistorica.moeda)
+            .where(TaxaHistorica.moeda_base == self._moeda_base, TaxaHistorica.moeda.in_(moedas))
+            .distinct()
+        )
+        desconhecidas = moedas - set(result.scalars().all())
+        if not desconhecidas:
+            return
+        result = await self.db.execute(
+            select(TaxaHistorica.moeda).where(TaxaHistorica.moeda_base == self._moeda_base).limit(1)
+        )
+        if result.first() is not None:
+            raise MoedaDesconhecidaError(
+                f"Moeda sem cotação no histórico: {', '.join(sorted(desconhecidas))}."
+            )
+
+    async def _dias_faltando(self, inicio: date, fim: date) -> List[date]:
+        result = await self.db.execute(
+            select(DiaHistoricoConsultado.data).where(
+                DiaHistoricoConsultado.moeda_base == self._moeda_base,
+                DiaHistoricoConsultado.data.between(inicio, fim),
+            )
+        )
+        consultados: Set[date] = set(result.scalars().all())
+        return [dia for dia in _dias(inicio, fim) if dia not in consultados]
+
+    async def _buscar_e_salvar(self, lacunas: List[Tuple[date, date]], hoje: date) -> None:
+        # Requisições simultâneas pelo mesmo intervalo compartilham a chamada externa;
+        # cada uma grava com a própria sessão, ignorando linhas que já existirem
+        series = await asyncio.gather(*(
+            self._single_flight.executar(
+                f"historico:{self._moeda_base}:{inicio}..{fim}",
+                lambda inicio=inicio, fim=fim: self._provider.buscar_serie(self._moeda_base, inicio, fim),
+            )
+            for inicio, fim in lacunas
+        ))
+
+        agora = datetime.utcnow()
+        taxas = []
+        dias = []
+        for (inicio, fim), serie in zip(lacunas, series):
+            for dia, moedas in serie.items():
+                # A API pode devolver o último dia útil anterior ao intervalo
+                if inicio <= dia <= fim:
+                    taxas.extend(
+                        {"moeda_base": self._moeda_base, "moeda": moeda, "data": dia, "taxa": taxa}
+                        for moeda, taxa in moedas.items()
+                    )
+            ultimo_dia_fechado = min(fim, hoje - timedelta(days=1))
+            if inicio <= ultimo_dia_fechado:
+                dias.extend(
+                    {"moeda_base": self._moeda_base, "data": dia, "consultado_em": agora}
+                    for dia in _dias(inicio, ultimo_dia_fechado)
+                )
+
+        await self._inserir_ignorando_existentes(TaxaHistorica, taxas)
+        await self._inserir_ignorando_existentes(DiaHistoricoConsultado, dias)
+        await self.db.commit()
+
+    async def _inserir_ignorando_existentes(self, modelo, linhas: List[dict]) -> None:
+        if not linhas:
+            return
+        dialeto = self.db.get_bind().dialect.name
+        if dialeto == "postgresql":
+            stmt = postgresql.insert(modelo).on_conflict_do_nothing()
+        elif dialeto == "sqlite":
+            stmt = sqlite.insert(modelo).on_conflict_do_nothing()
+        else:
+            stmt = insert(modelo)
+        await self.db.execute(stmt, linhas)
+
+    async def _pontos(
+        self, moeda_origem: str, moeda_destino: str, inicio: date, fim: date
+    ) -> List[PontoHistorico]:
+        moedas = {moeda_origem, moeda_destino} - {self._moeda_base}
+        filtros = [
+            TaxaHistorica.moeda_base == self._moeda_base,
+            TaxaHistorica.data.between(inicio, fim),
+        ]
+        taxas: Dict[date, Dict[str, float]] = defaultdict(dict)
+
+        if moedas:
+            result = await self.db.execute(
+                select(TaxaHistorica.data, TaxaHistorica.moeda, TaxaHistorica.taxa)
+                .where(*filtros, TaxaHistorica.moeda.in_(moedas))
+                .order_by(TaxaHistorica.data)
+            )
+            for dia, moeda, taxa in result.all():
+                taxas[dia][moeda] = taxa
+        else:
+            # Base -> base: vale 1 em todos os dias com cotação
+            result = await self.db.execute(
+                select(TaxaHistorica.data).where(*filtros).distinct().order_by(TaxaHistorica.data)
+            )
+            for dia in result.scalars().all():
+                taxas[dia] = {}
+
+        pontos = []
+        for dia, moedas_dia in taxas.items():
+            moedas_dia[self._moeda_base] = 1.0
+            taxa_origem = moedas_dia.get(moeda_origem)
+            taxa_destino = moedas_dia.get(moeda_destino)
+            if taxa_origem is None or taxa_destino is None:
+                continue
+            pontos.append(PontoHistorico(data=dia, taxa_cambio=taxa_destino / taxa_origem))
+        return pontos
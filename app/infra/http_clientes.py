@@ -0,0 +1,139 @@
+# app/infra/http_clientes.py
+import importlib.util
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional
+
+import httpx
+
+from app.core.config import settings
+from app.core.metricas import upstream_duracao, upstream_erros
+from app.infra.rate_limit import BaldeTokens
+from app.infra.resiliencia import Resiliencia
+
+
+def _http2_disponivel() -> bool:
+    """HTTP/2 no httpx depende do pacote opcional `h2`."""
+    return importlib.util.find_spec("h2") is not None
+
+
+class PoolClientesHttp:
+    """
+    Mantém um único httpx.AsyncClient (com pool de conexões) por host externo.
+    Criado no lifespan da aplicação e fechado no shutdown.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        http2: bool = True,
+    ) -> None:
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._http2 = http2 and _http2_disponivel()
+        self._clientes: Dict[str, httpx.AsyncClient] = {}
+
+    @classmethod
+    def from_settings(cls) -> "PoolClientesHttp":
+        return cls(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry_seconds,
+            http2=settings.http2_enabled,
+        )
+
+    def obter(self, base_url: str) -> httpx.AsyncClient:
+        """
+        Retorna o cliente compartilhado do host de `base_url`, criando-o se necessário.
+        O timeout é definido por requisição pelo provider.
+        """
+        host = httpx.URL(base_url).host
+        cliente = self._clientes.get(host)
+        if cliente is None or cliente.is_closed:
+            cliente = httpx.AsyncClient(limits=self._limits, http2=self._http2)
+            self._clientes[host] = cliente
+        return cliente
+
+    async def fechar(self) -> None:
+        """Fecha todos os clientes (e suas conexões) abertos pelo pool."""
+        clientes = list(self._clientes.values())
+        self._clientes.clear()
+        for cliente in clientes:
+            await cliente.aclose()
+
+
+class ProviderHttpBase:
+    """
+    Base dos adapters HTTP: usa o cliente compartilhado quando injetado
+    e, fora do lifespan da aplicação (scripts, testes), um cliente avulso.
+    Com um `limitador`, toda chamada passa antes pelo token bucket do provider.
+    Retry, prazo total e circuit breaker vêm da `resiliencia` (ver `_get_json`).
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float,
+        cliente: Optional[httpx.AsyncClient] = None,
+        limitador: Optional[BaldeTokens] = None,
+        resiliencia: Optional[Resiliencia] = None,
+    ) -> None:
+        self._base_url = base_url.rstrip("/")
+        self._timeout = timeout
+        self._cliente = cliente
+        self.limitador = limitador
+        self.resiliencia = resiliencia or Resiliencia(type(self).__name__)
+
+    def usar_cliente(self, cliente: Optional[httpx.AsyncClient]) -> None:
+        """Injeta (ou remove, com None) o cliente HTTP compartilhado."""
+        self._cliente = cliente
+
+    def conectar(self, pool: PoolClientesHttp) -> None:
+        """Injeta o cliente do pool correspondente ao host deste provider."""
+        self.usar_cliente(pool.obter(self._base_url))
+
+    @asynccontextmanager
+    async def _client(self) -> AsyncIterator[httpx.AsyncClient]:
+        if self._cliente is not None and not self._cliente.is_closed:
+            yield self._cliente
+            return
+        async with httpx.AsyncClient(timeout=self._timeout) as client:
+            yield client
+
+    async def _get(self, url: str, params: Optional[dict] = None) -> httpx.Response:
+        """
+        GET com o timeout do provider, reaproveitando conexões quando possível.
+        Raises LimiteTaxaExcedidoError se o orçamento de chamadas estiver esgotado.
+        """
+        if self.limitador is not None:
+            await self.limitador.adquirir()
+        inicio = time.perf_counter()
+        try:
+            async with self._client() as client:
+                resp = await client.get(url, params=params, timeout=self._timeout)
+        except httpx.TransportError as e:
+            upstream_erros.labels(self.resiliencia.nome, type(e).__name__).inc()
+            raise
+        upstream_duracao.labels(self.resiliencia.nome, str(resp.status_code)).observar(time.perf_counter() - inicio)
+        if self.limitador is not None:
+            self.limitador.observar_resposta(resp)
+        return resp
+
+    async def _get_json(self, url: str, params: Optional[dict] = None) -> Any:
+        """
+        GET que retorna o JSON da resposta, com a política de resiliência do provider.
+        Raises httpx.HTTPStatusError para respostas >= 400 (após os retries, se transitórias).
+        Raises CircuitoAbertoError / LimiteTaxaExcedidoError sem chamar a API.
+        Raises PrazoExcedidoError se o prazo total acabar.
+        """
+        async def _tentativa() -> Any:
+            resp = await self._get(url, params=params)
+            resp.raise_for_status()
+            return resp.json()
+
+        return await self.resiliencia.executar(_tentativa)
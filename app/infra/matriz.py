@@ -0,0 +1,150 @@
+# app/infra/matriz.py
+import asyncio
+import hashlib
+import json
+from array import array
+from datetime import datetime
+from typing import Dict, Optional, Sequence, Tuple
+
+from app.core.compressao import comprimir
+from app.domain.models import TabelaTaxas
+from app.infra.cache import CacheEntry
+
+
+class MatrizCambio:
+    """
+    Snapshot imutável das taxas entre todos os pares de moedas (N×N), guardado em
+    um array contíguo: a taxa origem->destino está na posição i * N + j.
+    O JSON e o ETag são calculados uma vez, na construção; as versões comprimidas
+    do JSON, no primeiro pedido de cada codificação.
+    """
+    __slots__ = ("base", "moedas", "atualizado_em", "tabela", "etag", "corpo", "_indice", "_taxas", "_comprimidos")
+
+    def __init__(self, tabela: TabelaTaxas, atualizado_em: datetime, moedas: Sequence[str] = ()) -> None:
+        self.tabela = tabela
+        self.base = tabela.base
+        self.atualizado_em = atualizado_em
+        self.moedas: Tuple[str, ...] = tuple(m for m in (moedas or tabela.moedas) if m in tabela)
+        self._indice: Dict[str, int] = {m: i for i, m in enumerate(self.moedas)}
+
+        n = len(self.moedas)
+        # Taxa de cada moeda em relação à base: origem->destino = base[destino] / base[origem]
+        em_base = [tabela.taxa(self.base, m) for m in self.moedas]
+        self._taxas = array("d", (destino / origem for origem in em_base for destino in em_base))
+
+        self.corpo = json.dumps(
+            {
+                "base": self.base,
+                "atualizado_em": atualizado_em.isoformat(),
+                "moedas": self.moedas,
+                "taxas": [self._taxas[i * n:(i + 1) * n].tolist() for i in range(n)],
+            },
+            separators=(",", ":"),
+        ).encode("utf-8")
+        # ETag fraco das taxas: uma renovação com os mesmos valores mantém o ETag
+        # (só `atualizado_em` muda) e os clientes continuam recebendo 304
+        conteudo = hashlib.sha256(",".join(self.moedas).encode() + self._taxas.tobytes())
+        self.etag = 'W/"' + conteudo.hexdigest()[:32] + '"'
+        self._comprimidos: Dict[Tuple[str, int], bytes] = {}
+
+    def corpo_comprimido(self, codificacao: str, nivel: int) -> bytes:
+        """JSON comprimido em `codificacao` ("gzip" ou "br"), calculado uma vez por snapshot."""
+        chave = (codificacao, nivel)
+        corpo = self._comprimidos.get(chave)
+        if corpo is None:
+            corpo = self._comprimidos[chave] = comprimir(self.corpo, codificacao, nivel)
+        return corpo
+
+    def taxa(self, moeda_origem: str, moeda_destino: str) -> float:
+        """
+        Taxa origem->destino por indexação direta no array.
+        Raises ValueError se alguma das moedas não estiver na matriz.
+        """
+        try:
+            i = self._indice[moeda_origem.upper()]
+            j = self._indice[moeda_destino.upper()]
+        except KeyError:
+            raise ValueError(
+                f"Cotação {moeda_origem.upper()}->{moeda_destino.upper()} não encontrada na matriz."
+            ) from None
+        return self._taxas[i * len(self.moedas) + j]
+
+
+class PublicadorMatriz:
+    """
+    Mantém a matriz de câmbio atualizada a partir da tabela de taxas do repositório.
+    Cada nova tabela (via ouvinte do repositório ou pela task em background, que
+    também cobre tabelas vindas do cache compartilhado) gera um novo snapshot,
+    publicado com uma única troca de referência: leitores nunca veem uma matriz parcial.
+    A task só lê o cache e publica tabelas renovadas por outras rotas ou processos;
+    quem renova são as requisições (ver `obter`), então um processo ocioso não faz
+    chamadas externas.
+    """
+
+    def __init__(self, cotacao_repo, intervalo_segundos: float, moedas: Sequence[str] = ()) -> None:
+        self._repo = cotacao_repo
+        self._intervalo = intervalo_segundos
+        self._moedas = tuple(m.upper() for m in moedas)
+        self._atual: Optional[MatrizCambio] = None
+        self._task: Optional[asyncio.Task] = None
+        self.publicacoes = 0
+        cotacao_repo.adicionar_ouvinte(self.publicar)
+
+    @property
+    def atual(self) -> Optional[MatrizCambio]:
+        return self._atual
+
+    def publicar(self, entry: CacheEntry) -> MatrizCambio:
+        """Gera e publica o snapshot da tabela em `entry`, se ela ainda não for a publicada."""
+        atual = self._atual
+        if atual is not None and atual.tabela is entry.valor:
+            return atual
+        nova = MatrizCambio(entry.valor, entry.atualizado_em, self._moedas)
+        self._atual = nova
+        self.publicacoes += 1
+        return nova
+
+    async def obter(self) -> Tuple[MatrizCambio, CacheEntry]:
+        """
+        Retorna o snapshot da tabela atual e a entrada do cache de onde ele veio.
+        A leitura passa pelo repositório (barata com a tabela em memória), que renova a
+        tabela antes de expirar ou serve a obsoleta enquanto renova; o snapshot só é
+        reconstruído quando a tabela muda.
+        Raises as exceções do repositório.
+        """
+        entry, _ = await self._repo.obter_entrada_tabela()
+        return self.publicar(entry), entry
+
+    def iniciar(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._executar())
+
+    async def parar(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _executar(self) -> None:
+        while True:
+            # Só leitura do cache (L1 e compartilhado): não dispara renovação nem chamada externa
+            try:
+                entry = await self._repo.entrada_tabela_em_cache()
+                if entry is not None:
+                    self.publicar(entry)
+            except Exception:
+                # Falha pontual: mantém o snapshot anterior e tenta no próximo ciclo
+                pass
+            await asyncio.sleep(self._intervalo)
+
+    def metricas(self) -> Dict[str, object]:
+        atual = self._atual
+        return {
+            "publicacoes": self.publicacoes,
+            "moedas": len(atual.moedas) if atual else 0,
+            "etag": atual.etag if atual else None,
+        }
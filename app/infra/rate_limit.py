@@ -0,0 +1,158 @@
+# app/infra/rate_limit.py
+import asyncio
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+import httpx
+
+from app.infra.resiliencia import ProviderIndisponivelError
+
+
+class LimiteTaxaExcedidoError(ProviderIndisponivelError):
+    """Orçamento de chamadas ao provider esgotado: a chamada foi recusada sem ir à rede."""
+
+
+def segundos_retry_after(valor: Optional[str]) -> Optional[float]:
+    """Interpreta o header Retry-After (segundos ou data HTTP). Retorna None se ausente/inválido."""
+    if not valor:
+        return None
+    try:
+        return max(float(valor), 0.0)
+    except ValueError:
+        pass
+    try:
+        data = parsedate_to_datetime(valor)
+    except (TypeError, ValueError):
+        return None
+    if data.tzinfo is None:
+        data = data.replace(tzinfo=timezone.utc)
+    return max((data - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+class BaldeTokens:
+    """
+    Token bucket de chamadas a um provider externo.
+
+    - taxa_por_segundo: tokens repostos por segundo (ritmo sustentado).
+    - capacidade: rajada máxima permitida.
+    - max_espera_seconds: quanto uma chamada aceita esperar na fila por um token;
+      se a espera prevista for maior, a chamada é recusada na hora
+      (LimiteTaxaExcedidoError) em vez de gastar latência numa chamada condenada.
+
+    Cada chamada reserva seu token (o saldo pode ficar negativo) e dorme o tempo
+    até ele existir, então as chamadas em fila são atendidas na ordem de chegada.
+    `pausar` suspende todas as chamadas (ex: após um 429 com Retry-After).
+    """
+
+    def __init__(
+        self,
+        nome: str,
+        taxa_por_segundo: float,
+        capacidade: float,
+        max_espera_seconds: float = 5.0,
+    ) -> None:
+        self.nome = nome
+        self._taxa = max(taxa_por_segundo, 1e-6)
+        self._capacidade = max(float(capacidade), 1.0)
+        self._max_espera = max(max_espera_seconds, 0.0)
+        self._tokens = self._capacidade
+        self._atualizado_em = time.monotonic()
+        self._pausado_ate = 0.0
+        self.recusadas = 0
+        self.esperas = 0
+        self.pausas = 0
+
+    def _repor(self, agora: float) -> None:
+        self._tokens = min(self._capacidade, self._tokens + (agora - self._atualizado_em) * self._taxa)
+        self._atualizado_em = agora
+
+    def disponiveis(self) -> float:
+        """Tokens disponíveis agora (negativo quando há chamadas aguardando na fila)."""
+        self._repor(time.monotonic())
+        return self._tokens
+
+    async def adquirir(self, custo: float = 1.0) -> None:
+        """
+        Aguarda um token para fazer a chamada.
+        Raises LimiteTaxaExcedidoError se a espera passar de `max_espera_seconds`.
+        """
+        agora = time.monotonic()
+        self._repor(agora)
+        espera_pausa = max(self._pausado_ate - agora, 0.0)
+        # Tokens repostos durante a pausa também contam
+        falta = custo - (self._tokens + espera_pausa * self._taxa)
+        espera = espera_pausa + max(falta, 0.0) / self._taxa
+
+        if espera > self._max_espera:
+            self.recusadas += 1
+            raise LimiteTaxaExcedidoError(
+                f"Limite de chamadas à API {self.nome} atingido, tente novamente em {espera:.0f}s",
+                retry_after=espera,
+            )
+
+        self._tokens -= custo
+        if espera > 0:
+            self.esperas += 1
+            await asyncio.sleep(espera)
+
+    def pausar(self, segundos: float) -> None:
+        """Suspende as chamadas por `segundos` (não encurta uma pausa já maior)."""
+        self._pausado_ate = max(self._pausado_ate, time.monotonic() + segundos)
+        self.pausas += 1
+
+    def observar_resposta(self, resp: httpx.Response) -> None:
+        """Respeita o Retry-After de respostas 429/418/503."""
+        if resp.status_code in (418, 429, 503):
+            segundos = segundos_retry_after(resp.headers.get("Retry-After"))
+            if segundos is not None:
+                self.pausar(segundos)
+
+    def metricas(self) -> Dict[str, float]:
+        return {
+            "tokens_disponiveis": round(self.disponiveis(), 3),
+            "capacidade": self._capacidade,
+            "pausado_por_seconds": round(max(self._pausado_ate - time.monotonic(), 0.0), 3),
+            "recusadas": self.recusadas,
+            "esperas": self.esperas,
+            "pausas": self.pausas,
+        }
+
+
+class BaldeTokensBinance(BaldeTokens):
+    """
+    Token bucket que também acompanha o peso consumido informado pela Binance
+    (`X-MBX-USED-WEIGHT-1M`). Perto do limite do minuto, pausa as chamadas até
+    a virada do minuto em vez de esperar pelo 429 (ou pelo ban 418).
+    """
+
+    def __init__(
+        self,
+        nome: str,
+        taxa_por_segundo: float,
+        capacidade: float,
+        max_espera_seconds: float = 5.0,
+        peso_limite_minuto: int = 6000,
+        peso_margem: float = 0.9,
+    ) -> None:
+        super().__init__(nome, taxa_por_segundo, capacidade, max_espera_seconds)
+        self._peso_limite = peso_limite_minuto
+        self._peso_margem = peso_margem
+        self.peso_usado = 0
+
+    def observar_resposta(self, resp: httpx.Response) -> None:
+        super().observar_resposta(resp)
+        usado = resp.headers.get("X-MBX-USED-WEIGHT-1M") or resp.headers.get("X-MBX-USED-WEIGHT")
+        if usado is None:
+            return
+        try:
+            self.peso_usado = int(usado)
+        except ValueError:
+            return
+        if self._peso_limite and self.peso_usado >= self._peso_limite * self._peso_margem:
+            # A janela de peso da Binance reinicia a cada minuto cheio
+            self.pausar(60 - time.time() % 60)
+
+    def metricas(self) -> Dict[str, float]:
+        return {**super().metricas(), "peso_usado": self.peso_usado, "peso_limite": self._peso_limite}
@@ -0,0 +1,252 @@
+# app/infra/resiliencia.py
+import asyncio
+import random
+import time
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+
+import httpx
+
+from app.core.config import settings
+
+T = TypeVar("T")
+
+
+class ProviderIndisponivelError(Exception):
+    """
+    O provider não foi chamado porque não deve ser chamado agora (orçamento
+    esgotado, circuito aberto). `retry_after` indica quando tentar de novo.
+    """
+
+    def __init__(self, mensagem: str, retry_after: float) -> None:
+        super().__init__(mensagem)
+        self.retry_after = retry_after
+
+
+class CircuitoAbertoError(ProviderIndisponivelError):
+    """Circuito aberto após falhas seguidas: a chamada falha na hora, sem ir à rede."""
+
+
+class PrazoExcedidoError(Exception):
+    """O prazo total da chamada (todas as tentativas somadas) acabou."""
+
+
+def falha_transitoria(exc: BaseException) -> bool:
+    """
+    Indica se o erro é do upstream e pode passar com nova tentativa:
+    timeout, falha de conexão, 5xx ou 429. Erros 4xx (ex: símbolo inválido)
+    não mudam com retry.
+    """
+    if isinstance(exc, (httpx.TransportError, asyncio.TimeoutError, PrazoExcedidoError)):
+        return True
+    if isinstance(exc, httpx.HTTPStatusError):
+        status = exc.response.status_code
+        return status >= 500 or status == 429
+    return False
+
+
+class PoliticaRetry:
+    """
+    Retry com backoff exponencial e jitter decorrelacionado
+    (espera = aleatório entre `base` e 3x a espera anterior, limitada a `teto`),
+    que espalha as novas tentativas de vários clientes em vez de sincronizá-las.
+    `prazo_seconds` limita o tempo total da chamada, somando tentativas e esperas.
+    """
+
+    def __init__(
+        self,
+        max_tentativas: int = 3,
+        base_seconds: float = 0.2,
+        teto_seconds: float = 2.0,
+        prazo_seconds: float = 10.0,
+    ) -> None:
+        self.max_tentativas = max(max_tentativas, 1)
+        self.base_seconds = base_seconds
+        self.teto_seconds = teto_seconds
+        self.prazo_seconds = prazo_seconds
+
+    def proxima_espera(self, espera_anterior: float) -> float:
+        return min(self.teto_seconds, random.uniform(self.base_seconds, max(espera_anterior, self.base_seconds) * 3))
+
+
+class DisjuntorCircuito:
+    """
+    Circuit breaker de um provider.
+
+    - fechado: chamadas normais; `limite_falhas` falhas seguidas abrem o circuito.
+    - aberto: chamadas falham na hora (CircuitoAbertoError) por `tempo_aberto_seconds`.
+    - meio_aberto: passado esse tempo, até `max_sondas` chamadas testam o upstream;
+      sucesso fecha o circuito, falha o abre de novo.
+    """
+
+    FECHADO = "fechado"
+    ABERTO = "aberto"
+    MEIO_ABERTO = "meio_aberto"
+
+    def __init__(
+        self,
+        nome: str,
+        limite_falhas: int = 5,
+        tempo_aberto_seconds: float = 30.0,
+        max_sondas: int = 1,
+    ) -> None:
+        self.nome = nome
+        self._limite_falhas = max(limite_falhas, 1)
+        self._tempo_aberto = tempo_aberto_seconds
+        self._max_sondas = max(max_sondas, 1)
+        self._estado = self.FECHADO
+        self._falhas_seguidas = 0
+        self._aberto_em = 0.0
+        self._sondas = 0
+        self.aberturas = 0
+        self.rejeitadas = 0
+
+    @property
+    def estado(self) -> str:
+        if self._estado == self.ABERTO and time.monotonic() - self._aberto_em >= self._tempo_aberto:
+            self._estado = self.MEIO_ABERTO
+            self._sondas = 0
+        return self._estado
+
+    def permitir(self) -> bool:
+        """
+        Reserva a passagem de uma chamada. Retorna se ela é uma sonda (meio aberto).
+        Raises CircuitoAbertoError se a chamada não pode passar.
+        """
+        estado = self.estado
+        if estado == self.FECHADO:
+            return False
+        if estado == self.MEIO_ABERTO and self._sondas < self._max_sondas:
+            self._sondas += 1
+            return True
+        self.rejeitadas += 1
+        restante = max(self._tempo_aberto - (time.monotonic() - self._aberto_em), 0.0)
+        raise CircuitoAbertoError(
+            f"API {self.nome} indisponível (circuito aberto), tente novamente em {restante:.0f}s",
+            retry_after=restante,
+        )
+
+    def registrar_sucesso(self, sonda: bool) -> None:
+        if sonda:
+            self._sondas -= 1
+        self._falhas_seguidas = 0
+        self._estado = self.FECHADO
+
+    def registrar_falha(self, sonda: bool) -> None:
+        if sonda:
+            self._sondas -= 1
+        self._falhas_seguidas += 1
+        if sonda or self._falhas_seguidas >= self._limite_falhas:
+            if self._estado != self.ABERTO:
+                self.aberturas += 1
+            self._estado = self.ABERTO
+            self._aberto_em = time.monotonic()
+
+    def liberar(self, sonda: bool) -> None:
+        """Devolve a sonda sem sucesso nem falha (ex: a chamada nem chegou ao upstream)."""
+        if sonda:
+            self._sondas -= 1
+
+    def metricas(self) -> Dict[str, object]:
+        return {
+            "estado": self.estado,
+            "falhas_seguidas": self._falhas_seguidas,
+            "aberturas": self.aberturas,
+            "rejeitadas": self.rejeitadas,
+        }
+
+
+class Resiliencia:
+    """
+    Política única de chamadas aos providers: circuit breaker + retry com
+    jitter decorrelacionado + prazo total. Com o upstream fora do ar, o circuito
+    abre e as chamadas seguintes falham em milissegundos.
+    """
+
+    def __init__(
+        self,
+        nome: str,
+        politica: Optional[PoliticaRetry] = None,
+        disjuntor: Optional[DisjuntorCircuito] = None,
+    ) -> None:
+        self.nome = nome
+        self.politica = politica or PoliticaRetry()
+        self.disjuntor = disjuntor or DisjuntorCircuito(nome)
+        self.tentativas = 0
+        self.repeticoes = 0
+
+    @classmethod
+    def from_settings(cls, nome: str, max_tentativas: Optional[int] = None) -> "Resiliencia":
+        return cls(
+            nome,
+            PoliticaRetry(
+                max_tentativas=max_tentativas or settings.resiliencia_max_tentativas,
+                base_seconds=settings.resiliencia_backoff_base_seconds,
+                teto_seconds=settings.resiliencia_backoff_teto_seconds,
+                prazo_seconds=settings.resiliencia_prazo_seconds,
+            ),
+            DisjuntorCircuito(
+                nome,
+                limite_falhas=settings.circuito_limite_falhas,
+                tempo_aberto_seconds=settings.circuito_tempo_aberto_seconds,
+            ),
+        )
+
+    async def executar(self, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Executa `fn` com retry para falhas transitórias, dentro do prazo total.
+        Raises CircuitoAbertoError se o circuito estiver aberto.
+        Raises PrazoExcedidoError se o prazo acabar durante uma tentativa.
+        Demais erros são propagados como vieram de `fn` (o último, se houve retry).
+        """
+        limite = time.monotonic() + self.politica.prazo_seconds
+        espera = self.politica.base_seconds
+
+        tentativa = 0
+        while True:
+            tentativa += 1
+            sonda = self.disjuntor.permitir()
+            self.tentativas += 1
+            restante = limite - time.monotonic()
+            try:
+                if restante <= 0:
+                    raise PrazoExcedidoError(f"Prazo de {self.politica.prazo_seconds:.0f}s da API {self.nome} esgotado")
+                try:
+                    resultado = await asyncio.wait_for(fn(), restante)
+                except asyncio.TimeoutError as e:
+                    raise PrazoExcedidoError(
+                        f"Prazo de {self.politica.prazo_seconds:.0f}s da API {self.nome} esgotado"
+                    ) from e
+            except (ProviderIndisponivelError, asyncio.CancelledError):
+                # Recusada antes de ir à rede (ex: orçamento de chamadas) ou cancelada:
+                # não diz nada sobre o upstream
+                self.disjuntor.liberar(sonda)
+                raise
+            except Exception as e:
+                if not falha_transitoria(e):
+                    if isinstance(e, httpx.HTTPStatusError):
+                        # O upstream respondeu (ex: 4xx): está de pé, e o erro não muda com retry
+                        self.disjuntor.registrar_sucesso(sonda)
+                    else:
+                        # Resposta inutilizável (JSON inválido, campos faltando): conta contra
+                        # o upstream, mas repetir na hora não ajuda
+                        self.disjuntor.registrar_falha(sonda)
+                    raise
+                self.disjuntor.registrar_falha(sonda)
+                if isinstance(e, PrazoExcedidoError) or tentativa == self.politica.max_tentativas:
+                    raise
+                espera = self.politica.proxima_espera(espera)
+                if time.monotonic() + espera >= limite:
+                    raise
+                self.repeticoes += 1
+                await asyncio.sleep(espera)
+                continue
+
+            self.disjuntor.registrar_sucesso(sonda)
+            return resultado
+
+    def metricas(self) -> Dict[str, object]:
+        return {
+            **self.disjuntor.metricas(),
+            "tentativas": self.tentativas,
+            "repeticoes": self.repeticoes,
+        }
@@ -0,0 +1,65 @@
+# app/infra/single_flight.py
+import asyncio
+from typing import Awaitable, Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Deduplica chamadas assíncronas concorrentes com a mesma chave:
+    enquanto uma chamada está em andamento, as demais aguardam o mesmo resultado
+    (ou recebem a mesma exceção).
+    """
+
+    def __init__(self) -> None:
+        self._em_andamento: Dict[str, asyncio.Task] = {}
+        self.chamadas = 0  # chamadas que de fato executaram a função
+        self.coalescidas = 0  # chamadas que reaproveitaram uma execução em andamento
+
+    def em_andamento(self, chave: str) -> bool:
+        return chave in self._em_andamento
+
+    def iniciar(self, chave: str, fn: Callable[[], Awaitable[T]]) -> "asyncio.Task[T]":
+        """
+        Retorna a task em andamento para `chave` ou inicia uma nova executando `fn`.
+        A task não é cancelada se quem a iniciou for cancelado.
+        """
+        task = self._em_andamento.get(chave)
+        if task is not None:
+            self.coalescidas += 1
+            return task
+
+        self.chamadas += 1
+        task = asyncio.ensure_future(fn())
+        self._em_andamento[chave] = task
+        task.add_done_callback(lambda t: self._finalizar(chave, t))
+        return task
+
+    async def executar(self, chave: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Executa `fn` uma única vez por chave entre chamadas concorrentes."""
+        return await asyncio.shield(self.iniciar(chave, fn))
+
+    async def aguardar(self, timeout_seconds: float) -> int:
+        """
+        Espera as chamadas em andamento (inclusive as iniciadas em background) terminarem,
+        por até `timeout_seconds`. Retorna quantas ainda estavam em andamento no fim.
+        """
+        tarefas = list(self._em_andamento.values())
+        if tarefas:
+            await asyncio.wait(tarefas, timeout=timeout_seconds)
+        return len(self._em_andamento)
+
+    def _finalizar(self, chave: str, task: asyncio.Task) -> None:
+        if self._em_andamento.get(chave) is task:
+            del self._em_andamento[chave]
+        # Marca a exceção como consumida caso nenhum chamador a aguarde mais
+        if not task.cancelled():
+            task.exception()
+
+    def metricas(self) -> Dict[str, int]:
+        return {
+            "chamadas": self.chamadas,
+            "coalescidas": self.coalescidas,
+            "em_andamento": len(self._em_andamento),
+        }
@@ -0,0 +1,204 @@
+# app/infra/stream.py
+import asyncio
+from typing import Dict, Iterable, List, Optional, Set
+
+from app.infra.cache import CacheEntry
+
+TOPICOS_CRIPTO = ("USDT", "USDC")
+
+
+class AssinanteLentoError(Exception):
+    """Assinante descartou mensagens demais seguidas e foi desconectado."""
+
+
+class Assinatura:
+    """
+    Fila limitada de mensagens de um assinante.
+    Quando a fila enche, a mensagem mais antiga é descartada (o cliente recebe
+    sempre o preço mais recente); descartes demais em sequência encerram a assinatura.
+    """
+    __slots__ = ("topicos", "_fila", "_max_descartes", "descartes_seguidos", "descartadas", "encerrada", "ativa")
+
+    def __init__(self, topicos: Set[str], tamanho_fila: int, max_descartes: int) -> None:
+        self.topicos = topicos
+        self._fila: asyncio.Queue = asyncio.Queue(maxsize=tamanho_fila)
+        self._max_descartes = max_descartes
+        self.descartes_seguidos = 0
+        self.descartadas = 0
+        self.encerrada = False
+        self.ativa = True
+
+    def entregar(self, mensagem: dict) -> None:
+        if self.encerrada:
+            return
+        if self._fila.full():
+            self._fila.get_nowait()
+            self.descartadas += 1
+            self.descartes_seguidos += 1
+            if self.descartes_seguidos > self._max_descartes:
+                self.encerrada = True
+        self._fila.put_nowait(mensagem)
+
+    async def proxima(self, timeout: Optional[float] = None) -> Optional[dict]:
+        """
+        Aguarda a próxima mensagem. Retorna None se o `timeout` expirar.
+        Raises AssinanteLentoError se a assinatura foi encerrada por lentidão.
+        """
+        if self.encerrada:
+            raise AssinanteLentoError("Cliente lento demais: assinatura encerrada")
+        try:
+            mensagem = await asyncio.wait_for(self._fila.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        self.descartes_seguidos = 0
+        return mensagem
+
+
+class HubPrecos:
+    """
+    Distribui cada atualização de preço (cripto ou tabela de câmbio) para todos
+    os assinantes do tópico. Tópicos: "USDT", "USDC" ou pares de câmbio "USD-BRL".
+    """
+
+    def __init__(self, tamanho_fila: int = 32, max_descartes: int = 256, max_assinantes: int = 1000) -> None:
+        self._tamanho_fila = tamanho_fila
+        self._max_descartes = max_descartes
+        self._max_assinantes = max_assinantes
+        self._por_topico: Dict[str, Set[Assinatura]] = {}
+        self._total = 0
+        self._ultimos_cripto: Dict[str, dict] = {}
+        self._tabela: Optional[CacheEntry] = None
+
+    @property
+    def assinantes(self) -> int:
+        return self._total
+
+    def lotado(self) -> bool:
+        return self._total >= self._max_assinantes
+
+    def assinar(self, topicos: Iterable[str]) -> Assinatura:
+        """Cria uma assinatura e já entrega o último valor conhecido de cada tópico."""
+        assinatura = Assinatura(set(), self._tamanho_fila, self._max_descartes)
+        self._total += 1
+        self.atualizar_topicos(assinatura, topicos)
+        return assinatura
+
+    def atualizar_topicos(self, assinatura: Assinatura, topicos: Iterable[str]) -> None:
+        novos = set(topicos)
+        for topico in assinatura.topicos - novos:
+            self._remover(topico, assinatura)
+        for topico in novos - assinatura.topicos:
+            self._por_topico.setdefault(topico, set()).add(assinatura)
+            mensagem = self._ultima_mensagem(topico)
+            if mensagem is not None:
+                assinatura.entregar(mensagem)
+        assinatura.topicos = novos
+
+    def cancelar(self, assinatura: Assinatura) -> None:
+        if not assinatura.ativa:
+            return
+        assinatura.ativa = False
+        for topico in assinatura.topicos:
+            self._remover(topico, assinatura)
+        assinatura.topicos = set()
+        assinatura.encerrada = True
+        self._total -= 1
+
+    def topicos_cripto_assinados(self) -> bool:
+        return any(topico in self._por_topico for topico in TOPICOS_CRIPTO)
+
+    def topicos_cambio_assinados(self) -> List[str]:
+        return [topico for topico in self._por_topico if topico not in TOPICOS_CRIPTO]
+
+    def publicar_cripto(self, simbolo: str, entry: CacheEntry) -> None:
+        mensagem = {
+            "topico": simbolo,
+            "taxa_cambio": entry.valor.valor,
+            "data_cotacao": entry.atualizado_em.isoformat(),
+        }
+        self._ultimos_cripto[simbolo] = mensagem
+        self._publicar(simbolo, mensagem)
+
+    def publicar_tabela(self, entry: CacheEntry) -> None:
+        self._tabela = entry
+        for topico in self.topicos_cambio_assinados():
+            mensagem = self._mensagem_cambio(topico)
+            if mensagem is not None:
+                self._publicar(topico, mensagem)
+
+    def _publicar(self, topico: str, mensagem: dict) -> None:
+        for assinatura in list(self._por_topico.get(topico, ())):
+            assinatura.entregar(mensagem)
+
+    def _ultima_mensagem(self, topico: str) -> Optional[dict]:
+        if topico in TOPICOS_CRIPTO:
+            return self._ultimos_cripto.get(topico)
+        return self._mensagem_cambio(topico)
+
+    def _mensagem_cambio(self, par: str) -> Optional[dict]:
+        if self._tabela is None:
+            return None
+        moeda_origem, moeda_destino = par.split("-")
+        try:
+            taxa = self._tabela.valor.taxa(moeda_origem, moeda_destino)
+        except ValueError:
+            return None
+        return {
+            "topico": par,
+            "taxa_cambio": taxa,
+            "data_cotacao": self._tabela.atualizado_em.isoformat(),
+        }
+
+    def _remover(self, topico: str, assinatura: Assinatura) -> None:
+        assinaturas = self._por_topico.get(topico)
+        if assinaturas is None:
+            return
+        assinaturas.discard(assinatura)
+        if not assinaturas:
+            del self._por_topico[topico]
+
+
+class PublicadorPrecos:
+    """
+    Liga os repositórios ao hub: cada atualização de cache vira uma mensagem, e uma
+    task em background mantém o cache aquecido enquanto houver assinantes.
+    """
+
+    def __init__(self, hub: HubPrecos, cotacao_repo, cripto_repo, intervalo_segundos: float) -> None:
+        self._hub = hub
+        self._cotacao_repo = cotacao_repo
+        self._cripto_repo = cripto_repo
+        self._intervalo = intervalo_segundos
+        self._task: Optional[asyncio.Task] = None
+        cotacao_repo.adicionar_ouvinte(hub.publicar_tabela)
+        cripto_repo.adicionar_ouvinte(hub.publicar_cripto)
+
+    def iniciar(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._executar())
+
+    async def parar(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _executar(self) -> None:
+        while True:
+            # As leituras passam pelo cache: só geram chamadas externas (e mensagens)
+            # quando o valor expira e é renovado.
+            if self._hub.topicos_cripto_assinados():
+                try:
+                    await self._cripto_repo.obter_precos(TOPICOS_CRIPTO)
+                except Exception:
+                    pass
+            if self._hub.topicos_cambio_assinados():
+                try:
+                    await self._cotacao_repo.obter_tabela()
+                except Exception:
+                    pass
+            await asyncio.sleep(self._intervalo)
@@ -1,28 +1,34 @@
 # app/infra/user_repository.py
-from typing import Optional
-from sqlalchemy.orm import Session
+from typing import List, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.domain.user_models import User
 from app.domain.auth_schemas import UserCreate
-from app.core.security import get_password_hash
+from app.core.security import get_password_hash_async
+from app.infra.auth_cache import cache_autenticacao
 
 
 class UserRepository:
     """Repositório para operações com usuários no banco de dados"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
     
-    def get_by_email(self, email: str) -> Optional[User]:
+    async def get_by_email(self, email: str) -> Optional[User]:
         """Busca usuário por email"""
-        return self.db.query(User).filter(User.email == email).first()
+        result = await self.db.execute(select(User).where(User.email == email))
+        return result.scalars().first()
     
-    def get_by_id(self, user_id: int) -> Optional[User]:
+    async def get_by_id(self, user_id: int) -> Optional[User]:
         """Busca usuário por ID"""
-        return self.db.query(User).filter(User.id == user_id).first()
+        return await self.db.get(User, user_id)
     
-    def create(self, user_data: UserCreate) -> User:
-        """Cria um novo usuário"""
-        hashed_password = get_password_hash(user_data.password)
+    async def create(self, user_data: UserCreate) -> User:
+        """
+        Cria um novo usuário.
+        Raises PoolHashSaturadoError se o pool de hash de senhas estiver lotado.
+        """
+        hashed_password = await get_password_hash_async(user_data.password)
         
         db_user = User(
             email=user_data.email,
@@ -32,15 +38,30 @@ class UserRepository:
         )
         
         self.db.add(db_user)
-        self.db.commit()
-        self.db.refresh(db_user)
+        await self.db.commit()
+        await self.db.refresh(db_user)
         
         return db_user
     
-    def email_exists(self, email: str) -> bool:
+    async def update_password_hash(self, user: User, hashed_password: str) -> User:
+        """Substitui o hash da senha (ex: após mudança do custo do bcrypt)"""
+        user.hashed_password = hashed_password
+        await self.db.commit()
+        cache_autenticacao.invalidar_usuario(user.id)
+        return user
+    
+    async def set_active(self, user: User, is_active: bool) -> User:
+        """Ativa/desativa o usuário; a desativação vale na hora para este processo"""
+        user.is_active = is_active
+        await self.db.commit()
+        cache_autenticacao.invalidar_usuario(user.id)
+        return user
+    
+    async def email_exists(self, email: str) -> bool:
         """Verifica se email já está cadastrado"""
-        return self.get_by_email(email) is not None
+        return await self.get_by_email(email) is not None
     
-    def list_all(self, skip: int = 0, limit: int = 100):
+    async def list_all(self, skip: int = 0, limit: int = 100) -> List[User]:
         """Lista todos os usuários"""
-        return self.db.query(User).offset(skip).limit(limit).all()
+        result = await self.db.execute(select(User).offset(skip).limit(limit))
+        return list(result.scalars().all())
@@ -1,16 +1,93 @@
-from fastapi import FastAPI
-from fastapi.middleware.cors import CORSMiddleware
+import asyncio
+import math
 import os
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
-from app.api.cotacao_rotas import router as cotacao_router
+from app.api.cotacao_rotas import (
+    router as cotacao_router,
+    _provider as cotacao_provider,
+    _repo as cotacao_repo,
+    _matriz as matriz_cambio,
+)
 from app.api.auth_rotas import router as auth_router
-from app.api.cripto_rotas import router as cripto_router
+from app.api.cripto_rotas import router as cripto_router, _provider as cripto_provider, _repo as cripto_repo
+from app.api.stream_rotas import router as stream_router, _publicador as stream_publicador
+from app.api.metricas_rotas import router as metricas_router, MiddlewareMetricas, providers_http
+from app.api.compressao_http import MiddlewareCompressao
+from app.api.saude_rotas import router as saude_router, estado_servico
+from app.core.config import settings
+from app.core.security import pool_hash_senhas
+from app.infra.aquecimento import Aquecimento, separar_lista
+from app.infra.cache_compartilhado import obter_cache_compartilhado
+from app.infra.database import engine
+from app.infra.http_clientes import PoolClientesHttp
+from app.infra.resiliencia import ProviderIndisponivelError
+
+
+async def _aquecer() -> None:
+    resultado = None
+    if settings.aquecimento_habilitado:
+        resultado = await Aquecimento(
+            cotacao_repo,
+            cripto_repo,
+            matriz_cambio,
+            pares=separar_lista(settings.aquecimento_pares),
+            simbolos_cripto=separar_lista(settings.aquecimento_cripto),
+        ).executar(settings.aquecimento_timeout_seconds)
+    estado_servico.marcar_pronto(resultado)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Um cliente HTTP com pool de conexões por host externo, reaproveitado entre requisições
+    pool_http = PoolClientesHttp.from_settings()
+    cotacao_provider.conectar(pool_http)
+    cripto_provider.conectar(pool_http)
+    app.state.pool_http = pool_http
+    if settings.crypto_poller_enabled:
+        cripto_repo.iniciar_poller(settings.crypto_poller_interval_seconds)
+    stream_publicador.iniciar()
+    matriz_cambio.iniciar()
+
+    estado_servico.observar_sinais_desligamento()
+    # O aquecimento roda depois que o servidor abre a porta: até ele terminar, /health/ready
+    # responde 503 ("iniciando") e o balanceador ainda não manda tráfego a este processo
+    aquecimento = asyncio.create_task(_aquecer())
+    try:
+        yield
+    finally:
+        # Aqui as requisições em andamento já terminaram (o uvicorn as espera após o SIGTERM)
+        estado_servico.marcar_drenando()
+        aquecimento.cancel()
+        await matriz_cambio.parar()
+        await stream_publicador.parar()
+        await cripto_repo.parar_poller()
+        # Renovações em background ainda em andamento terminam e gravam no cache
+        # compartilhado antes de os clientes HTTP serem fechados
+        await asyncio.gather(
+            cotacao_repo.aguardar_chamadas(settings.resiliencia_prazo_seconds),
+            cripto_repo.aguardar_chamadas(settings.resiliencia_prazo_seconds),
+        )
+        cotacao_provider.usar_cliente(None)
+        cripto_provider.usar_cliente(None)
+        await pool_http.fechar()
+        cache_compartilhado = obter_cache_compartilhado()
+        if cache_compartilhado is not None:
+            await cache_compartilhado.fechar()
+        await engine.dispose()
+        pool_hash_senhas.fechar()
+
 
 # Inicializa a aplicação FastAPI
 app = FastAPI(
     title="Serviço de Cotação de Moedas",
     description="Serviço com autenticação JWT e cache em memória usando Frankfurter API.",
     version="0.3.0",
+    lifespan=lifespan,
 )
 
 # 🔹 CORS: libera o front do Vite (porta 5173) e Render
@@ -34,6 +111,19 @@ render_env = os.getenv("RENDER")
 if render_env:
     origins = ["*"]
 
+# Compressão gzip/brotli; adicionada antes das métricas para que a latência medida inclua a compressão
+if settings.compressao_habilitada:
+    app.add_middleware(
+        MiddlewareCompressao,
+        tamanho_minimo=settings.compressao_tamanho_minimo,
+        nivel_gzip=settings.compressao_nivel_gzip,
+        nivel_brotli=settings.compressao_nivel_brotli,
+        brotli_habilitado=settings.compressao_brotli,
+    )
+
+# Latência por rota e requisições em andamento (exportadas em /metrics)
+app.add_middleware(MiddlewareMetricas)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
@@ -42,6 +132,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.exception_handler(ProviderIndisponivelError)
+async def provider_indisponivel(request: Request, exc: ProviderIndisponivelError):
+    # Sem orçamento de chamadas ou circuito aberto: o cliente deve tentar mais tarde
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(max(math.ceil(exc.retry_after), 1))},
+    )
+
+
 # Inclui as rotas de autenticação
 app.include_router(auth_router)
 
@@ -51,8 +152,33 @@ app.include_router(cotacao_router)
 # Inclui as rotas de criptomoedas
 app.include_router(cripto_router)
 
+# Inclui as rotas de streaming de preços (WebSocket / SSE)
+app.include_router(stream_router)
+
+# Métricas no formato do Prometheus
+app.include_router(metricas_router)
+
+# Sondas de liveness e readiness (/health/live, /health/ready)
+app.include_router(saude_router)
+
 
 @app.get("/health")
 # Endpoint para verificar a saúde da aplicação
 async def healthcheck():
-    return {"status": "ok"}
+    providers = providers_http()
+    limites = {
+        provider.limitador.nome: provider.limitador.metricas()
+        for provider in providers
+        if provider.limitador is not None
+    }
+    circuitos = {provider.resiliencia.nome: provider.resiliencia.metricas() for provider in providers}
+    saude = {
+        "status": "ok",
+        "fase": estado_servico.fase,
+        "limites_api": limites,
+        "circuitos_api": circuitos,
+        "matriz_cambio": matriz_cambio.metricas(),
+    }
+    if hasattr(cripto_provider, "metricas"):
+        saude["cripto_providers"] = cripto_provider.metricas()
+    return saude
@@ -0,0 +1,45 @@
+# app/servidor.py
+"""
+Ponto de entrada de produção: `python -m app.servidor`.
+
+Sobe o uvicorn com `servidor_workers` processos na mesma porta, configurado pelas
+settings (COTACAO_SERVIDOR_*). Cada worker aquece o próprio cache logo após abrir a
+porta (só então `/health/ready` responde 200) e, no SIGTERM, para de aceitar conexões
+novas e espera as requisições em andamento por até `servidor_timeout_desligamento_seconds`.
+
+Sem o cache compartilhado (`cache_backend=redis`), cada worker chamaria as APIs
+externas por conta própria; nesse caso o servidor sobe com um único worker.
+"""
+import logging
+import os
+
+import uvicorn
+
+from app.core.config import settings
+
+
+def _workers() -> int:
+    workers = settings.servidor_workers if settings.servidor_workers > 0 else (os.cpu_count() or 1)
+    if workers > 1 and settings.cache_backend.lower() != "redis":
+        logging.getLogger(__name__).warning(
+            "servidor_workers=%s sem cache_backend=redis: subindo com 1 worker "
+            "(os workers não compartilhariam o cache e multiplicariam as chamadas externas)",
+            workers,
+        )
+        return 1
+    return workers
+
+
+def main() -> None:
+    uvicorn.run(
+        "app.main:app",
+        host=settings.servidor_host,
+        port=int(os.getenv("PORT", settings.servidor_porta)),
+        workers=_workers(),
+        timeout_graceful_shutdown=settings.servidor_timeout_desligamento_seconds,
+        timeout_keep_alive=settings.servidor_timeout_keep_alive_seconds,
+    )
+
+
+if __name__ == "__main__":
+    main()
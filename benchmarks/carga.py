@@ -0,0 +1,209 @@
+# benchmarks/carga.py
+"""
+Teste de carga reproduzível: sobe os upstreams falsos e a aplicação
+(`app.main:app` com uvicorn) localmente, dispara requisições com concorrência
+controlada e grava throughput e p50/p95/p99 de cada cenário em JSON.
+
+Uso: python -m benchmarks.carga --concorrencia 50 --requisicoes 2000 --latencia-ms 50
+"""
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Tuple
+
+import httpx
+
+from benchmarks.resultados import imprimir_tabela, resumir_latencias, salvar
+
+RAIZ = Path(__file__).resolve().parent.parent
+CENARIOS = ("cotacao", "cotacao_lote", "cotacao_historico", "cripto_usdt", "cripto_ambas", "auth_login")
+EMAIL = "benchmark@example.com"
+SENHA = "benchmark123"
+
+
+def _porta_livre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _aguardar_porta(porta: int, processo: subprocess.Popen, timeout: float = 30.0) -> None:
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        if processo.poll() is not None:
+            raise RuntimeError(f"Processo encerrou antes de abrir a porta {porta}")
+        try:
+            with socket.create_connection(("127.0.0.1", porta), timeout=0.2):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"Porta {porta} não abriu em {timeout:.0f}s")
+
+
+def _ambiente_app(args, porta_upstream: int, banco: Path) -> Dict[str, str]:
+    upstream = f"http://127.0.0.1:{porta_upstream}"
+    return {
+        **os.environ,
+        "PYTHONPATH": str(RAIZ),
+        "COTACAO_DATABASE_URL": f"sqlite:///{banco}",
+        "COTACAO_FRANKFURTER_BASE_URL": f"{upstream}/frankfurter",
+        "COTACAO_BINANCE_BASE_URL": f"{upstream}/binance/api/v3",
+        "COTACAO_COINGECKO_BASE_URL": f"{upstream}/coingecko/api/v3",
+        "COTACAO_CRYPTO_PROVIDER": args.provider_cripto,
+        "COTACAO_CACHE_TTL_SECONDS": str(args.cache_ttl),
+        "COTACAO_CRYPTO_CACHE_TTL_SECONDS": str(args.cache_ttl),
+        "COTACAO_BCRYPT_ROUNDS": str(args.bcrypt_rounds),
+        # O orçamento de chamadas não deve ser o gargalo medido
+        "COTACAO_FRANKFURTER_RATE_LIMIT_POR_SEGUNDO": "1000000",
+        "COTACAO_FRANKFURTER_RATE_LIMIT_RAJADA": "1000000",
+        "COTACAO_BINANCE_RATE_LIMIT_POR_SEGUNDO": "1000000",
+        "COTACAO_BINANCE_RATE_LIMIT_RAJADA": "1000000",
+        "COTACAO_COINGECKO_RATE_LIMIT_POR_SEGUNDO": "1000000",
+        "COTACAO_COINGECKO_RATE_LIMIT_RAJADA": "1000000",
+    }
+
+
+def _criar_tabelas(ambiente: Dict[str, str]) -> None:
+    # Em processo separado: o engine lê a URL do banco das variáveis de ambiente na importação
+    codigo = (
+        "import asyncio\n"
+        "from app.infra.database import Base, engine\n"
+        "import app.domain.user_models, app.domain.historico_models\n"
+        "async def main():\n"
+        "    async with engine.begin() as conn:\n"
+        "        await conn.run_sync(Base.metadata.create_all)\n"
+        "    await engine.dispose()\n"
+        "asyncio.run(main())\n"
+    )
+    subprocess.run([sys.executable, "-c", codigo], env=ambiente, cwd=RAIZ, check=True)
+
+
+def _requisicao(cenario: str) -> Callable[[httpx.AsyncClient], Awaitable[httpx.Response]]:
+    if cenario == "cotacao":
+        return lambda c: c.get("/cotacao", params={"moeda_origem": "USD", "moeda_destino": "BRL"})
+    if cenario == "cotacao_lote":
+        return lambda c: c.get("/cotacao/lote", params={"pares": "USD-BRL,EUR-BRL,GBP-JPY,BRL-ARS"})
+    if cenario == "cotacao_historico":
+        return lambda c: c.get(
+            "/cotacao/historico", params={"origem": "USD", "destino": "BRL", "inicio": "2024-01-01", "fim": "2024-03-31"}
+        )
+    if cenario == "cripto_usdt":
+        return lambda c: c.get("/cripto/usdt-brl")
+    if cenario == "cripto_ambas":
+        return lambda c: c.get("/cripto/ambas-brl")
+    if cenario == "auth_login":
+        return lambda c: c.post("/auth/login", json={"email": EMAIL, "password": SENHA})
+    raise ValueError(f"Cenário desconhecido: {cenario}")
+
+
+async def _executar_cenario(
+    cliente: httpx.AsyncClient, cenario: str, concorrencia: int, requisicoes: int
+) -> Tuple[List[float], int, float]:
+    enviar = _requisicao(cenario)
+    latencias: List[float] = []
+    erros = 0
+    restantes = requisicoes
+
+    async def trabalhador() -> None:
+        nonlocal restantes, erros
+        while restantes > 0:
+            restantes -= 1
+            inicio = time.perf_counter()
+            try:
+                resp = await enviar(cliente)
+                if resp.status_code >= 400:
+                    erros += 1
+            except httpx.HTTPError:
+                erros += 1
+            latencias.append(time.perf_counter() - inicio)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(trabalhador() for _ in range(concorrencia)))
+    return latencias, erros, time.perf_counter() - inicio
+
+
+async def _executar(args, base_url: str) -> Dict[str, dict]:
+    limites = httpx.Limits(max_connections=args.concorrencia, max_keepalive_connections=args.concorrencia)
+    async with httpx.AsyncClient(base_url=base_url, limits=limites, timeout=30.0) as cliente:
+        await cliente.post("/auth/register", json={"email": EMAIL, "password": SENHA})
+
+        resultados = {}
+        for cenario in args.cenarios:
+            # Aquecimento: conexões abertas e cache preenchido antes da medição
+            await _executar_cenario(cliente, cenario, min(args.concorrencia, 5), args.aquecimento)
+            latencias, erros, duracao = await _executar_cenario(
+                cliente, cenario, args.concorrencia, args.requisicoes
+            )
+            resultados[cenario] = resumir_latencias(latencias, duracao, erros)
+        return resultados
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cenarios", nargs="+", choices=CENARIOS, default=list(CENARIOS))
+    parser.add_argument("--concorrencia", type=int, default=20)
+    parser.add_argument("--requisicoes", type=int, default=1000, help="Requisições medidas por cenário")
+    parser.add_argument("--aquecimento", type=int, default=50, help="Requisições descartadas antes de medir")
+    parser.add_argument("--latencia-ms", type=float, default=20.0, help="Latência dos upstreams falsos")
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument("--taxa-erro", type=float, default=0.0, help="Fração de respostas 503 dos upstreams")
+    parser.add_argument("--provider-cripto", default="binance", choices=("binance", "coingecko"))
+    parser.add_argument("--cache-ttl", type=int, default=60, help="TTL dos caches (0 força chamadas externas)")
+    parser.add_argument("--bcrypt-rounds", type=int, default=12)
+    parser.add_argument("--workers", type=int, default=1, help="Workers do uvicorn")
+    parser.add_argument("--saida", type=Path, help="Arquivo JSON de saída")
+    args = parser.parse_args()
+
+    porta_upstream = _porta_livre()
+    porta_app = _porta_livre()
+    processos: List[subprocess.Popen] = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ambiente = _ambiente_app(args, porta_upstream, Path(tmp) / "benchmark.db")
+        try:
+            upstream = subprocess.Popen(
+                [
+                    sys.executable, "-m", "benchmarks.upstreams_falsos",
+                    "--porta", str(porta_upstream),
+                    "--latencia-ms", str(args.latencia_ms),
+                    "--jitter-ms", str(args.jitter_ms),
+                    "--taxa-erro", str(args.taxa_erro),
+                ],
+                cwd=RAIZ,
+                env=ambiente,
+            )
+            processos.append(upstream)
+            _criar_tabelas(ambiente)
+            app = subprocess.Popen(
+                [
+                    sys.executable, "-m", "uvicorn", "app.main:app",
+                    "--host", "127.0.0.1", "--port", str(porta_app),
+                    "--workers", str(args.workers), "--log-level", "warning", "--no-access-log",
+                ],
+                cwd=RAIZ,
+                env=ambiente,
+            )
+            processos.append(app)
+            _aguardar_porta(porta_upstream, upstream)
+            _aguardar_porta(porta_app, app)
+
+            cenarios = asyncio.run(_executar(args, f"http://127.0.0.1:{porta_app}"))
+        finally:
+            for processo in processos:
+                processo.terminate()
+            for processo in processos:
+                processo.wait(timeout=10)
+
+    configuracao = {chave: valor for chave, valor in vars(args).items() if chave != "saida"}
+    imprimir_tabela(cenarios, ("throughput_rps", "p50_ms", "p95_ms", "p99_ms", "erros"))
+    print(f"\nResultado salvo em {salvar('carga', configuracao, cenarios, args.saida)}")
+
+
+if __name__ == "__main__":
+    main()
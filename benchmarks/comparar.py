@@ -0,0 +1,64 @@
+# benchmarks/comparar.py
+"""
+Compara dois resultados JSON (carga ou micro) e mostra a variação percentual
+de cada métrica por cenário. Retorna código 1 se alguma métrica piorar além
+do limite, para uso em CI.
+
+Uso: python -m benchmarks.comparar base.json novo.json --limite 10
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# Métricas em que valores maiores são melhores; nas demais (latências), menores são melhores
+_MAIOR_MELHOR = {"throughput_rps", "ops_por_segundo", "mb_s"}
+_IGNORADAS = {"requisicoes", "operacoes", "duracao_s", "erros"}
+
+
+def comparar(base: dict, novo: dict, limite_pct: float) -> Tuple[List[Tuple[str, str, float, float, float]], bool]:
+    """Retorna as linhas (cenário, métrica, base, novo, variação %) e se houve regressão."""
+    linhas = []
+    regressao = False
+    for cenario, metricas_novas in novo["cenarios"].items():
+        metricas_base: Dict[str, float] = base["cenarios"].get(cenario, {})
+        for metrica, valor_novo in metricas_novas.items():
+            if metrica in _IGNORADAS or metrica not in metricas_base:
+                continue
+            valor_base = metricas_base[metrica]
+            if not valor_base:
+                continue
+            variacao = (valor_novo - valor_base) / valor_base * 100
+            piora = -variacao if metrica in _MAIOR_MELHOR else variacao
+            if piora > limite_pct:
+                regressao = True
+            linhas.append((cenario, metrica, valor_base, valor_novo, variacao))
+    return linhas, regressao
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base", type=Path)
+    parser.add_argument("novo", type=Path)
+    parser.add_argument("--limite", type=float, default=10.0, help="Piora máxima aceita, em %%")
+    args = parser.parse_args()
+
+    base = json.loads(args.base.read_text(encoding="utf-8"))
+    novo = json.loads(args.novo.read_text(encoding="utf-8"))
+    if base.get("tipo") != novo.get("tipo"):
+        sys.exit(f"Resultados de tipos diferentes: {base.get('tipo')} x {novo.get('tipo')}")
+
+    print(f"base: {base.get('commit')} ({base.get('data')})")
+    print(f"novo: {novo.get('commit')} ({novo.get('data')})\n")
+    linhas, regressao = comparar(base, novo, args.limite)
+    for cenario, metrica, valor_base, valor_novo, variacao in linhas:
+        print(f"{cenario:<30}{metrica:<18}{valor_base:>14}{valor_novo:>14}{variacao:>+10.1f}%")
+
+    if regressao:
+        print(f"\nRegressão acima de {args.limite:.0f}% detectada")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+# benchmarks/compressao.py
+"""
+Custo x ganho da compressão das respostas, sem rede: para corpos típicos do serviço
+(cotação avulsa, lote, matriz, lista de usuários e conversão em lote) mede
+o tamanho comprimido e o tempo de CPU de cada codificação e nível.
+
+`ms_total` estima o tempo para entregar a resposta num link de `--banda-mbps`
+(CPU da compressão + bytes na rede): mostra a partir de que tamanho comprimir compensa
+e serve de base para `compressao_tamanho_minimo` e os níveis configurados.
+
+Uso: python -m benchmarks.compressao --repeticoes 50 --banda-mbps 20
+"""
+import argparse
+import json
+import random
+import statistics
+import time
+from datetime import datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import Dict, List, Tuple, get_args
+
+from benchmarks.resultados import imprimir_tabela, salvar
+from app.core.compressao import brotli_disponivel, comprimir
+from app.domain.auth_schemas import UserResponse
+from app.domain.models import Cotacao, CotacaoLote, Moeda, TabelaTaxas
+from app.infra.conversor_lote import ConversorLote, LinhaConversao, formatar_ndjson
+from app.infra.matriz import MatrizCambio
+
+# Moedas da Frankfurter (taxas de referência do BCE)
+_MOEDAS = (
+    "AUD BGN BRL CAD CHF CNY CZK DKK GBP HKD HUF IDR ILS INR ISK JPY KRW MXN MYR NOK "
+    "NZD PHP PLN RON SEK SGD THB TRY USD ZAR"
+).split()
+
+
+def _tabela(aleatorio: random.Random) -> TabelaTaxas:
+    return TabelaTaxas("EUR", {m: round(aleatorio.uniform(0.5, 1500.0), 4) for m in _MOEDAS})
+
+
+def corpos(aleatorio: random.Random) -> Dict[str, bytes]:
+    """Corpos representativos das respostas, montados pelos mesmos modelos e funções das rotas."""
+    tabela = _tabela(aleatorio)
+    agora = datetime(2025, 11, 17, 10, 30)
+
+    def cotacao(origem: str, destino: str) -> Cotacao:
+        return Cotacao(
+            moeda_origem=origem, moeda_destino=destino, taxa_cambio=tabela.taxa(origem, destino),
+            data_cotacao=agora, fonte="cache",
+        )
+
+    moedas_cotacao = get_args(Moeda)
+    pares = [(aleatorio.choice(moedas_cotacao), aleatorio.choice(moedas_cotacao)) for _ in range(100)]
+    usuarios = [
+        UserResponse(
+            id=i, email=f"usuario{i}@exemplo.com", full_name=f"Usuário {i}", is_active=i % 7 != 0, created_at=agora
+        ).model_dump(mode="json")
+        for i in range(1, 501)
+    ]
+    conversor = ConversorLote(tabela)
+    linhas = [
+        LinhaConversao(
+            i, Decimal(aleatorio.randint(1, 10_000_000)).scaleb(-2), aleatorio.choice(_MOEDAS), aleatorio.choice(_MOEDAS)
+        )
+        for i in range(1, 10_001)
+    ]
+
+    return {
+        "cotacao": cotacao("USD", "BRL").model_dump_json().encode(),
+        "cotacao_lote_100": CotacaoLote(cotacoes=[cotacao(o, d) for o, d in pares], erros=[]).model_dump_json().encode(),
+        "matriz_31": MatrizCambio(tabela, agora).corpo,
+        "usuarios_500": json.dumps(usuarios).encode(),
+        "converter_10k": formatar_ndjson(conversor.converter(linhas)),
+    }
+
+
+def codificacoes() -> List[Tuple[str, int]]:
+    niveis = [("gzip", 1), ("gzip", 6), ("gzip", 9)]
+    if brotli_disponivel():
+        niveis += [("br", 1), ("br", 4), ("br", 6), ("br", 11)]
+    return niveis
+
+
+def medir(corpo: bytes, codificacao: str, nivel: int, repeticoes: int, banda_mbps: float) -> Dict[str, float]:
+    comprimir(corpo, codificacao, nivel)  # aquecimento
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        comprimido = comprimir(corpo, codificacao, nivel)
+        tempos.append(time.perf_counter() - inicio)
+    cpu = statistics.median(tempos)
+    return {
+        "bytes": len(comprimido),
+        "razao": round(len(comprimido) / len(corpo), 3),
+        "us_cpu": round(cpu * 1e6, 1),
+        "mb_s": round(len(corpo) / cpu / 1e6, 1) if cpu > 0 else 0.0,
+        "ms_total": round((cpu + len(comprimido) * 8 / (banda_mbps * 1e6)) * 1000, 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeticoes", type=int, default=50, help="Compressões medidas por corpo e nível")
+    parser.add_argument("--banda-mbps", type=float, default=20.0, help="Banda do cliente usada em ms_total")
+    parser.add_argument("--semente", type=int, default=42, help="Semente dos dados gerados")
+    parser.add_argument("--saida", type=Path, help="Arquivo JSON de saída")
+    args = parser.parse_args()
+
+    cenarios: Dict[str, dict] = {}
+    for nome, corpo in corpos(random.Random(args.semente)).items():
+        cenarios[f"{nome}/identity"] = {
+            "bytes": len(corpo),
+            "razao": 1.0,
+            "us_cpu": 0.0,
+            "mb_s": 0.0,
+            "ms_total": round(len(corpo) * 8 / (args.banda_mbps * 1e6) * 1000, 3),
+        }
+        for codificacao, nivel in codificacoes():
+            cenarios[f"{nome}/{codificacao}-{nivel}"] = medir(corpo, codificacao, nivel, args.repeticoes, args.banda_mbps)
+
+    configuracao = {
+        "repeticoes": args.repeticoes,
+        "banda_mbps": args.banda_mbps,
+        "semente": args.semente,
+        "brotli": brotli_disponivel(),
+    }
+    imprimir_tabela(cenarios, ("bytes", "razao", "us_cpu", "mb_s", "ms_total"))
+    print(f"\nResultado salvo em {salvar('compressao', configuracao, cenarios, args.saida)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+# benchmarks/micro.py
+"""
+Micro-benchmarks do caminho quente, sem rede:
+
+- CotacaoCache.get (hit e miss) e CotacaoCache.set (com o cache no limite de entradas)
+- CotacaoRepositoryComCache.obter_cotacao com a tabela em cache e com cache expirado
+  (provider em memória, sem latência)
+- Resposta de GET /cotacao em cache: modelo montado e serializado x JSON pré-serializado
+
+Cada medição roda em lotes e reporta a mediana e o melhor lote, em ns por operação.
+
+Uso: python -m benchmarks.micro --operacoes 200000
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List
+
+from benchmarks.resultados import imprimir_tabela, salvar
+from app.domain.portas import CotacaoProvider
+from app.infra.cache import CotacaoCache
+from app.infra.cotacao_repo import CotacaoRepositoryComCache
+
+_LOTES = 7
+
+
+class _ProviderEmMemoria(CotacaoProvider):
+    """Provider sem I/O: isola o custo do repositório e do cache."""
+
+    async def buscar_tabela(self, moeda_base: str) -> Dict[str, float]:
+        return {"USD": 1.08, "BRL": 5.9, "GBP": 0.85, "JPY": 162.0, "ARS": 950.0}
+
+    async def buscar_cotacao(self, moeda_origem: str, moeda_destino: str) -> float:
+        return 1.0
+
+
+def _resumir(tempos_lote: List[float], operacoes_lote: int) -> Dict[str, float]:
+    por_operacao = [t / operacoes_lote * 1e9 for t in tempos_lote]
+    return {
+        "operacoes": operacoes_lote * len(tempos_lote),
+        "ns_op_mediana": round(statistics.median(por_operacao), 1),
+        "ns_op_melhor": round(min(por_operacao), 1),
+        "ops_por_segundo": round(1e9 / statistics.median(por_operacao)),
+    }
+
+
+def _medir(fn: Callable[[int], None], operacoes: int) -> Dict[str, float]:
+    por_lote = max(operacoes // _LOTES, 1)
+    fn(min(por_lote, 1000))  # aquecimento
+    tempos = []
+    for _ in range(_LOTES):
+        inicio = time.perf_counter()
+        fn(por_lote)
+        tempos.append(time.perf_counter() - inicio)
+    return _resumir(tempos, por_lote)
+
+
+def _medir_async(fn: Callable[[int], Awaitable[None]], operacoes: int) -> Dict[str, float]:
+    async def executar() -> Dict[str, float]:
+        por_lote = max(operacoes // _LOTES, 1)
+        await fn(min(por_lote, 1000))
+        tempos = []
+        for _ in range(_LOTES):
+            inicio = time.perf_counter()
+            await fn(por_lote)
+            tempos.append(time.perf_counter() - inicio)
+        return _resumir(tempos, por_lote)
+
+    return asyncio.run(executar())
+
+
+def bench_cache(operacoes: int, max_entradas: int) -> Dict[str, dict]:
+    cache = CotacaoCache(ttl_seconds=3600, max_entradas=max_entradas)
+    chaves = [f"K{i:05d}->BRL" for i in range(max_entradas)]
+    for chave in chaves:
+        cache.set_chave(chave, 5.0)
+    n_chaves = len(chaves)
+
+    def get_hit(n: int) -> None:
+        get = cache.get_chave
+        for i in range(n):
+            get(chaves[i % n_chaves])
+
+    def get_miss(n: int) -> None:
+        get = cache.get_chave
+        for _ in range(n):
+            get("XXX->YYY")
+
+    def set_com_eviction(n: int) -> None:
+        # Chaves novas a cada chamada: o cache está cheio e remove a menos usada
+        set_ = cache.set_chave
+        base = set_com_eviction.proxima
+        for i in range(n):
+            set_(f"N{base + i}->BRL", 5.0)
+        set_com_eviction.proxima = base + n
+
+    set_com_eviction.proxima = 0
+
+    return {
+        "cache_get_hit": _medir(get_hit, operacoes),
+        "cache_get_miss": _medir(get_miss, operacoes),
+        "cache_set_eviction": _medir(set_com_eviction, operacoes),
+    }
+
+
+def bench_repositorio(operacoes: int) -> Dict[str, dict]:
+    quente = CotacaoRepositoryComCache(_ProviderEmMemoria(), CotacaoCache(ttl_seconds=3600))
+    # TTL zero e sem janela obsoleta: toda consulta vai ao provider (custo de buscar e montar a tabela)
+    frio = CotacaoRepositoryComCache(_ProviderEmMemoria(), CotacaoCache(ttl_seconds=0))
+
+    def obter(repo: CotacaoRepositoryComCache):
+        async def executar(n: int) -> None:
+            for _ in range(n):
+                await repo.obter_cotacao("USD", "BRL")
+        return executar
+
+    async def resposta_modelo(n: int) -> None:
+        # Caminho com response_model: monta o modelo e serializa a cada requisição
+        for _ in range(n):
+            entry, fonte = await quente.obter_entrada_tabela()
+            quente.montar_cotacao("USD", "BRL", entry, fonte).model_dump_json()
+
+    async def resposta_pre_serializada(n: int) -> None:
+        for _ in range(n):
+            entry, fonte = await quente.obter_entrada_tabela()
+            quente.cotacao_json("USD", "BRL", entry, fonte)
+
+    return {
+        "repo_obter_cotacao_cache": _medir_async(obter(quente), operacoes),
+        "resposta_cotacao_modelo": _medir_async(resposta_modelo, operacoes),
+        "resposta_cotacao_json_pronto": _medir_async(resposta_pre_serializada, operacoes),
+        "repo_obter_cotacao_sem_cache": _medir_async(obter(frio), max(operacoes // 10, _LOTES)),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--operacoes", type=int, default=200_000, help="Operações por medição")
+    parser.add_argument("--max-entradas", type=int, default=10_000, help="Tamanho do cache nos testes de cache")
+    parser.add_argument("--saida", type=Path, help="Arquivo JSON de saída")
+    args = parser.parse_args()
+
+    cenarios = {**bench_cache(args.operacoes, args.max_entradas), **bench_repositorio(args.operacoes)}
+    configuracao = {"operacoes": args.operacoes, "max_entradas": args.max_entradas}
+
+    imprimir_tabela(cenarios, ("ns_op_mediana", "ns_op_melhor", "ops_por_segundo"))
+    print(f"\nResultado salvo em {salvar('micro', configuracao, cenarios, args.saida)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# benchmarks/resultados.py
+import json
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+DIRETORIO_RESULTADOS = Path(__file__).parent / "resultados"
+
+
+def percentil(valores_ordenados: Sequence[float], p: float) -> float:
+    """Percentil (0-100) por interpolação linear de uma lista já ordenada."""
+    if not valores_ordenados:
+        return 0.0
+    posicao = (len(valores_ordenados) - 1) * p / 100
+    inferior = int(posicao)
+    superior = min(inferior + 1, len(valores_ordenados) - 1)
+    fracao = posicao - inferior
+    return valores_ordenados[inferior] * (1 - fracao) + valores_ordenados[superior] * fracao
+
+
+def resumir_latencias(latencias_seconds: List[float], duracao_seconds: float, erros: int = 0) -> Dict[str, float]:
+    """Throughput e percentis (em ms) de um cenário."""
+    ordenadas = sorted(latencias_seconds)
+    total = len(ordenadas)
+    return {
+        "requisicoes": total,
+        "erros": erros,
+        "duracao_s": round(duracao_seconds, 3),
+        "throughput_rps": round(total / duracao_seconds, 1) if duracao_seconds > 0 else 0.0,
+        "p50_ms": round(percentil(ordenadas, 50) * 1000, 3),
+        "p95_ms": round(percentil(ordenadas, 95) * 1000, 3),
+        "p99_ms": round(percentil(ordenadas, 99) * 1000, 3),
+        "max_ms": round(ordenadas[-1] * 1000, 3) if ordenadas else 0.0,
+    }
+
+
+def _commit_atual() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def salvar(tipo: str, configuracao: dict, cenarios: Dict[str, dict], saida: Optional[Path] = None) -> Path:
+    """
+    Grava o resultado em JSON (por padrão em benchmarks/resultados/<tipo>-<data>-<commit>.json)
+    para comparar execuções entre commits com `python -m benchmarks.comparar`.
+    """
+    commit = _commit_atual()
+    agora = datetime.now(timezone.utc)
+    if saida is None:
+        DIRETORIO_RESULTADOS.mkdir(exist_ok=True)
+        saida = DIRETORIO_RESULTADOS / f"{tipo}-{agora:%Y%m%d-%H%M%S}-{commit or 'sem-git'}.json"
+    dados = {
+        "tipo": tipo,
+        "commit": commit,
+        "data": agora.isoformat(),
+        "configuracao": configuracao,
+        "cenarios": cenarios,
+    }
+    saida.write_text(json.dumps(dados, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    return saida
+
+
+def imprimir_tabela(cenarios: Dict[str, dict], colunas: Sequence[str]) -> None:
+    largura = max([len("cenario")] + [len(nome) for nome in cenarios])
+    print("cenario".ljust(largura) + "".join(c.rjust(16) for c in colunas))
+    for nome, dados in cenarios.items():
+        print(nome.ljust(largura) + "".join(str(dados.get(c, "")).rjust(16) for c in colunas))
@@ -0,0 +1,111 @@
+# benchmarks/upstreams_falsos.py
+"""
+Servidor local que imita as APIs externas usadas pela aplicação, com latência
+e taxa de erro configuráveis:
+
+- Frankfurter: GET /frankfurter/latest e GET /frankfurter/{inicio}..{fim} (série temporal)
+- Binance:     GET /binance/api/v3/ticker/price   (symbol=... ou symbols=[...])
+- CoinGecko:   GET /coingecko/api/v3/simple/price (ids=...&vs_currencies=...)
+
+Uso: python -m benchmarks.upstreams_falsos --porta 8901 --latencia-ms 50 --taxa-erro 0.01
+"""
+import argparse
+import asyncio
+import json
+import random
+from datetime import date, timedelta
+
+from fastapi import FastAPI, HTTPException, Query
+
+# Taxas em relação ao EUR, usadas para montar qualquer moeda base
+_TAXAS_EUR = {
+    "EUR": 1.0, "USD": 1.08, "BRL": 5.9, "GBP": 0.85, "JPY": 162.0, "CHF": 0.95,
+    "CAD": 1.47, "AUD": 1.64, "CNY": 7.8, "ARS": 950.0, "MXN": 18.5, "INR": 90.0,
+}
+_PRECOS_BRL = {"USDT": 5.45, "USDC": 5.46}
+_IDS_COINGECKO = {"tether": "USDT", "usd-coin": "USDC"}
+
+
+def criar_app(latencia_ms: float = 0.0, jitter_ms: float = 0.0, taxa_erro: float = 0.0) -> FastAPI:
+    app = FastAPI(title="Upstreams falsos (benchmark)")
+
+    async def simular() -> None:
+        atraso = max(latencia_ms + random.uniform(-jitter_ms, jitter_ms), 0.0)
+        if atraso:
+            await asyncio.sleep(atraso / 1000)
+        if taxa_erro and random.random() < taxa_erro:
+            raise HTTPException(status_code=503, detail="erro simulado")
+
+    @app.get("/frankfurter/latest")
+    async def frankfurter_latest(moeda_base: str = Query("EUR", alias="from"), to: str = ""):
+        await simular()
+        base = moeda_base.upper()
+        if base not in _TAXAS_EUR:
+            raise HTTPException(status_code=404, detail="moeda não encontrada")
+        destinos = [m.upper() for m in to.split(",") if m] or [m for m in _TAXAS_EUR if m != base]
+        rates = {m: round(_TAXAS_EUR[m] / _TAXAS_EUR[base], 6) for m in destinos if m in _TAXAS_EUR}
+        return {"amount": 1.0, "base": base, "date": "2024-01-02", "rates": rates}
+
+    @app.get("/frankfurter/{intervalo}")
+    async def frankfurter_serie(intervalo: str, moeda_base: str = Query("EUR", alias="from")):
+        await simular()
+        try:
+            inicio, fim = (date.fromisoformat(d) for d in intervalo.split(".."))
+        except ValueError:
+            raise HTTPException(status_code=404, detail="not found")
+        base = moeda_base.upper()
+        rates = {}
+        dia = inicio
+        while dia <= fim:
+            if dia.weekday() < 5:  # só dias úteis, como a API real
+                variacao = 1 + (dia.toordinal() % 30) / 1000
+                rates[dia.isoformat()] = {
+                    m: round(_TAXAS_EUR[m] / _TAXAS_EUR[base] * variacao, 6) for m in _TAXAS_EUR if m != base
+                }
+            dia += timedelta(days=1)
+        return {"amount": 1.0, "base": base, "start_date": inicio.isoformat(), "end_date": fim.isoformat(), "rates": rates}
+
+    @app.get("/binance/api/v3/ticker/price")
+    async def binance_ticker(symbol: str = "", symbols: str = ""):
+        await simular()
+        pedidos = json.loads(symbols) if symbols else [symbol]
+        itens = []
+        for par in pedidos:
+            ativo = par.upper().removesuffix("BRL")
+            if ativo not in _PRECOS_BRL:
+                raise HTTPException(status_code=400, detail="Invalid symbol.")
+            itens.append({"symbol": par.upper(), "price": f"{_PRECOS_BRL[ativo] + random.uniform(-0.01, 0.01):.4f}"})
+        return itens if symbols else itens[0]
+
+    @app.get("/coingecko/api/v3/simple/price")
+    async def coingecko_price(ids: str, vs_currencies: str = "brl"):
+        await simular()
+        return {
+            cripto_id: {vs_currencies.lower(): _PRECOS_BRL[_IDS_COINGECKO[cripto_id]]}
+            for cripto_id in ids.split(",")
+            if cripto_id in _IDS_COINGECKO
+        }
+
+    return app
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--porta", type=int, default=8901)
+    parser.add_argument("--latencia-ms", type=float, default=20.0)
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument("--taxa-erro", type=float, default=0.0)
+    args = parser.parse_args()
+
+    uvicorn.run(
+        criar_app(args.latencia_ms, args.jitter_ms, args.taxa_erro),
+        host="127.0.0.1",
+        port=args.porta,
+        log_level="warning",
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# tests/test_cache_compartilhado.py
+import asyncio
+from typing import Dict
+
+import fakeredis
+
+from app.domain.portas import CotacaoProvider
+from app.infra.cache import CotacaoCache
+from app.infra.cache_compartilhado import CacheRedis
+from app.infra.cotacao_repo import CotacaoRepositoryComCache
+
+
+class _ProviderContador(CotacaoProvider):
+    """Conta as chamadas à "Frankfurter" feitas por todos os repositórios."""
+
+    def __init__(self, latencia: float = 0.0) -> None:
+        self.chamadas = 0
+        self._latencia = latencia
+
+    async def buscar_tabela(self, moeda_base: str) -> Dict[str, float]:
+        self.chamadas += 1
+        await asyncio.sleep(self._latencia)
+        return {"USD": 1.08, "BRL": 5.9 + self.chamadas / 100}
+
+    async def buscar_cotacao(self, moeda_origem: str, moeda_destino: str) -> float:
+        raise NotImplementedError
+
+
+def _workers(provider: CotacaoProvider, ttl_seconds: int = 60):
+    """Dois "workers": cada um com o próprio L1, compartilhando o mesmo Redis."""
+    servidor = fakeredis.FakeServer()
+
+    def repo() -> CotacaoRepositoryComCache:
+        l2 = CacheRedis(fakeredis.aioredis.FakeRedis(server=servidor))
+        cache = CotacaoCache(ttl_seconds=ttl_seconds, stale_ttl_seconds=60)
+        return CotacaoRepositoryComCache(provider, cache, cache_compartilhado=l2)
+
+    return repo(), repo()
+
+
+def test_segundo_worker_le_do_l2_sem_chamar_a_api():
+    async def cenario():
+        provider = _ProviderContador()
+        a, b = _workers(provider)
+        await a.obter_cotacao("USD", "BRL")
+        cotacao = await b.obter_cotacao("USD", "BRL")
+        assert provider.chamadas == 1
+        assert cotacao.fonte == "cache"
+
+    asyncio.run(cenario())
+
+
+def test_renovacao_adota_tabela_renovada_por_outro_worker():
+    async def cenario():
+        provider = _ProviderContador()
+        a, b = _workers(provider, ttl_seconds=1)
+        await a.obter_cotacao("USD", "BRL")
+        await b.obter_cotacao("USD", "BRL")
+        await asyncio.sleep(1.1)  # as duas entradas no L1 passam do TTL
+
+        # A serve a obsoleta e renova em background (chamada externa)
+        assert (await a.obter_cotacao("USD", "BRL")).obsoleto
+        await a.aguardar_chamadas(5)
+        assert provider.chamadas == 2
+
+        # B também serve a obsoleta, mas a renovação encontra a tabela nova no L2
+        assert (await b.obter_cotacao("USD", "BRL")).obsoleto
+        await b.aguardar_chamadas(5)
+        assert provider.chamadas == 2
+        renovada = await b.obter_cotacao("USD", "BRL")
+        assert not renovada.obsoleto
+        assert renovada.taxa_cambio == (await a.obter_cotacao("USD", "BRL")).taxa_cambio
+        assert b.metricas()["adotadas_l2"] == 1
+
+    asyncio.run(cenario())
+
+
+def test_renovacoes_simultaneas_fazem_uma_chamada():
+    async def cenario():
+        provider = _ProviderContador(latencia=0.2)
+        a, b = _workers(provider, ttl_seconds=1)
+        await a.obter_cotacao("USD", "BRL")
+        await b.obter_cotacao("USD", "BRL")
+        await asyncio.sleep(1.1)
+
+        # Os dois disparam a renovação ao mesmo tempo: só quem obtém a trava no L2 chama a API
+        await asyncio.gather(a.obter_cotacao("USD", "BRL"), b.obter_cotacao("USD", "BRL"))
+        await asyncio.gather(a.aguardar_chamadas(5), b.aguardar_chamadas(5))
+        assert provider.chamadas == 2
+        assert a.metricas()["renovacoes_cedidas"] + b.metricas()["renovacoes_cedidas"] == 1
+
+    asyncio.run(cenario())